@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Generators of synthetic planning cases, shaped like the examples."""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+# Layouts of the MV/LV substations
+LAYOUTS = ('uniform', 'clustered')
+
+# Mean distance between two neighbouring MV/LV substations (m)
+SPACING = 500.
+
+# Load of the MV/LV substations (MW)
+MIN_LOAD = 0.1
+MAX_LOAD = 0.8
+
+
+def synthetic_case(n_substations, n_sources, seed=0, layout='uniform', spacing=SPACING):
+    """Generate a synthetic planning case.
+
+    The MV/LV substations are spread on a square whose size keeps their density constant, uniformly or around a few
+    centres ('clustered', like villages). The HV/MV substations are spread uniformly on the square. A feeder is built
+    between each pair of HV/MV substations, like the architecture command without feeders file.
+
+    Args:
+        n_substations (int):
+            The number of MV/LV substations.
+
+        n_sources (int):
+            The number of HV/MV substations, at least 2.
+
+        seed (int):
+            The seed of the random number generator.
+
+        layout (str):
+            The layout of the MV/LV substations, 'uniform' or 'clustered'.
+
+        spacing (float):
+            The mean distance between two neighbouring MV/LV substations (m).
+
+    Returns:
+        Tuple[pandas.DataFrame, pandas.DataFrame, pandas.DataFrame]:
+            The HV/MV substations, the MV/LV substations and the feeders, with the columns of the input files.
+    """
+    if n_sources < 2:
+        raise ValueError('A secured feeder needs at least 2 HV/MV substations, {!r} given.'.format(n_sources))
+    if layout not in LAYOUTS:
+        raise ValueError('Unknown layout {!r}, expected one of {!r}.'.format(layout, LAYOUTS))
+    rng = np.random.default_rng(seed)
+    side = spacing * np.sqrt(n_substations)
+
+    if layout == 'uniform':
+        x, y = rng.uniform(0, side, n_substations), rng.uniform(0, side, n_substations)
+    else:
+        n_clusters = max(1, int(np.sqrt(n_substations) / 2))
+        centres = rng.uniform(0, side, (n_clusters, 2))
+        cluster = rng.integers(0, n_clusters, n_substations)
+        radius = side / np.sqrt(n_clusters) / 4
+        x = np.clip(centres[cluster, 0] + rng.normal(0, radius, n_substations), 0, side)
+        y = np.clip(centres[cluster, 1] + rng.normal(0, radius, n_substations), 0, side)
+
+    hv_mv_substations = pd.DataFrame({
+        'id': np.arange(1, n_sources + 1),
+        'id_eb': np.arange(1, n_sources + 1),
+        'name': ['SUB{}'.format(i) for i in range(1, n_sources + 1)],
+        'x': rng.uniform(0, side, n_sources).round(),
+        'y': rng.uniform(0, side, n_sources).round(),
+    }).set_index('id')
+    mv_lv_substations = pd.DataFrame({
+        'id': np.arange(1, n_substations + 1),
+        'id_eb': np.arange(n_sources + 1, n_sources + n_substations + 1),
+        'name': ['MV_SUB_{}'.format(i) for i in range(1, n_substations + 1)],
+        'P (MW)': rng.uniform(MIN_LOAD, MAX_LOAD, n_substations).round(2),
+        'x': x.round(),
+        'y': y.round(),
+    }).set_index('id')
+
+    pairs = [(i, j) for i in range(1, n_sources) for j in range(i + 1, n_sources + 1)]
+    feeders = pd.DataFrame({
+        'id': np.arange(1, len(pairs) + 1),
+        'name': ['feeder_{}'.format(i) for i in range(1, len(pairs) + 1)],
+        'source1': [source1 for source1, _ in pairs],
+        'source2': [source2 for _, source2 in pairs],
+    }).set_index('id')
+    return hv_mv_substations, mv_lv_substations, feeders
+
+
+def write_case(folder, hv_mv_substations, mv_lv_substations, feeders):
+    """Write a planning case in a folder, as read by the architecture and batch commands."""
+    os.makedirs(folder, exist_ok=True)
+    hv_mv_substations.to_csv(os.path.join(folder, 'hv_mv_substations.csv'))
+    mv_lv_substations.to_csv(os.path.join(folder, 'mv_lv_substations.csv'))
+    feeders.to_csv(os.path.join(folder, 'feeders.csv'))
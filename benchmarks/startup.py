@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Benchmark of the startup time of the command line interface.
+
+The time of `planning-tools --help` and of the help of each subcommand is measured in fresh interpreters, and the heavy
+dependencies imported by the command line interface are listed. The benchmark fails if a heavy dependency is imported
+or if the median startup time exceeds the budget, so a regression of the lazy imports is detected.
+
+    python benchmarks/startup.py --repeat 10 --budget 0.5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# Root of the repository, where `python -m planning-tools` is run
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Commands measured
+COMMANDS = (
+    ['--help'],
+    ['architecture', '--help'],
+    ['batch', '--help'],
+    ['sizing', '--help'],
+)
+
+# Dependencies which must not be imported by the command line interface
+HEAVY_MODULES = ('pandas', 'scipy', 'matplotlib')
+
+# Default budget of the median startup time (s)
+BUDGET = 0.5
+
+
+def startup_time(arguments, repeat):
+    """The durations of `repeat` runs of the command line interface with some arguments."""
+    durations = list()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-m', 'planning-tools'] + arguments, cwd=ROOT, check=True,
+                       stdout=subprocess.DEVNULL)
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def imported_modules():
+    """The heavy dependencies imported by the module of the command line interface."""
+    code = 'import importlib, sys; importlib.import_module("planning-tools.__main__"); ' \
+           'print(" ".join(module for module in {!r} if module in sys.modules))'.format(HEAVY_MODULES)
+    output = subprocess.run([sys.executable, '-c', code], cwd=ROOT, check=True, capture_output=True, text=True)
+    return output.stdout.split()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5, help='The number of runs of each command.')
+    parser.add_argument('--budget', type=float, default=BUDGET, help='The budget of the median startup time (s).')
+    parser.add_argument('--output', default=None, help='The JSON file of the results.')
+    args = parser.parse_args()
+
+    # Baseline: startup time of the interpreter alone
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        subprocess.run([sys.executable, '-c', 'pass'], check=True)
+    interpreter = (time.perf_counter() - start) / args.repeat
+
+    results = {'interpreter': interpreter, 'budget': args.budget, 'commands': dict(), 'heavy_modules': None}
+    failed = False
+    for arguments in COMMANDS:
+        durations = startup_time(arguments, args.repeat)
+        median = statistics.median(durations)
+        name = ' '.join(arguments)
+        results['commands'][name] = {'median': median, 'min': min(durations), 'max': max(durations)}
+        status = 'ok' if median <= args.budget else 'over budget'
+        failed |= median > args.budget
+        print('planning-tools {:<20} median {:.3f} s (interpreter {:.3f} s) {}'.format(name, median, interpreter,
+                                                                                         status))
+
+    results['heavy_modules'] = imported_modules()
+    if results['heavy_modules']:
+        failed = True
+        print('Heavy dependencies imported at startup: {}'.format(', '.join(results['heavy_modules'])))
+
+    if args.output is not None:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
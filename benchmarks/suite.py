@@ -0,0 +1,225 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Benchmark suite of the architecture pipeline.
+
+The construction of the architecture, the travelling salesman problem of a feeder, the resolution of all the feeders
+and a seeded simulated annealing from a random placement are timed on synthetic cases, each one on an architecture
+built beforehand. The wall time and the length of the solution, and the initial length of the simulated annealing, are
+stored in a JSON file, which can be compared with the results of a previous run to detect regressions. A simulated
+annealing which does not improve its initial solution is a regression.
+
+    python benchmarks/suite.py --sizes 100 1000 5000 --sources 4 --output results.json
+    python benchmarks/suite.py --compare results.json
+"""
+
+import argparse
+import datetime
+import importlib
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from generators import LAYOUTS, synthetic_case, write_case
+
+# Root of the repository, imported as the package `planning-tools`
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+config = importlib.import_module('planning-tools.architecture.config')
+secured_feeder = importlib.import_module('planning-tools.architecture.secured_feeder')
+telemetry = importlib.import_module('planning-tools.architecture.telemetry')
+utils = importlib.import_module('planning-tools.architecture.utils')
+
+BENCHMARKS = ('init', 'tsp-insertion', 'tsp-local-search', 'optimize_feeders', 'simulated_annealing')
+
+# Above this number of MV/LV substations, the distances are computed on demand and the moves are restricted
+DENSE_LIMIT = 5000
+NEIGHBOURS = 10
+
+# Maximum number of MV/LV substations of the travelling salesman problem benchmarks
+TSP_POINTS = 1000
+
+# Budget of iterations of the simulated annealing
+ITERATIONS = 2000
+
+# Tolerances of the comparison with a previous run
+TIME_TOLERANCE = 0.2  # relative increase of the wall time
+LENGTH_TOLERANCE = 1e-6  # relative increase of the length
+
+
+class InitialLength(telemetry.AnnealingObserver):
+    """Observer recording the initial length of the simulated annealing."""
+
+    def __init__(self):
+        self.length = None
+
+    def on_start(self, info):
+        self.length = info['length']
+
+
+def run_case(n_substations, n_sources, layout, seed, benchmarks, repeat, iterations):
+    """Run the benchmarks on a synthetic case and return a result per benchmark."""
+    hv_mv_substations, mv_lv_substations, feeders = synthetic_case(n_substations, n_sources, seed=seed, layout=layout)
+    distances = 'dense' if n_substations <= DENSE_LIMIT else 'lazy'
+
+    def build():
+        return secured_feeder.SecuredFeeder(hv_mv_substations, mv_lv_substations, feeders.copy(), distances=distances)
+
+    # Each benchmark is prepared by a setup, outside of the timing, which returns the timed call. The call returns
+    # the values recorded with the wall time, e.g. the length of the solution.
+    def init():
+        return lambda: (build(), {})[1]
+
+    def tsp(solver):
+        architecture = build()
+        rng = np.random.default_rng(seed)
+        points = list(rng.choice(architecture._substations, min(TSP_POINTS, n_substations), replace=False))
+        sources = [int(position) for position in architecture._sources[0]]
+        return lambda: {'length': utils.tsp_solver(sources + points, architecture.distances, sources, solver=solver)[1]}
+
+    def optimize_feeders():
+        architecture = build()
+        architecture.initial_placement('corridor')
+        return lambda: {'length': architecture.optimize_feeders()}
+
+    def simulated_annealing():
+        # A cold start from a seeded random placement: the corridor placement is hardly improved by the budget
+        architecture = build()
+        annealing_config = config.AnnealingConfig(seed=seed, max_iterations=iterations,
+                                                  neighbours=NEIGHBOURS if n_substations > DENSE_LIMIT else None)
+        initial = InitialLength()
+
+        def run():
+            length = secured_feeder.simulated_annealing(architecture, annealing_config,
+                                                         observers=[initial]).statistics['length']
+            return {'length': length, 'initial_length': initial.length}
+        return run
+
+    setups = {
+        'init': init,
+        'tsp-insertion': lambda: tsp('insertion'),
+        'tsp-local-search': lambda: tsp('local-search'),
+        'optimize_feeders': optimize_feeders,
+        'simulated_annealing': simulated_annealing,
+    }
+    results = list()
+    for benchmark in benchmarks:
+        times, recorded = list(), dict()
+        for _ in range(repeat):
+            random.seed(seed)
+            run = setups[benchmark]()
+            start = time.perf_counter()
+            recorded = run()
+            times.append(time.perf_counter() - start)
+        length, initial_length = recorded.get('length'), recorded.get('initial_length')
+        results.append({'benchmark': benchmark, 'n_substations': n_substations, 'n_sources': n_sources,
+                        'layout': layout, 'distances': distances, 'wall_time': statistics.median(times),
+                        'min_time': min(times), 'length': None if length is None else float(length),
+                        'initial_length': None if initial_length is None else float(initial_length)})
+        print('{:<20} {:>6} substations {:>3} sources {:<9} {:>9.3f} s  {}{}'.format(
+            benchmark, n_substations, n_sources, layout, results[-1]['wall_time'],
+            '' if length is None else '{:.0f} m'.format(length),
+            '' if initial_length is None else ' (from {:.0f} m, {:+.1%})'.format(initial_length,
+                                                                                length / initial_length - 1)))
+    return results
+
+
+def stalled(results):
+    """The simulated annealing runs which do not improve their initial solution."""
+    return ['no improvement: {} {} substations {} sources {}: {:.0f} m'.format(
+        result['benchmark'], result['n_substations'], result['n_sources'], result['layout'], result['length'])
+        for result in results if result['initial_length'] is not None and result['length'] >= result['initial_length']]
+
+
+def compare(results, reference, time_tolerance=TIME_TOLERANCE, length_tolerance=LENGTH_TOLERANCE):
+    """Compare the results with the results of a previous run and return the regressions."""
+    def key(result):
+        return result['benchmark'], result['n_substations'], result['n_sources'], result['layout']
+
+    previous = {key(result): result for result in reference['results']}
+    regressions = list()
+    for result in results:
+        old = previous.get(key(result))
+        if old is None:
+            continue
+        ratio = result['wall_time'] / old['wall_time'] if old['wall_time'] > 0 else 1.
+        message = '{} {} substations {} sources {}: {:.3f} s -> {:.3f} s ({:+.0%})'.format(
+            *key(result), old['wall_time'], result['wall_time'], ratio - 1)
+        if ratio > 1 + time_tolerance:
+            regressions.append('slower: ' + message)
+        if result['length'] is not None and old['length'] is not None \
+                and result['length'] > old['length'] * (1 + length_tolerance):
+            regressions.append('longer: {} {} substations {} sources {}: {:.0f} m -> {:.0f} m'.format(
+                *key(result), old['length'], result['length']))
+        print(message)
+    return regressions
+
+
+def metadata():
+    """The description of the environment of the run."""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {'date': datetime.datetime.now().isoformat(timespec='seconds'), 'commit': commit,
+            'python': platform.python_version(), 'numpy': np.__version__, 'machine': platform.machine(),
+            'processor': platform.processor(), 'cpu_count': os.cpu_count()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 5000],
+                        help='The numbers of MV/LV substations of the cases.')
+    parser.add_argument('--sources', type=int, nargs='+', default=[4], help='The numbers of HV/MV substations.')
+    parser.add_argument('--layouts', choices=LAYOUTS, nargs='+', default=['uniform'],
+                        help='The layouts of the MV/LV substations.')
+    parser.add_argument('--benchmarks', choices=BENCHMARKS, nargs='+', default=list(BENCHMARKS),
+                        help='The benchmarks to run.')
+    parser.add_argument('--seed', type=int, default=0, help='The seed of the cases and of the simulated annealing.')
+    parser.add_argument('--repeat', type=int, default=3, help='The number of runs of each benchmark.')
+    parser.add_argument('--iterations', type=int, default=ITERATIONS,
+                        help='The budget of iterations of the simulated annealing.')
+    parser.add_argument('--output', default=None, help='The JSON file of the results.')
+    parser.add_argument('--compare', default=None, help='The JSON file of the results of a previous run.')
+    parser.add_argument('--time-tolerance', type=float, default=TIME_TOLERANCE,
+                        help='The relative increase of the wall time reported as a regression.')
+    parser.add_argument('--write-cases', default=None,
+                        help='A folder where the synthetic cases are written, e.g. for the batch command.')
+    args = parser.parse_args()
+    # The budget of the simulated annealing is exhausted on purpose, the warnings are not shown
+    logging.basicConfig(level=logging.ERROR)
+
+    results = list()
+    for layout in args.layouts:
+        for n_sources in args.sources:
+            for n_substations in args.sizes:
+                if args.write_cases is not None:
+                    folder = os.path.join(args.write_cases, '{}_{}_{}'.format(layout, n_substations, n_sources))
+                    write_case(folder, *synthetic_case(n_substations, n_sources, seed=args.seed, layout=layout))
+                results.extend(run_case(n_substations, n_sources, layout, args.seed, args.benchmarks, args.repeat,
+                                        args.iterations))
+
+    if args.output is not None:
+        with open(args.output, 'w') as file:
+            json.dump({'metadata': metadata(), 'parameters': vars(args), 'results': results}, file, indent=2)
+
+    regressions = stalled(results)
+    if args.compare is not None:
+        with open(args.compare) as file:
+            regressions.extend(compare(results, json.load(file), time_tolerance=args.time_tolerance))
+    for regression in regressions:
+        print('Regression: ' + regression)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,15 +1,25 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import cProfile
+import io
 import logging
 import os
+import pstats
 
 import click
-import pandas as pd
 
-from .architecture.secured_feeder import SecuredFeeder, simulated_annealing
-from .electrical_network.electrical_network import ElectricalNetwork
-from .io.read_files import read_architecture_files, read_sizing_files
+# The heavy dependencies (pandas, scipy, matplotlib) are imported by the subcommands which need them, only light
+# modules are imported here for the defaults of the options
+from .architecture.checkpoint import CHECKPOINT_INTERVAL
+from .architecture.config import ALPHA, N_0, N_1, N_2, N_3, TAU_0, TAU_WARM, AnnealingConfig
+from .architecture.constraints import LOAD_PENALTY, VOLTAGE_PENALTY, ElectricalConstraints
+from .architecture.distances import DISTANCES_BACKENDS
+from .architecture.placement import PLACEMENTS
+from .architecture.rendering import RENDER_FORMATS
+from .architecture.telemetry import TRACE_FORMATS, TraceRecorder
+from .architecture.utils import EXACT_LIMIT, TSP_SOLVERS
+from .electrical_network.power_flow import NOMINAL_VOLTAGE, POWER_FACTOR
 from .log_utils import CLICKVERBOSITY, set_logging_config
 
 logger = logging.getLogger(__name__)
@@ -17,6 +27,12 @@ logger = logging.getLogger(__name__)
 CONTEXT_SETTINGS = dict(help_option_names=['-h', '--help'], max_content_width=120)
 EPILOG = 'Set of tools for the planning of electrical distribution networks.'
 
+# Formats of the files of buses and branches
+FILE_FORMATS = ('csv', 'parquet', 'feather')
+
+# Number of functions of the profile written in the log
+PROFILE_LINES = 25
+
 
 @click.group(name='planning-tools', epilog=EPILOG, context_settings=CONTEXT_SETTINGS,
              help="Set of tools for the planning of electrical distribution networks.")
@@ -35,11 +51,137 @@ def planning_tools(ctx, verbosity):
 @click.argument('mv_lv_substations_filename', type=click.Path(exists=True), nargs=1)
 @click.option('--feeders-file', '-f', type=click.Path(exists=False, file_okay=True, dir_okay=True),
               default=None, help='Configuration of the MV feeders. The default is \'None\'.')
+@click.option('--bbox', type=float, nargs=4, default=None, metavar='XMIN YMIN XMAX YMAX',
+              help='Plan only the MV/LV substations of a region, the others are discarded while reading the file. By '
+                   'default, the region is not limited.')
+@click.option('--source-margin', type=click.FloatRange(min=0), default=None,
+              help='Plan only the MV/LV substations of the bounding box of the HV/MV substations enlarged by this '
+                   'margin. By default, the region is not limited.')
+@click.option('--distances', type=click.Choice(DISTANCES_BACKENDS), default='dense',
+              help='The storage of the distances between the buses: a matrix in memory (\'dense\'), computed on demand '
+                   '(\'lazy\') or a matrix stored on the disk (\'memmap\'). The default is \'dense\'.')
+@click.option('--distances-file', type=click.Path(exists=False, file_okay=True, dir_okay=False), default=None,
+              help='The file of the matrix of distances for the storage \'memmap\', reused if it already exists. The '
+                   'default is \'distances.npy\' in the output folder.')
+@click.option('--tsp-solver', type=click.Choice(TSP_SOLVERS), default='insertion',
+              help='The resolution of the path of the feeders: farthest insertion (\'insertion\'), farthest '
+                   'insertion improved by 2-opt and Or-opt moves (\'local-search\') or exact resolution of the feeders '
+                   'with at most {!r} MV/LV substations, \'local-search\' otherwise (\'exact\'). The default is '
+                   '\'insertion\'.'.format(EXACT_LIMIT))
+@click.option('--restarts', type=click.IntRange(min=1), default=1,
+              help='The number of independent chains of simulated annealing, the best solution is kept. The default is '
+                   '1.')
+@click.option('--jobs', '-j', type=click.IntRange(min=1), default=1,
+              help='The number of processes running the chains of simulated annealing. The default is 1.')
+@click.option('--decompose', is_flag=True, default=False,
+              help='Partition the MV/LV substations into zones of adjacent pairs of HV/MV substations, with a few '
+                   'feeders each, optimize each zone independently on the processes and refine the boundaries between '
+                   'the zones. The distances are stored only for the zones, the option \'distances\' applies to them. '
+                   'The statistics of the zones are written in the file \'zones.csv\' of the output folder. '
+                   'Recommended with many HV/MV substations.')
+@click.option('--balance-weight', 'balance_weights', type=click.FloatRange(min=0), multiple=True,
+              help='Explore the compromises between the total length and the balance of the feeders: a chain of '
+                   'simulated annealing is run on the processes for each weight, the penalty of the square of the load '
+                   'of each feeder in meters per MVA^2. The option can be repeated. The non-dominated architectures '
+                   '(length, maximum number of MV/LV substations and maximum load of a feeder) are written in the '
+                   'files \'pareto.csv\' and \'pareto.npz\' of the output folder, the shortest one in the buses and '
+                   'branches files.')
+@click.option('--pareto-entry', type=(click.Path(exists=True, file_okay=True, dir_okay=False), click.IntRange(min=0)),
+              default=None, help='A Pareto front file and the number of one of its entries: the architecture of the '
+                                 'entry is restored without optimization.')
+@click.option('--seed', type=int, default=None,
+              help='The seed of the random number generator of the simulated annealing. By default, the generator is '
+                   'seeded by the system.')
+@click.option('--max-iterations', type=click.IntRange(min=1), default=None,
+              help='The maximum number of iterations of the simulated annealing. By default, there is no limit.')
+@click.option('--max-time', type=click.FloatRange(min=0), default=None,
+              help='The maximum duration of the simulated annealing in seconds, the best solution found is kept. By '
+                   'default, there is no limit.')
+@click.option('--calibration-moves', type=click.IntRange(min=1), default=N_0,
+              help='The number of moves increasing the length sampled to set the initial temperature. The default is '
+                   '{!r}.'.format(N_0))
+@click.option('--initial-acceptance', type=click.FloatRange(min=0, max=100, min_open=True, max_open=True),
+              default=TAU_0, help='The initial acceptance rate of the moves increasing the length in percent. The '
+                                  'default is {!r}.'.format(TAU_0))
+@click.option('--cooling-rate', type=click.FloatRange(min=0, max=1, min_open=True, max_open=True), default=ALPHA,
+              help='The decrease factor of the temperature at each step. The default is {!r}.'.format(ALPHA))
+@click.option('--step-accepted', type=click.IntRange(min=1), default=N_1,
+              help='The number of accepted moves, per MV/LV substation, before a temperature step. The default is '
+                   '{!r}.'.format(N_1))
+@click.option('--step-moves', type=click.IntRange(min=1), default=N_2,
+              help='The number of moves, per MV/LV substation, before a temperature step. The default is '
+                   '{!r}.'.format(N_2))
+@click.option('--stop-steps', type=click.IntRange(min=1), default=N_3,
+              help='The number of temperature steps without improvement stopping the simulated annealing. The default '
+                   'is {!r}.'.format(N_3))
+@click.option('--reoptimize/--no-reoptimize', default=False,
+              help='Solve again the path of the feeders modified by an accepted move. The default is '
+                   '\'no-reoptimize\'.')
+@click.option('--neighbours', type=click.IntRange(min=1), default=None,
+              help='Move a MV/LV substation only to the feeders of its NEIGHBOURS nearest buses. By default, a '
+                   'substation can be moved to any feeder.')
+@click.option('--placement', type=click.Choice(PLACEMENTS), default='random',
+              help='The initial placement of the MV/LV substations: uniformly at random (\'random\'), by angular '
+                   'sectors around the sources of the feeders (\'sweep\'), by bands along the corridor between the '
+                   'sources (\'corridor\') or with a capacity-balanced k-means (\'kmeans\'). Except for \'random\', '
+                   'the simulated annealing starts at a low temperature. The default is \'random\'.')
+@click.option('--warm-start', type=click.Path(exists=True, file_okay=True, dir_okay=False), default=None,
+              help='The buses file of a previous architecture: its assignment of the MV/LV substations to the feeders '
+                   'is kept, the new MV/LV substations are placed greedily and the simulated annealing starts at a low '
+                   'temperature. The paths of the feeders are read in the branches file of the same folder, if any.')
+@click.option('--pin-existing/--free-existing', default=True,
+              help='With a warm start, move only the new MV/LV substations. The default is \'pin-existing\'.')
+@click.option('--warm-acceptance', type=click.FloatRange(min=0, max=100, min_open=True, max_open=True),
+              default=TAU_WARM, help='The initial acceptance rate of the moves increasing the length in percent, '
+                                     'with a warm start or a placement other than \'random\'. The default is '
+                                     '{!r}.'.format(TAU_WARM))
+@click.option('--max-load', type=click.FloatRange(min=0, min_open=True), default=None,
+              help='The maximum load of a feeder in MVA, the excess is penalized in the objective of the simulated '
+                   'annealing. By default, the load is not constrained.')
+@click.option('--max-voltage-drop', type=click.FloatRange(min=0, min_open=True), default=None,
+              help='The maximum voltage drop of a feeder in percent, estimated in N-1 backfeed conditions, the excess '
+                   'is penalized in the objective of the simulated annealing. By default, the voltage drop is not '
+                   'constrained.')
+@click.option('--load-penalty', type=click.FloatRange(min=0), default=LOAD_PENALTY,
+              help='The penalty of the load above the maximum load in meters per MVA. The default is '
+                   '{!r}.'.format(LOAD_PENALTY))
+@click.option('--voltage-penalty', type=click.FloatRange(min=0), default=VOLTAGE_PENALTY,
+              help='The penalty of the voltage drop above the maximum voltage drop in meters per percent. The default '
+                   'is {!r}.'.format(VOLTAGE_PENALTY))
+@click.option('--trace', type=click.Choice(TRACE_FORMATS), default=None,
+              help='Write the metrics of each temperature step of the simulated annealing (temperature, acceptance '
+                   'rate, lengths, moves per second, time in the travelling salesman problem) in the file \'trace\' '
+                   'of the output folder, in this format. By default, no trace is written.')
+@click.option('--profile', is_flag=True, default=False,
+              help='Profile the optimization with cProfile, the statistics are written in the file \'profile.prof\' '
+                   'of the output folder.')
+@click.option('--render', type=click.Choice(RENDER_FORMATS), multiple=True,
+              help='Write a rendering of the architecture in the file \'architecture\' of the output folder, in this '
+                   'format. The option can be repeated. The images are drawn without display, the GeoJSON file keeps '
+                   'the coordinates of the input files. By default, no rendering is written.')
+@click.option('--checkpoint', type=click.Path(exists=False, file_okay=True, dir_okay=False), default=None,
+              help='The file where the state of the simulated annealing is written periodically and at the end, with a '
+                   'single chain. By default, no checkpoint is written.')
+@click.option('--checkpoint-interval', type=click.FloatRange(min=0), default=CHECKPOINT_INTERVAL,
+              help='The minimum duration in seconds between two checkpoints of the simulated annealing. The default is '
+                   '{!r}.'.format(CHECKPOINT_INTERVAL))
+@click.option('--resume', is_flag=True, default=False,
+              help='Continue the simulated annealing from the file of the option \'checkpoint\', written by a previous '
+                   'run with the same input files and parameters. The budgets of iterations and time include the '
+                   'previous run.')
 @click.option('--verbosity', type=CLICKVERBOSITY, help='The verbosity level. The default is \'info\'.', default='info')
 @click.option('--output-folder', '-o', type=click.Path(exists=False, file_okay=False, dir_okay=True),
               default='Results', help='The folder to export the results of the extraction. The default is \'Results\'.')
+@click.option('--output-format', type=click.Choice(FILE_FORMATS), default='csv',
+              help='The format of the files of buses and branches. The binary formats \'parquet\' and \'feather\' '
+                   'are faster and keep the types of the columns. The default is \'csv\'.')
 @click.pass_context
-def architecture(ctx, hv_mv_substations_filename, mv_lv_substations_filename, feeders_file, verbosity, output_folder):
+def architecture(ctx, hv_mv_substations_filename, mv_lv_substations_filename, feeders_file, bbox, source_margin,
+                 distances, distances_file, tsp_solver, restarts, jobs, decompose, balance_weights, pareto_entry,
+                 seed, max_iterations, max_time, calibration_moves, initial_acceptance, cooling_rate, step_accepted,
+                 step_moves, stop_steps, reoptimize, neighbours, placement, warm_start, pin_existing, warm_acceptance,
+                 max_load, max_voltage_drop, load_penalty, voltage_penalty, trace, profile, render,
+                 checkpoint, checkpoint_interval, resume, verbosity, output_folder, output_format):
     #
     # Activate the log
     #
@@ -47,41 +189,180 @@ def architecture(ctx, hv_mv_substations_filename, mv_lv_substations_filename, fe
         verbosity = ctx.obj['verbosity']
     set_logging_config(verbosity=verbosity, filename=os.path.join(output_folder, 'extraction.log'))
     logger.info('Begining of the program.')
+    if resume and checkpoint is None:
+        raise click.UsageError('The option \'resume\' needs the file of the option \'checkpoint\'.')
+    if resume and not os.path.isfile(checkpoint):
+        raise click.UsageError('The checkpoint {!r} does not exist.'.format(checkpoint))
+    if checkpoint is not None and (restarts > 1 or jobs > 1 or decompose or balance_weights):
+        raise click.UsageError('A checkpoint can only be written and resumed with a single chain of simulated '
+                               'annealing.')
+    if decompose and (restarts > 1 or warm_start is not None):
+        raise click.UsageError('The decomposition in zones can not be combined with restarts or a warm start.')
+    if balance_weights and (restarts > 1 or decompose or warm_start is not None):
+        raise click.UsageError('The Pareto front can not be combined with restarts, the decomposition in zones or a '
+                               'warm start.')
+    from .architecture.checkpoint import load_checkpoint
+    from .architecture.decomposition import decomposed_annealing
+    from .architecture.multistart import multistart_annealing
+    from .architecture.pareto import architecture_from_front, load_front, pareto_annealing, save_front
+    from .architecture.secured_feeder import SecuredFeeder, assignment_from_buses, default_feeders, \
+        paths_from_branches, simulated_annealing
+    from .electrical_network.electrical_network import ElectricalNetwork
+    from .io.read_files import read_architecture_files, read_branches_file, read_buses_file, read_feeders_file
 
     #
     # Read the input file
     #
-    hv_mv_substations, mv_lv_substations = read_architecture_files(hv_mv_substations_filename, mv_lv_substations_filename)
+    hv_mv_substations, mv_lv_substations = read_architecture_files(
+        hv_mv_substations_filename, mv_lv_substations_filename, bbox=bbox, source_margin=source_margin)
 
     #
     # Configuration of the MV feeders
     #
     if feeders_file is None:
-        feeders_dict = ({'id': [], 'name': [], 'source1': [], 'source2': []})
-        idx = 1
-        for i in range(0, len(hv_mv_substations) - 1):
-            for j in range(i + 1, len(hv_mv_substations)):
-                feeders_dict['id'].append(idx)
-                feeders_dict['name'].append('feeder_' + str(idx))
-                feeders_dict['source1'].append(hv_mv_substations.index[i])
-                feeders_dict['source2'].append(hv_mv_substations.index[j])
-                idx += 1
-        feeders = pd.DataFrame(feeders_dict)
-        feeders = feeders.set_index('id')
+        feeders = default_feeders(hv_mv_substations)
     else:
-        feeders = pd.read_csv(feeders_file, index_col='id')
+        feeders = read_feeders_file(feeders_file)
 
     #
     # Build the architecture
     #
+    x = None
+    paths = None
+    if warm_start is not None:
+        previous_buses = read_buses_file(warm_start)
+        x = assignment_from_buses(previous_buses, mv_lv_substations)
+        branches_filename = os.path.join(os.path.dirname(warm_start), 'branches' + os.path.splitext(warm_start)[1])
+        if os.path.isfile(branches_filename):
+            paths = paths_from_branches(previous_buses, read_branches_file(branches_filename))
+    if distances == 'memmap' and distances_file is None and not decompose:
+        distances_file = os.path.join(output_folder, 'distances.npy')
     secured_feeder = SecuredFeeder(hv_mv_substations=hv_mv_substations,
                                    mv_lv_substations=mv_lv_substations,
-                                   feeders=feeders)
-    secured_feeder = simulated_annealing(secured_feeder)
+                                   feeders=feeders,
+                                   x=x,
+                                   # With the decomposition, the zones build their own distances
+                                   distances='lazy' if decompose else distances,
+                                   distances_filename=distances_file,
+                                   solver=tsp_solver,
+                                   paths=paths)
+    constraints = None
+    if max_load is not None or max_voltage_drop is not None:
+        constraints = ElectricalConstraints(max_load=max_load, max_voltage_drop=max_voltage_drop,
+                                            load_penalty=load_penalty, voltage_penalty=voltage_penalty)
+    config = AnnealingConfig(n_0=calibration_moves, tau_0=initial_acceptance, alpha=cooling_rate, n_1=step_accepted,
+                             n_2=step_moves, n_3=stop_steps, reoptimize=reoptimize, seed=seed,
+                             max_iterations=max_iterations, max_time=max_time, warm_start=warm_start is not None,
+                             pin=pin_existing, tau_warm=warm_acceptance, placement=placement, neighbours=neighbours,
+                             constraints=constraints, checkpoint=checkpoint, checkpoint_interval=checkpoint_interval)
+    observers = list()
+    if trace is not None:
+        recorder = TraceRecorder()
+        observers.append(recorder)
+    profiler = None
+    if profile:
+        profiler = cProfile.Profile()
+        profiler.enable()
+    if pareto_entry is not None:
+        front_filename, entry = pareto_entry
+        secured_feeder = architecture_from_front(secured_feeder, load_front(front_filename, secured_feeder)[1], entry)
+    elif balance_weights:
+        secured_feeder, front, snapshots = pareto_annealing(secured_feeder, weights=balance_weights, jobs=jobs,
+                                                            config=config, observers=observers)
+        front.to_csv(os.path.join(output_folder, 'pareto.csv'))
+        save_front(os.path.join(output_folder, 'pareto.npz'), front, snapshots, secured_feeder)
+    elif decompose:
+        secured_feeder, zones = decomposed_annealing(secured_feeder, jobs=jobs, config=config,
+                                                     distances='lazy' if distances == 'memmap' else distances,
+                                                     observers=observers)
+        zones.to_csv(os.path.join(output_folder, 'zones.csv'))
+    elif restarts > 1 or jobs > 1:
+        secured_feeder, chains = multistart_annealing(secured_feeder, restarts=restarts, jobs=jobs, config=config,
+                                                      observers=observers)
+        chains.to_csv(os.path.join(output_folder, 'chains.csv'), index_label='chain')
+    else:
+        state = load_checkpoint(checkpoint) if resume else None
+        secured_feeder = simulated_annealing(secured_feeder, config, observers=observers, resume=state)
+    if profiler is not None:
+        profiler.disable()
+        profiler.dump_stats(os.path.join(output_folder, 'profile.prof'))
+        summary = io.StringIO()
+        pstats.Stats(profiler, stream=summary).sort_stats('cumulative').print_stats(PROFILE_LINES)
+        logger.info('Profile of the optimization:\n{}'.format(summary.getvalue()))
+    if trace is not None:
+        recorder.save(os.path.join(output_folder, 'trace.' + trace))
 
     # Generate the electrical network
     electrical_network = ElectricalNetwork(buses=secured_feeder.buses, branches=secured_feeder.branches)
-    electrical_network.save(output_folder)
+    electrical_network.save(output_folder, file_format=output_format)
+    for render_format in render:
+        secured_feeder.save_rendering(os.path.join(output_folder, 'architecture.' + render_format))
+
+
+@planning_tools.command(help="Build the MV architecture of several planning cases in a pool of processes. Each case is "
+                             "a folder with the files 'hv_mv_substations.csv', 'mv_lv_substations.csv' and optionally "
+                             "'feeders.csv', given directly, by a glob pattern or listed in a manifest file.",
+                        epilog=EPILOG, context_settings=CONTEXT_SETTINGS)
+@click.argument('cases', type=str, nargs=-1, required=True)
+@click.option('--jobs', '-j', type=click.IntRange(min=1), default=1,
+              help='The number of processes running the cases. The default is 1.')
+@click.option('--distances', type=click.Choice(('dense', 'lazy')), default='dense',
+              help='The storage of the distances between the buses: a matrix in memory (\'dense\') or computed on '
+                   'demand (\'lazy\'). The default is \'dense\'.')
+@click.option('--tsp-solver', type=click.Choice(TSP_SOLVERS), default='insertion',
+              help='The resolution of the path of the feeders. The default is \'insertion\'.')
+@click.option('--seed', type=int, default=None,
+              help='The seed of the random number generator of the simulated annealing of each case. By default, the '
+                   'generator is seeded by the system.')
+@click.option('--max-iterations', type=click.IntRange(min=1), default=None,
+              help='The maximum number of iterations of the simulated annealing of each case. By default, there is no '
+                   'limit.')
+@click.option('--max-time', type=click.FloatRange(min=0), default=None,
+              help='The maximum duration of the simulated annealing of each case in seconds. By default, there is no '
+                   'limit.')
+@click.option('--placement', type=click.Choice(PLACEMENTS), default='random',
+              help='The initial placement of the MV/LV substations. The default is \'random\'.')
+@click.option('--neighbours', type=click.IntRange(min=1), default=None,
+              help='Move a MV/LV substation only to the feeders of its NEIGHBOURS nearest buses. By default, a '
+                   'substation can be moved to any feeder.')
+@click.option('--max-load', type=click.FloatRange(min=0, min_open=True), default=None,
+              help='The maximum load of a feeder in MVA. By default, the load is not constrained.')
+@click.option('--max-voltage-drop', type=click.FloatRange(min=0, min_open=True), default=None,
+              help='The maximum voltage drop of a feeder in percent. By default, the voltage drop is not constrained.')
+@click.option('--verbosity', type=CLICKVERBOSITY, help='The verbosity level. The default is \'info\'.', default='info')
+@click.option('--output-folder', '-o', type=click.Path(exists=False, file_okay=False, dir_okay=True),
+              default='Results', help='The folder to export the results, with a folder per case and the summary '
+                                      '\'summary.csv\'. The default is \'Results\'.')
+@click.option('--output-format', type=click.Choice(FILE_FORMATS), default='csv',
+              help='The format of the files of buses and branches. The default is \'csv\'.')
+@click.pass_context
+def batch(ctx, cases, jobs, distances, tsp_solver, seed, max_iterations, max_time, placement, neighbours, max_load,
+          max_voltage_drop, verbosity, output_folder, output_format):
+    #
+    # Activate the log
+    #
+    if 'verbosity' in ctx.obj:
+        verbosity = ctx.obj['verbosity']
+    set_logging_config(verbosity=verbosity, filename=os.path.join(output_folder, 'batch.log'))
+    logger.info('Begining of the program.')
+    from .batch import find_cases, run_batch
+
+    #
+    # Run the cases
+    #
+    cases = find_cases(cases)
+    if not cases:
+        raise click.UsageError('No planning case found.')
+    constraints = None
+    if max_load is not None or max_voltage_drop is not None:
+        constraints = ElectricalConstraints(max_load=max_load, max_voltage_drop=max_voltage_drop)
+    config = AnnealingConfig(seed=seed, max_iterations=max_iterations, max_time=max_time, placement=placement,
+                             neighbours=neighbours, constraints=constraints)
+    summary = run_batch(cases, output_folder, config=config, jobs=jobs, verbosity=verbosity, file_format=output_format,
+                        distances=distances, solver=tsp_solver)
+    summary.to_csv(os.path.join(output_folder, 'summary.csv'))
+    if (summary['status'] != 'success').any():
+        ctx.exit(1)
 
 
 @planning_tools.command(help="Perform the sizing of the electrical network based on its architecture and"
@@ -93,8 +374,19 @@ def architecture(ctx, hv_mv_substations_filename, mv_lv_substations_filename, fe
 @click.option('--output-folder', '-o', type=click.Path(exists=False, file_okay=False, dir_okay=True),
               default=None, help='The folder to export the results of the sizing. If no path is provided, the input'
                                  'files are overwritten with the results.')
+@click.option('--voltage', type=click.FloatRange(min=0, min_open=True), default=NOMINAL_VOLTAGE,
+              help='The nominal line-to-line voltage of the MV network (kV). The default is {!r}.'.format(
+                  NOMINAL_VOLTAGE))
+@click.option('--power-factor', type=click.FloatRange(min=0, max=1, min_open=True), default=POWER_FACTOR,
+              help='The power factor of the loads. The default is {!r}.'.format(POWER_FACTOR))
+@click.option('--catalog', '-c', type=click.Path(exists=True, file_okay=True, dir_okay=False), default=None,
+              help='The catalog of conductors (name, ampacity, r, x, cost). The cheapest admissible conductor is '
+                   'chosen for each branch in normal and N-1 backfeed conditions. The default is \'None\'.')
+@click.option('--output-format', type=click.Choice(FILE_FORMATS), default=None,
+              help='The format of the files of buses and branches. By default, the format of the input files.')
 @click.pass_context
-def sizing(ctx, buses_filename, branches_filename, verbosity, output_folder):
+def sizing(ctx, buses_filename, branches_filename, verbosity, output_folder, voltage, power_factor, catalog,
+           output_format):
     #
     # Activate the log
     #
@@ -104,6 +396,8 @@ def sizing(ctx, buses_filename, branches_filename, verbosity, output_folder):
         output_folder = os.path.dirname(buses_filename)
     set_logging_config(verbosity=verbosity, filename=os.path.join(output_folder, 'sizing.log'))
     logger.info('Begining of the program.')
+    from .electrical_network.electrical_network import ElectricalNetwork
+    from .io.read_files import read_catalog_file, read_sizing_files, table_format
 
     #
     # Read the input file
@@ -112,7 +406,17 @@ def sizing(ctx, buses_filename, branches_filename, verbosity, output_folder):
 
     # Generate the electrical network
     electrical_network = ElectricalNetwork(buses=buses, branches=branches)
-    electrical_network.save(output_folder)
+
+    # Choice of the conductors
+    if catalog is not None:
+        electrical_network.size(read_catalog_file(catalog), voltage=voltage, power_factor=power_factor)
+
+    # Power flow in normal operation
+    feeders = electrical_network.power_flow(voltage=voltage, power_factor=power_factor)
+    feeders.to_csv(os.path.join(output_folder, 'power_flow.csv'))
+    if output_format is None:
+        output_format = table_format(buses_filename)
+    electrical_network.save(output_folder, file_format=output_format)
 
 
 if __name__ == '__main__':
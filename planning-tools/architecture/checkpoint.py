@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+import logging
+import os
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Default interval between two checkpoints of the simulated annealing (s)
+CHECKPOINT_INTERVAL = 300.
+
+# Version of the format of the checkpoints
+VERSION = 1
+
+
+def save_checkpoint(filename, state):
+    """Write a checkpoint of the simulated annealing in a compressed NumPy file.
+
+    The file is written next to its destination then renamed, so a run killed while writing leaves the previous
+    checkpoint intact.
+
+    Args:
+        filename (str):
+            The name of the file.
+
+        state (Dict):
+            The state of the simulated annealing: the positions of the buses `bus_ids`, the compact states `current`
+            and `best` (see `SecuredFeeder._snapshot`), the MV/LV substations moved `index_substations`, the best
+            objective of each temperature step `d_opt`, the state of the random number generator `rng` and the
+            scalar counters `counters`.
+    """
+    arrays = {'bus_ids': np.asarray(state['bus_ids']), 'index_substations': np.asarray(state['index_substations'],
+                                                                                        dtype=np.int64),
+              'd_opt': np.asarray(state['d_opt'], dtype=float)}
+    for name in ('current', 'best'):
+        assignment, paths, lengths = state[name][:3]
+        arrays[name + '_assignment'] = np.asarray(assignment, dtype=np.int64)
+        arrays[name + '_paths'] = np.array([position for path in paths for position in (path or [])], dtype=np.int64)
+        arrays[name + '_offsets'] = np.cumsum([0] + [len(path) if path is not None else 0 for path in paths])
+        arrays[name + '_lengths'] = np.asarray(lengths, dtype=float)
+    version, internal_state, gauss_next = state['rng']
+    arrays['rng_state'] = np.asarray(internal_state, dtype=np.int64)
+    meta = dict(state['counters'], version=VERSION, rng_version=version, gauss_next=gauss_next)
+    arrays['meta'] = np.array(json.dumps(meta))
+
+    temporary = filename + '.tmp'
+    with open(temporary, 'wb') as file:
+        np.savez_compressed(file, **arrays)
+    os.replace(temporary, filename)
+    logger.debug('Checkpoint written in {!r}.'.format(filename))
+
+
+def load_checkpoint(filename):
+    """Read a checkpoint of the simulated annealing written by `save_checkpoint`.
+
+    Args:
+        filename (str):
+            The name of the file.
+
+    Returns:
+        Dict: The state of the simulated annealing.
+    """
+    with np.load(filename) as arrays:
+        meta = json.loads(str(arrays['meta']))
+        if meta.pop('version') != VERSION:
+            raise ValueError('The checkpoint {!r} has been written by another version of the tools.'.format(filename))
+        state = {'bus_ids': arrays['bus_ids'], 'index_substations': arrays['index_substations'].tolist(),
+                 'd_opt': arrays['d_opt'].tolist()}
+        for name in ('current', 'best'):
+            flat, offsets = arrays[name + '_paths'].tolist(), arrays[name + '_offsets']
+            paths = [flat[start:stop] if stop > start else None for start, stop in zip(offsets[:-1], offsets[1:])]
+            state[name] = (arrays[name + '_assignment'], paths, arrays[name + '_lengths'])
+        state['rng'] = (meta.pop('rng_version'), tuple(arrays['rng_state'].tolist()), meta.pop('gauss_next'))
+    state['counters'] = meta
+    logger.info('Checkpoint read from {!r}: {!r} iterations, {!r} temperature steps.'.format(
+        filename, meta['ite'], meta['n_steps']))
+    return state
@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from .checkpoint import CHECKPOINT_INTERVAL
+
+# Default parameters of the simulated annealing
+N_0 = 100
+TAU_0 = 0.5
+ALPHA = 0.9
+N_1 = 12
+N_2 = 100
+N_3 = 5
+TAU_WARM = 0.01  # initial acceptance rate (%) of a warm start
+REOPTIMIZE = False  # resolution of the travelling salesman problem of the feeders modified by an accepted move
+
+
+class AnnealingConfig:
+
+    def __init__(self, n_0=N_0, tau_0=TAU_0, alpha=ALPHA, n_1=N_1, n_2=N_2, n_3=N_3, reoptimize=REOPTIMIZE,
+                 seed=None, max_iterations=None, max_time=None, warm_start=False, pin=True, tau_warm=TAU_WARM,
+                 placement='random', neighbours=None, constraints=None, checkpoint=None,
+                 checkpoint_interval=CHECKPOINT_INTERVAL):
+        """Parameters of the simulated annealing.
+
+        Args:
+            n_0 (int):
+                The number of increases of the total length sampled to calculate the initial temperature.
+
+            tau_0 (float):
+                The initial acceptance rate of the increases of the total length (%).
+
+            alpha (float):
+                The decrease factor of the temperature at each temperature step.
+
+            n_1 (int):
+                The number of accepted decreases of the total length, per MV/LV substation, before a temperature step.
+
+            n_2 (int):
+                The number of tentatives, per MV/LV substation, before a temperature step.
+
+            n_3 (int):
+                The number of temperature steps without improvement of the best solution stopping the optimization.
+
+            reoptimize (bool):
+                If `True`, the travelling salesman problem of the feeders modified by an accepted move is solved.
+
+            seed (Optional[int]):
+                The seed of the random number generator. If `None`, the generator is seeded by the system.
+
+            max_iterations (Optional[int]):
+                The maximum number of iterations of the optimization.
+
+            max_time (Optional[float]):
+                The maximum duration of the optimization (s).
+
+            warm_start (bool):
+                If `True`, the optimization starts from the assignment of the architecture instead of a random
+                placement: the MV/LV substations without feeder are placed greedily and the initial temperature is
+                set by `tau_warm`.
+
+            pin (bool):
+                If `True`, only the MV/LV substations without feeder at the beginning of a warm start are moved.
+
+            tau_warm (float):
+                The initial acceptance rate of the increases of the total length (%) of a warm start or of a start
+                from a placement strategy other than 'random'.
+
+            placement (str):
+                The strategy of initial placement of the MV/LV substations ('random', 'sweep', 'corridor' or
+                'kmeans'), see `SecuredFeeder.initial_placement`.
+
+            neighbours (Optional[int]):
+                If not `None`, a MV/LV substation is moved only to the feeders of its `neighbours` nearest buses
+                (including the feeders supplied by these buses). Otherwise, it can be moved to any feeder.
+
+            constraints (Optional[ElectricalConstraints]):
+                The electrical constraints of the feeders, whose penalties are added to the total length. If `None`,
+                the total length is minimized.
+
+            checkpoint (Optional[str]):
+                The file where the state of the optimization is written periodically and at the end, to resume it
+                with `simulated_annealing`. If `None`, no checkpoint is written.
+
+            checkpoint_interval (float):
+                The minimum duration between two checkpoints (s).
+        """
+        self.n_0 = n_0
+        self.tau_0 = tau_0
+        self.alpha = alpha
+        self.n_1 = n_1
+        self.n_2 = n_2
+        self.n_3 = n_3
+        self.reoptimize = reoptimize
+        self.seed = seed
+        self.max_iterations = max_iterations
+        self.max_time = max_time
+        self.warm_start = warm_start
+        self.pin = pin
+        self.tau_warm = tau_warm
+        self.placement = placement
+        self.neighbours = neighbours
+        self.constraints = constraints
+        self.checkpoint = checkpoint
+        self.checkpoint_interval = checkpoint_interval
+
+    def __repr__(self):
+        return '{}({})'.format(type(self).__name__,
+                               ', '.join('{}={!r}'.format(key, value) for key, value in vars(self).items()))
@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+from ..electrical_network.power_flow import NOMINAL_VOLTAGE, POWER_FACTOR, REACTANCE, RESISTANCE
+
+# Default penalties of the violations of the electrical constraints
+LOAD_PENALTY = 10000.  # meters per MVA above the maximum load of a feeder
+VOLTAGE_PENALTY = 10000.  # meters per percent above the maximum voltage drop of a feeder
+
+
+class ElectricalConstraints:
+
+    def __init__(self, max_load=None, max_voltage_drop=None, load_penalty=LOAD_PENALTY,
+                 voltage_penalty=VOLTAGE_PENALTY, voltage=NOMINAL_VOLTAGE, power_factor=POWER_FACTOR,
+                 resistance=RESISTANCE, reactance=REACTANCE, balance_penalty=0.):
+        """Electrical constraints of the feeders, added as penalties to the total length optimized by the simulated
+        annealing.
+
+        A secured feeder must be able to supply all its MV/LV substations from any of its two HV/MV substations, so the
+        constraints are checked in N-1 backfeed conditions: the whole load of the feeder flows from one substation. The
+        voltage drop is estimated from the load moment of the feeder (sum of the loads weighted by their distance to the
+        substation along the path), with the impedance of a single conductor type.
+
+        Args:
+            max_load (Optional[float]):
+                The maximum load of a feeder (MVA). If `None`, the load is not constrained.
+
+            max_voltage_drop (Optional[float]):
+                The maximum voltage drop of a feeder (%). If `None`, the voltage drop is not constrained.
+
+            load_penalty (float):
+                The penalty of the load above the maximum load (meters per MVA).
+
+            voltage_penalty (float):
+                The penalty of the voltage drop above the maximum voltage drop (meters per percent).
+
+            voltage (float):
+                The nominal line-to-line voltage (kV).
+
+            power_factor (float):
+                The power factor of the loads.
+
+            resistance (float):
+                The resistance of the conductor (ohm/km).
+
+            reactance (float):
+                The reactance of the conductor (ohm/km).
+
+            balance_penalty (float):
+                The penalty of the square of the load of each feeder (meters per MVA^2). As the total load is fixed,
+                it favours the architectures where the load is balanced between the feeders.
+        """
+        self.max_load = max_load
+        self.max_voltage_drop = max_voltage_drop
+        self.load_penalty = load_penalty
+        self.voltage_penalty = voltage_penalty
+        self.voltage = voltage
+        self.power_factor = power_factor
+        self.resistance = resistance
+        self.reactance = reactance
+        self.balance_penalty = balance_penalty
+
+    def __repr__(self):
+        return '{}({})'.format(type(self).__name__,
+                               ', '.join('{}={!r}'.format(key, value) for key, value in vars(self).items()))
+
+    def voltage_drop(self, loads, moments, lengths):
+        """The maximum voltage drop of feeders in N-1 backfeed conditions (%).
+
+        Args:
+            loads (numpy.ndarray):
+                The total load of the feeders (MVA).
+
+            moments (numpy.ndarray):
+                The load moments of the feeders from their first HV/MV substation (MVA.m).
+
+            lengths (numpy.ndarray):
+                The length of the paths of the feeders (m).
+
+        Returns:
+            numpy.ndarray: The voltage drop of the feeders.
+        """
+        # The distance of a bus to the second substation is the length of the path minus its distance to the first
+        moments = np.maximum(moments, loads * lengths - moments)
+        impedance = self.resistance * self.power_factor + self.reactance * np.sqrt(1 - self.power_factor ** 2)
+        return 100 * impedance * moments / 1000 / self.voltage ** 2
+
+    def penalty(self, loads, moments, lengths):
+        """The penalties of feeders (m).
+
+        Args:
+            loads (numpy.ndarray):
+                The total load of the feeders (MVA).
+
+            moments (numpy.ndarray):
+                The load moments of the feeders from their first HV/MV substation (MVA.m).
+
+            lengths (numpy.ndarray):
+                The length of the paths of the feeders (m).
+
+        Returns:
+            numpy.ndarray: The penalty of the feeders.
+        """
+        penalty = np.zeros(np.shape(loads))
+        if self.max_load is not None:
+            penalty += self.load_penalty * np.maximum(np.asarray(loads) - self.max_load, 0)
+        if self.max_voltage_drop is not None:
+            penalty += self.voltage_penalty * np.maximum(self.voltage_drop(loads, moments, lengths)
+                                                         - self.max_voltage_drop, 0)
+        if self.balance_penalty:
+            penalty += self.balance_penalty * np.asarray(loads) ** 2
+        return penalty
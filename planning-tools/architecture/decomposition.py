@@ -0,0 +1,291 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import copy
+import logging
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .config import AnnealingConfig
+from .secured_feeder import SecuredFeeder, simulated_annealing
+from .spatial_index import GridIndex
+from .telemetry import TraceRecorder
+
+logger = logging.getLogger(__name__)
+
+# Number of nearest buses of a MV/LV substation checked to detect the boundaries between the zones, and to which feeders
+# a substation of the boundary can be moved during the refinement
+BOUNDARY_NEIGHBOURS = 10
+
+# A MV/LV substation is on a boundary if its insertion in a feeder of another zone costs less than this factor times
+# the saving of its removal from its path
+BOUNDARY_SLACK = 2
+
+# Maximum number of feeders of a zone
+ZONE_FEEDERS = 6
+
+
+def source_pair_zones(architecture, zone_feeders=ZONE_FEEDERS):
+    """Partition the MV/LV substations into zones of source pairs.
+
+    Each MV/LV substation belongs to the pair of HV/MV substations of a feeder where its insertion in the direct line
+    between both substations costs the least, i.e. the sum of its distances to both substations minus the distance
+    between them: the cells of the pairs are the Voronoi cells of the segments between them, with elliptic
+    boundaries, so every feeder gets the MV/LV substations along its corridor. The pairs are then grouped in zones of
+    adjacent pairs by a recursive bisection of the middles of their segments, along the widest axis and balancing the
+    number of feeders, until a zone has at most `zone_feeders` feeders or a single pair.
+
+    Args:
+        architecture (SecuredFeeder):
+            The description of the secured feeder architecture.
+
+        zone_feeders (int):
+            The maximum number of feeders of a zone, unless a pair has more feeders.
+
+    Returns:
+        Tuple[numpy.ndarray, List[List[int]], numpy.ndarray]:
+            The zone of each MV/LV substation, in the order of `architecture._substations`, the positions of the
+            feeders of each zone and the position of the feeder of the pair of each MV/LV substation (-1 if the pair
+            has several feeders).
+    """
+    # The pairs of HV/MV substations of the feeders, referenced by their position in the data frame of buses
+    pairs = dict()
+    for feeder, (source1, source2) in enumerate(architecture._sources):
+        pairs.setdefault(tuple(sorted((int(source1), int(source2)))), []).append(feeder)
+    sources = sorted({source for pair in pairs for source in pair})
+    columns = {source: column for column, source in enumerate(sources)}
+
+    # Distance between the MV/LV substations and the HV/MV substations
+    x = architecture.buses['x'].to_numpy(dtype=float)
+    y = architecture.buses['y'].to_numpy(dtype=float)
+    substations = architecture._substations
+    distances = np.hypot(x[substations, None] - x[None, sources], y[substations, None] - y[None, sources])
+
+    # Pair minimizing the cost of insertion, the pairs are compared one by one to keep the memory linear
+    cells = np.zeros(len(substations), dtype=int)
+    best = np.full(len(substations), np.inf)
+    for cell, (source1, source2) in enumerate(pairs):
+        cost = distances[:, columns[source1]] + distances[:, columns[source2]] \
+            - np.hypot(x[source1] - x[source2], y[source1] - y[source2])
+        closer = cost < best
+        cells[closer] = cell
+        best[closer] = cost[closer]
+
+    # Zones of adjacent pairs, by recursive bisection of the middles of the segments
+    middles = np.array([[(x[source1] + x[source2]) / 2, (y[source1] + y[source2]) / 2] for source1, source2 in pairs])
+    counts = np.array([len(feeders) for feeders in pairs.values()])
+    groups = list()
+    pending = [np.arange(len(pairs))]
+    while pending:
+        group = pending.pop()
+        if len(group) == 1 or counts[group].sum() <= zone_feeders:
+            groups.append(group)
+            continue
+        coordinates = middles[group]
+        axis = int(np.argmax(np.ptp(coordinates, axis=0)))
+        group = group[np.argsort(coordinates[:, axis], kind='stable')]
+        cumulated = np.cumsum(counts[group])
+        split = int(np.clip(np.searchsorted(cumulated, cumulated[-1] / 2) + 1, 1, len(group) - 1))
+        pending.extend([group[split:], group[:split]])
+    cell_zones = np.zeros(len(pairs), dtype=int)
+    for zone, group in enumerate(groups):
+        cell_zones[group] = zone
+    feeders = list(pairs.values())
+    cell_feeders = np.array([pair_feeders[0] if len(pair_feeders) == 1 else -1 for pair_feeders in feeders])
+    return cell_zones[cells], [sorted(feeder for cell in group for feeder in feeders[cell]) for group in groups], \
+        cell_feeders[cells]
+
+
+def decomposed_annealing(architecture, jobs=1, config=None, distances='dense', boundary=BOUNDARY_NEIGHBOURS,
+                         zone_feeders=ZONE_FEEDERS, observers=()):
+    """Optimize the architecture of secured feeder zone by zone.
+
+    The MV/LV substations are partitioned into zones of source pairs (see `source_pair_zones`) and the simulated
+    annealing of each zone, restricted to its feeders, is run independently in a pool of processes. Each zone starts
+    warm from the cells of its pairs: a MV/LV substation is assigned to the feeder of its pair, or placed greedily if
+    the pair has several feeders, and all the substations of the zone can move. A MV/LV substation is on the boundary
+    of its zone when its insertion next to one of its `boundary` nearest substations of another zone costs less than
+    `BOUNDARY_SLACK` times the saving of its removal from its path: the substations of the boundaries are then
+    removed from their feeders, placed greedily and refined by a simulated annealing of the whole architecture where
+    only they move, to the feeders of their nearest buses. The paths of the zones are kept by the refinement. The
+    budgets of iterations and time of the configuration apply to each zone and to the refinement.
+
+    Only the zones build their own distances: the distances of the whole architecture are read by the refinement for
+    a few substations, so the architecture should be built with lazy distances.
+
+    Args:
+        architecture (SecuredFeeder):
+            The description of the secured feeder architecture.
+
+        jobs (int):
+            The number of processes running the zones.
+
+        config (Optional[AnnealingConfig]):
+            The parameters of the simulated annealing. The seed of the configuration is used to draw the seeds of the
+            zones and of the refinement.
+
+        distances (str):
+            The backend of the distances between the buses of each zone ('dense' or 'lazy').
+
+        boundary (int):
+            The number of nearest buses checked to detect the boundaries between the zones. If the configuration does
+            not restrict the moves, the substations of the boundaries are moved to the feeders of these buses.
+
+        zone_feeders (int):
+            The maximum number of feeders of a zone, see `source_pair_zones`.
+
+        observers (Iterable[AnnealingObserver]):
+            The observers of the optimization. The temperature steps of each zone are recorded in its process and
+            notified to the observers at the end of the zones, with the number of the zone `zone`; the refinement is
+            observed directly.
+
+    Returns:
+        Tuple[SecuredFeeder, pandas.DataFrame]:
+            The optimized architecture and the statistics of each zone.
+    """
+    if config is None:
+        config = AnnealingConfig()
+    rng = random.Random(config.seed)
+    start = time.perf_counter()
+
+    # Zones of source pairs
+    zones, feeders_of_zones, cell_feeders = source_pair_zones(architecture, zone_feeders=zone_feeders)
+    seeds = [rng.randrange(2 ** 32) for _ in range(len(feeders_of_zones) + 1)]
+    substations = architecture._substations
+    tasks = list()
+    for zone, feeders in enumerate(feeders_of_zones):
+        if not np.any(zones == zone):
+            continue
+        # Initial assignment of the zone: the feeders of the cells of the substations
+        sources = np.unique(architecture._sources[feeders])
+        cells = cell_feeders[zones == zone]
+        initial = np.where(cells >= 0, architecture._feeder_ids[np.maximum(cells, 0)], np.nan)
+        positions = np.concatenate([sources, substations[zones == zone]])
+        buses = architecture.buses.iloc[positions].assign(
+            feeder=np.concatenate([np.full(len(sources), np.nan), initial])).reset_index()
+        tasks.append((buses, architecture.feeders.iloc[feeders].copy(), config, distances, architecture.solver, zone,
+                      seeds[zone]))
+    logger.info('Optimization of {!r} zones of source pairs on {!r} processes.'.format(len(tasks), jobs))
+    if jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = list(executor.map(_run_zone, *zip(*tasks)))
+    else:
+        results = [_run_zone(*task) for task in tasks]
+
+    # Temperature steps of the zones
+    for _, zone_statistics, _, steps in results:
+        for metrics in steps:
+            for observer in observers:
+                observer.on_step(dict(metrics, zone=zone_statistics['zone']))
+    statistics = pd.DataFrame([zone_statistics for _, zone_statistics, _, _ in results]).set_index('zone')
+
+    # Assignment and paths of the zones in the whole architecture
+    assignment = np.full(len(architecture.buses), -1, dtype=int)
+    for zone_assignment, _, _, _ in results:
+        positions = architecture.buses.index.get_indexer(zone_assignment.index)
+        assignment[positions] = zone_assignment.map(architecture._feeder_positions).to_numpy(dtype=int)
+    architecture._load_assignment(assignment)
+    architecture._load_paths({index: path for _, _, zone_paths, _ in results for index, path in zone_paths.items()})
+
+    # Substations of the boundaries between the zones, removed from their feeder
+    spatial_index = GridIndex(architecture.buses['x'], architecture.buses['y'])
+    neighbours = spatial_index.nearest_neighbours(substations, boundary)
+    on_boundary = _boundary_substations(architecture, zones, neighbours)
+    assignment[substations[on_boundary]] = -1
+    architecture._load_assignment(assignment)
+    removed = set(substations[on_boundary].tolist())
+    for feeder, path in enumerate(architecture._paths):
+        if path is not None:
+            architecture._paths[feeder] = [position for position in path if position not in removed]
+            architecture._lengths[feeder] = architecture.distances[architecture._paths[feeder][:-1],
+                                                                   architecture._paths[feeder][1:]].sum()
+    logger.info('Zones optimized in {:.2f} minutes: {:.0f} meters, {!r} MV/LV substations on the boundaries.'.format(
+        (time.perf_counter() - start) / 60, statistics['length'].sum(), int(on_boundary.sum())))
+
+    # Refinement of the boundaries: the substations of the boundaries are placed greedily and moved alone, the paths
+    # of the zones are kept
+    architecture.buses['feeder'] = architecture._feeder_column()
+    refinement = copy.copy(config)
+    refinement.seed = seeds[-1]
+    refinement.warm_start = True
+    refinement.pin = True
+    refinement.placement = 'random'
+    refinement.checkpoint = None
+    if refinement.neighbours is None:
+        refinement.neighbours = boundary
+    architecture = simulated_annealing(architecture, refinement, observers=observers)
+    logger.info('Boundaries refined: {:.0f} meters in {:.2f} minutes.'.format(
+        architecture.statistics['length'], (time.perf_counter() - start) / 60))
+    architecture.statistics['duration'] = time.perf_counter() - start
+
+    return architecture, statistics
+
+
+def _boundary_substations(architecture, zones, neighbours):
+    """The MV/LV substations on the boundaries between the zones: the substations whose insertion next to one of
+    their nearest MV/LV substations of another zone costs less than `BOUNDARY_SLACK` times the saving of their removal
+    from their path.
+
+    Args:
+        architecture (SecuredFeeder):
+            The architecture with the assignment and the paths of the zones.
+
+        zones (numpy.ndarray):
+            The zone of each MV/LV substation, in the order of `architecture._substations`.
+
+        neighbours (Dict[int, numpy.ndarray]):
+            The position of the nearest buses of each MV/LV substation.
+
+    Returns:
+        numpy.ndarray: For each MV/LV substation, if it is on a boundary.
+    """
+    distances = architecture.distances
+    bus_zones = np.full(len(architecture.buses), -1, dtype=int)
+    bus_zones[architecture._substations] = zones
+    # Buses before and after each MV/LV substation in the path of its feeder
+    previous, following = dict(), dict()
+    for path in architecture._paths:
+        if path is not None:
+            for before, position, after in zip(path[:-2], path[1:-1], path[2:]):
+                previous[position], following[position] = before, after
+    on_boundary = np.zeros(len(zones), dtype=bool)
+    for index, (position, zone) in enumerate(zip(architecture._substations, zones)):
+        position = int(position)
+        nodes = neighbours[position]
+        others = [int(node) for node in nodes[(bus_zones[nodes] >= 0) & (bus_zones[nodes] != zone)]
+                  if int(node) in previous]
+        if not others:
+            continue
+        if position not in previous:
+            on_boundary[index] = True
+            continue
+        before, after = previous[position], following[position]
+        saving = distances[before, position] + distances[position, after] - distances[before, after]
+        starts = [previous[node] for node in others] + others
+        ends = others + [following[node] for node in others]
+        insertion = distances[starts, position] + distances[position, ends] - distances[starts, ends]
+        on_boundary[index] = insertion.min() < BOUNDARY_SLACK * saving
+    return on_boundary
+
+
+def _run_zone(buses, feeders, config, distances, solver, zone, seed):
+    """Run the simulated annealing of a zone and return the feeder of its MV/LV substations, its statistics, the
+    paths of its feeders and the metrics of its temperature steps."""
+    architecture = SecuredFeeder(None, None, feeders=feeders, buses=buses, distances=distances, solver=solver)
+    recorder = TraceRecorder()
+    config = copy.copy(config)
+    config.seed = seed
+    config.warm_start = True
+    config.pin = False
+    config.checkpoint = None
+    architecture = simulated_annealing(architecture, config, observers=[recorder])
+    loads = architecture.buses['type'] == 'mv_load'
+    zone_statistics = dict(zone=zone, feeders=len(feeders), substations=int(loads.sum()), seed=seed,
+                           **architecture.statistics)
+    names = architecture.buses['name'].to_numpy()
+    paths = {index: list(names[path]) for index, path in zip(architecture._feeder_ids, architecture._paths)}
+    return architecture.buses.loc[loads, 'feeder'], zone_statistics, paths, recorder.steps
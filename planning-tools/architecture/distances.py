@@ -0,0 +1,255 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import abc
+import collections
+import logging
+import os
+from multiprocessing import shared_memory
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Available backends for the distances between the buses
+DISTANCES_BACKENDS = ('dense', 'lazy', 'memmap')
+
+# Number of rows computed at once when a memory-mapped matrix is written
+BLOCK_SIZE = 1024
+
+
+class DistanceProvider(abc.ABC):
+
+    def __init__(self, x, y):
+        """Euclidean distances between geographical nodes, indexed by the position of the nodes.
+
+        The distances are read with the indexing of NumPy arrays, e.g. `distances[i, j]`,
+        `distances[path[:-1], path[1:]]` or `distances[np.ix_(rows, columns)]`.
+
+        Args:
+            x (numpy.ndarray):
+                The abscissa of the nodes.
+
+            y (numpy.ndarray):
+                The ordinate of the nodes.
+        """
+        self.x = np.asarray(x, dtype=float)
+        self.y = np.asarray(y, dtype=float)
+
+    def __len__(self):
+        return len(self.x)
+
+    @property
+    def shape(self):
+        return len(self), len(self)
+
+    @abc.abstractmethod
+    def __getitem__(self, key):
+        """The distances between the nodes selected by a pair of indices."""
+
+    def row(self, position):
+        """The distances between a node and all the nodes."""
+        return self[position, np.arange(len(self))]
+
+
+class DenseDistances(DistanceProvider):
+
+    def __init__(self, x, y):
+        """Distances stored in a dense matrix in memory, computed in one vectorized pass."""
+        super().__init__(x, y)
+        self.matrix = _euclidean(self.x[:, np.newaxis], self.y[:, np.newaxis],
+                                 self.x[np.newaxis, :], self.y[np.newaxis, :])
+        self._shared_memory = None
+
+    def __getitem__(self, key):
+        return self.matrix[key]
+
+    def row(self, position):
+        return self.matrix[position]
+
+    def share(self):
+        """Move the matrix in a block of shared memory.
+
+        While the matrix is shared, the provider sent to another process (e.g. through a process pool) attaches to
+        the block instead of copying the matrix. The block is released by `unshare`.
+        """
+        if self._shared_memory is not None:
+            return
+        self._shared_memory = shared_memory.SharedMemory(create=True, size=max(self.matrix.nbytes, 1))
+        matrix = np.ndarray(self.matrix.shape, dtype=self.matrix.dtype, buffer=self._shared_memory.buf)
+        matrix[:] = self.matrix
+        self.matrix = matrix
+
+    def unshare(self):
+        """Copy back the matrix in the memory of the process and release the block of shared memory."""
+        if self._shared_memory is None:
+            return
+        self.matrix = np.array(self.matrix)
+        self._shared_memory.close()
+        self._shared_memory.unlink()
+        self._shared_memory = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        if self._shared_memory is not None:
+            state['matrix'] = None
+            state['_shared_memory'] = self._shared_memory.name
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if state['_shared_memory'] is not None:
+            # The block is owned by the process which shared the matrix, it is only attached here
+            self._shared_memory = shared_memory.SharedMemory(name=state['_shared_memory'])
+            self.matrix = np.ndarray(self.shape, dtype=float, buffer=self._shared_memory.buf)
+
+
+class LazyDistances(DistanceProvider):
+
+    def __init__(self, x, y, cache_size=2 ** 20):
+        """Distances computed on demand from the coordinates of the nodes.
+
+        The memory footprint does not depend on the square of the number of nodes: only the requested distances are
+        computed, and the rows of the most recently used nodes requested by `row` are kept in a LRU cache.
+
+        Args:
+            x (numpy.ndarray):
+                The abscissa of the nodes.
+
+            y (numpy.ndarray):
+                The ordinate of the nodes.
+
+            cache_size (int):
+                The maximum number of distances kept in the cache of rows.
+        """
+        super().__init__(x, y)
+        self.cache_size = cache_size
+        self._rows = collections.OrderedDict()
+
+    def __getitem__(self, key):
+        rows, columns = key
+        return _euclidean(self.x[rows], self.y[rows], self.x[columns], self.y[columns])
+
+    def row(self, position):
+        try:
+            self._rows.move_to_end(position)
+            return self._rows[position]
+        except KeyError:
+            row = _euclidean(self.x[position], self.y[position], self.x, self.y)
+            row.flags.writeable = False
+            self._rows[position] = row
+            while len(self._rows) > 1 and len(self._rows) * len(self) > self.cache_size:
+                self._rows.popitem(last=False)
+            return row
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_rows'] = collections.OrderedDict()
+        return state
+
+
+class MemmapDistances(DistanceProvider):
+
+    def __init__(self, x, y, filename):
+        """Distances stored in a memory-mapped matrix on the disk.
+
+        The matrix is written block by block if the file does not exist or if it does not match the coordinates of
+        the nodes. Otherwise, the file is reused, so the distances are computed only once for several runs.
+
+        Args:
+            x (numpy.ndarray):
+                The abscissa of the nodes.
+
+            y (numpy.ndarray):
+                The ordinate of the nodes.
+
+            filename (str):
+                The NumPy file (`.npy`) of the matrix.
+        """
+        super().__init__(x, y)
+        self.filename = filename
+        if not self._is_valid():
+            self._write()
+        else:
+            logger.info('Reuse of the distances stored in {!r}.'.format(filename))
+        self.matrix = np.load(filename, mmap_mode='r')
+
+    def __getitem__(self, key):
+        return self.matrix[key]
+
+    def row(self, position):
+        return np.asarray(self.matrix[position])
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['matrix'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.matrix = np.load(self.filename, mmap_mode='r')
+
+    def _is_valid(self):
+        """Test if the file exists and matches the coordinates of the nodes."""
+        if not os.path.isfile(self.filename):
+            return False
+        try:
+            matrix = np.load(self.filename, mmap_mode='r')
+        except ValueError:
+            return False
+        if matrix.shape != self.shape:
+            return False
+        for position in {0, len(self) - 1}:
+            expected = _euclidean(self.x[position], self.y[position], self.x, self.y)
+            if not np.allclose(matrix[position], expected):
+                return False
+        return True
+
+    def _write(self):
+        logger.info('Calculation of the distances in {!r}.'.format(self.filename))
+        folder = os.path.dirname(self.filename)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        matrix = np.lib.format.open_memmap(self.filename, mode='w+', dtype=float, shape=self.shape)
+        for start in range(0, len(self), BLOCK_SIZE):
+            stop = min(start + BLOCK_SIZE, len(self))
+            matrix[start:stop] = _euclidean(self.x[start:stop, np.newaxis], self.y[start:stop, np.newaxis],
+                                            self.x[np.newaxis, :], self.y[np.newaxis, :])
+        matrix.flush()
+        del matrix
+
+
+def get_distance_provider(x, y, backend='dense', filename=None):
+    """Build the provider of the distances between geographical nodes.
+
+    Args:
+        x (numpy.ndarray):
+            The abscissa of the nodes.
+
+        y (numpy.ndarray):
+            The ordinate of the nodes.
+
+        backend (str):
+            The backend of the distances, among `DISTANCES_BACKENDS`.
+
+        filename (Optional[str]):
+            The file of the memory-mapped matrix, required by the backend 'memmap'.
+
+    Returns:
+        DistanceProvider: The provider of the distances.
+    """
+    if backend == 'dense':
+        return DenseDistances(x, y)
+    elif backend == 'lazy':
+        return LazyDistances(x, y)
+    elif backend == 'memmap':
+        if filename is None:
+            raise ValueError('The backend \'memmap\' needs the filename of the matrix of distances.')
+        return MemmapDistances(x, y, filename=filename)
+    else:
+        raise ValueError('Unknown backend of distances {!r}, expected one of {!r}.'.format(backend,
+                                                                                         DISTANCES_BACKENDS))
+
+
+def _euclidean(x1, y1, x2, y2):
+    return np.sqrt((x1 - x2) ** 2 + (y1 - y2) ** 2)
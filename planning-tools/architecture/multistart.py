@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import copy
+import logging
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from .distances import DenseDistances
+from .config import AnnealingConfig
+from .secured_feeder import simulated_annealing
+from .telemetry import TraceRecorder
+
+logger = logging.getLogger(__name__)
+
+
+def multistart_annealing(architecture, restarts, jobs=1, config=None, observers=()):
+    """Optimize the architecture of secured feeder with several independent chains of simulated annealing.
+
+    The chains are run in a pool of processes which share the distances between the buses: a dense matrix is moved
+    in shared memory, a memory-mapped matrix is opened again by each process.
+
+    Args:
+        architecture (SecuredFeeder):
+            The description of the secured feeder architecture.
+
+        restarts (int):
+            The number of chains of simulated annealing.
+
+        jobs (int):
+            The number of processes running the chains.
+
+        config (Optional[AnnealingConfig]):
+            The parameters of the simulated annealing. The seed of the configuration is used to draw the seeds of the
+            chains.
+
+        observers (Iterable[AnnealingObserver]):
+            The observers of the optimization. The temperature steps of each chain are recorded in its process and
+            notified to the observers at the end of the chains, with the number of the chain `chain`.
+
+    Returns:
+        Tuple[SecuredFeeder, pandas.DataFrame]:
+            The best architecture found by the chains and the statistics of each chain.
+    """
+    if config is None:
+        config = AnnealingConfig()
+    rng = random.Random(config.seed)
+    seeds = [rng.randrange(2 ** 32) for _ in range(restarts)]
+    logger.info('Optimization with {!r} chains of simulated annealing on {!r} processes.'.format(restarts, jobs))
+
+    shared = jobs > 1 and isinstance(architecture.distances, DenseDistances)
+    if shared:
+        architecture.distances.share()
+    try:
+        if jobs > 1:
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                results = list(executor.map(_run_chain, [architecture] * restarts, [config] * restarts,
+                                            range(restarts), seeds))
+        else:
+            # Each chain starts from the initial architecture, like the copies sent to the processes
+            results = [_run_chain(architecture.copy(), config, chain, chain_seed)
+                       for chain, chain_seed in enumerate(seeds)]
+    finally:
+        if shared:
+            architecture.distances.unshare()
+
+    # Temperature steps of the chains
+    for _, chain_statistics, steps in results:
+        for metrics in steps:
+            for observer in observers:
+                observer.on_step(dict(metrics, chain=chain_statistics['chain']))
+
+    # Statistics of the chains
+    statistics = pd.DataFrame([chain_statistics for _, chain_statistics, _ in results]).set_index('chain')
+    for row in statistics.itertuples():
+        logger.info('Chain {:d} (seed {:d}): {:.0f} meters, {:d} iterations in {:.2f} minutes.'.format(
+            int(row.Index), int(row.seed), row.length, int(row.iterations), row.duration / 60))
+
+    # Best architecture
+    best = int(statistics['objective'].to_numpy().argmin())
+    snapshot, architecture.statistics, _ = results[best]
+    architecture._restore(snapshot)
+    architecture._store_state()
+    logger.info('Best solution: chain {!r} with {:.0f} meters.'.format(best, statistics['length'].iloc[best]))
+    for observer in observers:
+        observer.on_end(architecture.statistics)
+
+    return architecture, statistics
+
+
+def _run_chain(architecture, config, chain, seed):
+    """Run a chain of simulated annealing and return the compact state of its best solution, its statistics and the
+    metrics of its temperature steps."""
+    config = copy.copy(config)
+    config.seed = seed
+    # The chains are not resumable, only the best solution is kept
+    config.checkpoint = None
+    recorder = TraceRecorder()
+    architecture = simulated_annealing(architecture, config, observers=[recorder])
+    chain_statistics = dict(chain=chain, seed=seed, **architecture.statistics)
+    return architecture._snapshot(), chain_statistics, recorder.steps
@@ -0,0 +1,285 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import copy
+import logging
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .config import AnnealingConfig
+from .constraints import ElectricalConstraints
+from .distances import DenseDistances
+from .secured_feeder import simulated_annealing
+from .telemetry import AnnealingObserver, TraceRecorder
+
+logger = logging.getLogger(__name__)
+
+# Default penalties of the square of the load of the feeders explored by the Pareto front (meters per MVA^2)
+BALANCE_WEIGHTS = (0., 10., 100., 1000.)
+
+# Objectives of the Pareto front, all minimized: the total length, the maximum number of MV/LV substations of a
+# feeder and the maximum load of a feeder
+OBJECTIVES = ('length', 'max_substations', 'max_load')
+
+
+class ParetoArchive(AnnealingObserver):
+
+    def __init__(self, architecture, weight=0.):
+        """Observer keeping the non-dominated architectures visited by a simulated annealing: the architecture after
+        each accepted move and the final one. Each architecture is stored as its compact state (see
+        `SecuredFeeder._snapshot`): the assignment vector of the buses and the paths of the feeders.
+
+        Args:
+            architecture (SecuredFeeder):
+                The architecture optimized by the simulated annealing.
+
+            weight (float):
+                The penalty of the balance of the simulated annealing, stored with the architectures.
+        """
+        self.architecture = architecture
+        self.weight = weight
+        self.entries = list()
+        self.snapshots = list()
+
+    def on_accept(self, objective):
+        self.add()
+
+    def on_end(self, statistics):
+        self.add()
+
+    def add(self, entry=None, snapshot=None):
+        """Add an architecture to the archive if it is not dominated, and remove the ones it dominates.
+
+        Args:
+            entry (Optional[Dict]):
+                The objectives and the weight of the architecture. If `None`, the current architecture is added.
+
+            snapshot (Optional[Tuple]):
+                The compact state of the architecture, given with `entry`.
+        """
+        if entry is None:
+            entry = dict(zip(OBJECTIVES, architecture_objectives(self.architecture)), weight=self.weight)
+        kept = list()
+        for position, other in enumerate(self.entries):
+            if _dominates(other, entry) or all(other[name] == entry[name] for name in OBJECTIVES):
+                return
+            if not _dominates(entry, other):
+                kept.append(position)
+        if snapshot is None:
+            # The state is only copied when it enters the archive
+            snapshot = self.architecture._snapshot()
+        self.entries = [self.entries[position] for position in kept] + [entry]
+        self.snapshots = [self.snapshots[position] for position in kept] + [snapshot]
+
+
+def architecture_objectives(architecture):
+    """The objectives of the Pareto front of the current state of an architecture, see `OBJECTIVES`.
+
+    Args:
+        architecture (SecuredFeeder):
+            The description of the secured feeder architecture.
+
+    Returns:
+        Tuple[float, int, float]: The total length, the maximum number of MV/LV substations of a feeder and the maximum
+            load of a feeder.
+    """
+    substations = architecture._substations[architecture._assignment[architecture._substations] >= 0]
+    feeders = architecture._assignment[substations]
+    counts = np.bincount(feeders, minlength=len(architecture.feeders))
+    loads = np.bincount(feeders, weights=architecture._bus_loads[substations], minlength=len(architecture.feeders))
+    return float(architecture._lengths.sum()), int(counts.max()), float(loads.max())
+
+
+def pareto_annealing(architecture, weights=BALANCE_WEIGHTS, jobs=1, config=None, observers=()):
+    """Explore the compromises between the total length and the balance of the feeders.
+
+    A chain of simulated annealing is run for each weight of the balance, in a pool of processes sharing the distances
+    like `multistart_annealing`: the weight is the penalty of the square of the load of each feeder (see
+    `ElectricalConstraints`). Each chain keeps the non-dominated architectures it visits (see `ParetoArchive`) and the
+    archives are merged in the non-dominated set of all the chains, sorted by length. The architecture of the shortest
+    entry is returned; the others can be restored with `architecture_from_front` without running the optimization
+    again.
+
+    Args:
+        architecture (SecuredFeeder):
+            The description of the secured feeder architecture.
+
+        weights (Iterable[float]):
+            The penalties of the square of the load of the feeders (meters per MVA^2), one chain each.
+
+        jobs (int):
+            The number of processes running the chains.
+
+        config (Optional[AnnealingConfig]):
+            The parameters of the simulated annealing. The seed of the configuration is used to draw the seeds of the
+            chains and its electrical constraints are kept in all the chains.
+
+        observers (Iterable[AnnealingObserver]):
+            The observers of the optimization. The temperature steps of each chain are notified at the end of the
+            chains, with the weight of the chain `weight`.
+
+    Returns:
+        Tuple[SecuredFeeder, pandas.DataFrame, List[Tuple]]:
+            The architecture of the shortest entry, the objectives and the weight of the entries of the Pareto front,
+            and the compact state of each entry.
+    """
+    if config is None:
+        config = AnnealingConfig()
+    weights = list(weights)
+    rng = random.Random(config.seed)
+    seeds = [rng.randrange(2 ** 32) for _ in weights]
+    logger.info('Pareto front of {!r} weights of the balance on {!r} processes.'.format(len(weights), jobs))
+
+    shared = jobs > 1 and isinstance(architecture.distances, DenseDistances)
+    if shared:
+        architecture.distances.share()
+    try:
+        if jobs > 1:
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                results = list(executor.map(_run_weight, [architecture] * len(weights), [config] * len(weights),
+                                            weights, seeds))
+        else:
+            # Each chain starts from the initial architecture, like the copies sent to the processes
+            results = [_run_weight(architecture.copy(), config, weight, seed) for weight, seed in zip(weights, seeds)]
+    finally:
+        if shared:
+            architecture.distances.unshare()
+
+    # Temperature steps of the chains
+    for archive, _, steps in results:
+        for metrics in steps:
+            for observer in observers:
+                observer.on_step(dict(metrics, weight=archive.weight))
+
+    # Non-dominated set of the archives of the chains
+    merged = ParetoArchive(architecture)
+    for archive, chain_statistics, _ in results:
+        logger.info('Weight {!r}: {:.0f} meters, {!r} entries in the archive, {!r} iterations in {:.2f} '
+                    'minutes.'.format(archive.weight, chain_statistics['length'], len(archive.entries),
+                                      chain_statistics['iterations'], chain_statistics['duration'] / 60))
+        for entry, snapshot in zip(archive.entries, archive.snapshots):
+            merged.add(entry, snapshot)
+    front = pd.DataFrame(merged.entries, columns=('weight',) + OBJECTIVES)
+    order = np.argsort(front['length'].to_numpy(), kind='stable')
+    front = front.iloc[order].reset_index(drop=True)
+    front.index.name = 'entry'
+    snapshots = [merged.snapshots[position] for position in order]
+    logger.info('Pareto front: {!r} architectures from {:.0f} to {:.0f} meters.'.format(
+        len(front), front['length'].min(), front['length'].max()))
+
+    # Architecture of the shortest entry
+    architecture = architecture_from_front(architecture, snapshots, 0)
+    architecture.statistics.update(iterations=sum(statistics['iterations'] for _, statistics, _ in results),
+                                   steps=sum(statistics['steps'] for _, statistics, _ in results),
+                                   duration=max(statistics['duration'] for _, statistics, _ in results))
+    for observer in observers:
+        observer.on_end(architecture.statistics)
+
+    return architecture, front, snapshots
+
+
+def architecture_from_front(architecture, snapshots, entry):
+    """Restore the architecture of an entry of a Pareto front.
+
+    Args:
+        architecture (SecuredFeeder):
+            The description of the secured feeder architecture.
+
+        snapshots (List[Tuple]):
+            The compact state of each entry, see `pareto_annealing`.
+
+        entry (int):
+            The entry of the front.
+
+    Returns:
+        SecuredFeeder: The architecture of the entry.
+    """
+    if not 0 <= entry < len(snapshots):
+        raise ValueError('Unknown entry {!r} of the Pareto front, {!r} entries.'.format(entry, len(snapshots)))
+    architecture._restore(snapshots[entry])
+    architecture._store_state()
+    architecture.statistics = dict(zip(OBJECTIVES, architecture_objectives(architecture)), entry=entry)
+    return architecture
+
+
+def save_front(filename, front, snapshots, architecture):
+    """Write a Pareto front in a compressed NumPy file: the objectives of the entries, their assignment vectors and the
+    paths of their feeders, all the paths of the front being concatenated.
+
+    Args:
+        filename (str):
+            The name of the file.
+
+        front (pandas.DataFrame):
+            The objectives and the weight of the entries.
+
+        snapshots (List[Tuple]):
+            The compact state of each entry.
+
+        architecture (SecuredFeeder):
+            The architecture of the front, whose buses and feeders are referenced by the compact states.
+    """
+    arrays = {column: front[column].to_numpy() for column in front.columns}
+    paths = [path or [] for snapshot in snapshots for path in snapshot[1]]
+    np.savez_compressed(filename, bus_ids=architecture._bus_ids, feeder_ids=architecture._feeder_ids,
+                        assignments=np.array([snapshot[0] for snapshot in snapshots], dtype=np.int32),
+                        paths=np.array([position for path in paths for position in path], dtype=np.int32),
+                        offsets=np.cumsum([0] + [len(path) for path in paths]),
+                        lengths=np.array([snapshot[2] for snapshot in snapshots], dtype=float), **arrays)
+    logger.info('Pareto front of {!r} architectures written in {!r}.'.format(len(front), filename))
+
+
+def load_front(filename, architecture):
+    """Read a Pareto front written by `save_front`.
+
+    Args:
+        filename (str):
+            The name of the file.
+
+        architecture (SecuredFeeder):
+            The architecture of the front, built from the same input files.
+
+    Returns:
+        Tuple[pandas.DataFrame, List[Tuple]]: The objectives and the weight of the entries, and their compact states.
+    """
+    with np.load(filename) as arrays:
+        if not np.array_equal(arrays['bus_ids'], architecture._bus_ids) \
+                or not np.array_equal(arrays['feeder_ids'], architecture._feeder_ids):
+            raise ValueError('The Pareto front {!r} does not match the buses and the feeders of the '
+                             'architecture.'.format(filename))
+        front = pd.DataFrame({column: arrays[column] for column in ('weight',) + OBJECTIVES})
+        flat, offsets = arrays['paths'].tolist(), arrays['offsets']
+        paths = [flat[start:stop] or None for start, stop in zip(offsets[:-1], offsets[1:])]
+        n_feeders = len(architecture._feeder_ids)
+        snapshots = [(assignment, paths[(entry * n_feeders):((entry + 1) * n_feeders)], lengths)
+                     for entry, (assignment, lengths) in enumerate(zip(arrays['assignments'], arrays['lengths']))]
+    front.index.name = 'entry'
+    return front, snapshots
+
+
+def _run_weight(architecture, config, weight, seed):
+    """Run the chain of simulated annealing of a weight of the balance and return its archive, its statistics and the
+    metrics of its temperature steps."""
+    config = copy.copy(config)
+    config.seed = seed
+    config.checkpoint = None
+    config.constraints = copy.copy(config.constraints) if config.constraints is not None else ElectricalConstraints()
+    config.constraints.balance_penalty = weight
+    archive = ParetoArchive(architecture, weight=weight)
+    recorder = TraceRecorder()
+    architecture = simulated_annealing(architecture, config, observers=[recorder, archive])
+    if not archive.entries:
+        # A single feeder: the architecture is not observed
+        archive.add()
+    # The architecture is not sent back to the main process
+    archive.architecture = None
+    return archive, dict(weight=weight, seed=seed, **architecture.statistics), recorder.steps
+
+
+def _dominates(entry, other):
+    """Whether an entry of the Pareto front is at least as good as another on all the objectives and better on one."""
+    return all(entry[name] <= other[name] for name in OBJECTIVES) \
+        and any(entry[name] < other[name] for name in OBJECTIVES)
@@ -0,0 +1,235 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+# Strategies of initial placement of the MV/LV substations
+PLACEMENTS = ('random', 'sweep', 'corridor', 'kmeans')
+
+# Maximum number of iterations of the capacity-balanced k-means
+KMEANS_ITERATIONS = 20
+
+# Tolerance on the load of the feeders of the capacity-balanced k-means
+KMEANS_SLACK = 0.1
+
+
+def sweep_placement(x, y, loads, sources):
+    """Assign the MV/LV substations to the feeders by angular sectors around their pair of sources.
+
+    Each substation is assigned to the nearest pair of sources (see `corridor_distances`). The substations of a pair
+    are then sorted by their angle around the middle of the pair, measured from the direction of the second source,
+    and split in contiguous sectors of equal load between the feeders of the pair.
+
+    Args:
+        x (numpy.ndarray):
+            The abscissa of the MV/LV substations.
+
+        y (numpy.ndarray):
+            The ordinate of the MV/LV substations.
+
+        loads (numpy.ndarray):
+            The load of the MV/LV substations.
+
+        sources (numpy.ndarray):
+            The coordinates of the sources of each feeder, as an array of rows (x1, y1, x2, y2).
+
+    Returns:
+        numpy.ndarray: The position of the feeder of each MV/LV substation.
+    """
+    def angle(members, pair):
+        x1, y1, x2, y2 = pair
+        direction = np.arctan2(y2 - y1, x2 - x1)
+        return np.mod(np.arctan2(y[members] - (y1 + y2) / 2, x[members] - (x1 + x2) / 2) - direction, 2 * np.pi)
+
+    return _split_pairs(x, y, loads, sources, angle)
+
+
+def corridor_placement(x, y, loads, sources):
+    """Assign the MV/LV substations to the feeders by their distance to the corridor between the sources.
+
+    Each substation is assigned to the nearest pair of sources (see `corridor_distances`). The substations of a pair
+    are then sorted by their signed distance to the line between the sources and split in parallel bands of equal load
+    between the feeders of the pair.
+
+    Args:
+        x (numpy.ndarray):
+            The abscissa of the MV/LV substations.
+
+        y (numpy.ndarray):
+            The ordinate of the MV/LV substations.
+
+        loads (numpy.ndarray):
+            The load of the MV/LV substations.
+
+        sources (numpy.ndarray):
+            The coordinates of the sources of each feeder, as an array of rows (x1, y1, x2, y2).
+
+    Returns:
+        numpy.ndarray: The position of the feeder of each MV/LV substation.
+    """
+    def offset(members, pair):
+        x1, y1, x2, y2 = pair
+        length = np.hypot(x2 - x1, y2 - y1)
+        if length == 0:
+            return np.arctan2(y[members] - y1, x[members] - x1)
+        return ((x2 - x1) * (y[members] - y1) - (y2 - y1) * (x[members] - x1)) / length
+
+    return _split_pairs(x, y, loads, sources, offset)
+
+
+def kmeans_placement(x, y, loads, sources, iterations=KMEANS_ITERATIONS, slack=KMEANS_SLACK):
+    """Assign the MV/LV substations to the feeders with a capacity-balanced k-means.
+
+    The clusters start from the corridor placement. The center of a cluster is the load-weighted mean of its
+    substations and of the two sources of its feeder (weighted by the mean load), so it stays anchored to the sources.
+    At each iteration, the substations are assigned by decreasing regret (difference between the distances to the
+    second nearest and to the nearest center) to the nearest center whose feeder has not reached its capacity, the
+    mean load of the feeders increased by `slack` (see `_capacitated_assignment`).
+
+    Args:
+        x (numpy.ndarray):
+            The abscissa of the MV/LV substations.
+
+        y (numpy.ndarray):
+            The ordinate of the MV/LV substations.
+
+        loads (numpy.ndarray):
+            The load of the MV/LV substations.
+
+        sources (numpy.ndarray):
+            The coordinates of the sources of each feeder, as an array of rows (x1, y1, x2, y2).
+
+        iterations (int):
+            The maximum number of iterations.
+
+        slack (float):
+            The tolerance on the load of the feeders.
+
+    Returns:
+        numpy.ndarray: The position of the feeder of each MV/LV substation.
+    """
+    loads = _positive_loads(loads)
+    n_feeders = len(sources)
+    capacity = loads.sum() / n_feeders * (1 + slack)
+    anchor = loads.mean()
+    assignment = corridor_placement(x, y, loads, sources)
+    for _ in range(iterations):
+        # Centers of the clusters
+        weights = np.bincount(assignment, weights=loads, minlength=n_feeders) + 2 * anchor
+        center_x = (np.bincount(assignment, weights=loads * x, minlength=n_feeders)
+                    + anchor * (sources[:, 0] + sources[:, 2])) / weights
+        center_y = (np.bincount(assignment, weights=loads * y, minlength=n_feeders)
+                    + anchor * (sources[:, 1] + sources[:, 3])) / weights
+        distances = np.hypot(x[:, np.newaxis] - center_x[np.newaxis, :], y[:, np.newaxis] - center_y[np.newaxis, :])
+
+        # Assignment by decreasing regret under the capacity of the feeders
+        new_assignment = _capacitated_assignment(distances, loads, capacity)
+        if np.array_equal(new_assignment, assignment):
+            break
+        assignment = new_assignment
+    return assignment
+
+
+def corridor_distances(x, y, sources):
+    """Calculate the distance between each MV/LV substation and the segment between the sources of each feeder.
+
+    Args:
+        x (numpy.ndarray):
+            The abscissa of the MV/LV substations.
+
+        y (numpy.ndarray):
+            The ordinate of the MV/LV substations.
+
+        sources (numpy.ndarray):
+            The coordinates of the sources of each feeder, as an array of rows (x1, y1, x2, y2).
+
+    Returns:
+        numpy.ndarray: The matrix of distances, with a row per substation and a column per feeder.
+    """
+    x1, y1, x2, y2 = (sources[np.newaxis, :, i] for i in range(4))
+    dx, dy = x2 - x1, y2 - y1
+    squared_length = dx ** 2 + dy ** 2
+    with np.errstate(invalid='ignore', divide='ignore'):
+        t = ((x[:, np.newaxis] - x1) * dx + (y[:, np.newaxis] - y1) * dy) / squared_length
+    t = np.clip(np.nan_to_num(t), 0, 1)
+    return np.hypot(x[:, np.newaxis] - (x1 + t * dx), y[:, np.newaxis] - (y1 + t * dy))
+
+
+def _capacitated_assignment(distances, loads, capacity):
+    """Assign the MV/LV substations to their nearest center whose feeder has not reached its capacity.
+
+    The assignment is made by rounds over the ranks of the centers: at each round, the substations not yet assigned
+    are proposed to their next nearest center, which accepts them by decreasing regret (difference between the
+    distances to the second nearest and to the nearest center) while its load stays under the capacity. The
+    substations rejected by all the centers are assigned to the nearest one.
+
+    Args:
+        distances (numpy.ndarray):
+            The distances between the MV/LV substations and the centers, as a matrix substations x centers.
+
+        loads (numpy.ndarray):
+            The load of the MV/LV substations.
+
+        capacity (float):
+            The maximum load of a feeder.
+
+    Returns:
+        numpy.ndarray: The position of the feeder of each MV/LV substation.
+    """
+    n_substations, n_feeders = distances.shape
+    substations = np.arange(n_substations)
+    preferences = np.argsort(distances, axis=1)
+    if n_feeders > 1:
+        regret = distances[substations, preferences[:, 1]] - distances[substations, preferences[:, 0]]
+    else:
+        regret = np.zeros(n_substations)
+    priority = np.empty(n_substations, dtype=int)
+    priority[np.argsort(-regret, kind='stable')] = substations
+
+    assignment = preferences[:, 0].copy()
+    remaining = np.full(n_feeders, float(capacity))
+    pending = substations
+    for rank in range(n_feeders):
+        if not len(pending):
+            break
+        # Proposals of the round, grouped by center and sorted by priority in each group
+        feeders = preferences[pending, rank]
+        order = np.lexsort((priority[pending], feeders))
+        pending, feeders = pending[order], feeders[order]
+        # Load of each center after the proposals of higher priority
+        cumulated = np.cumsum(loads[pending])
+        offset = np.concatenate([[0.], cumulated])[np.searchsorted(feeders, feeders, side='left')]
+        accepted = cumulated - offset <= remaining[feeders]
+        assignment[pending[accepted]] = feeders[accepted]
+        remaining -= np.bincount(feeders[accepted], weights=loads[pending[accepted]], minlength=n_feeders)
+        pending = pending[~accepted]
+    return assignment
+
+
+def _split_pairs(x, y, loads, sources, key):
+    """Assign the substations to the nearest pair of sources, then split the substations of each pair between its
+    feeders in groups of equal load, contiguous according to `key(members, pair)`."""
+    loads = _positive_loads(loads)
+    pairs, feeder_pairs = np.unique(sources, axis=0, return_inverse=True)
+    feeder_pairs = feeder_pairs.ravel()
+    nearest_pair = feeder_pairs[np.argmin(corridor_distances(x, y, sources), axis=1)]
+    assignment = np.empty(len(x), dtype=int)
+    for pair in range(len(pairs)):
+        feeders = np.flatnonzero(feeder_pairs == pair)
+        members = np.flatnonzero(nearest_pair == pair)
+        if len(members) == 0:
+            continue
+        order = members[np.argsort(key(members, pairs[pair]), kind='stable')]
+        cumulated = np.cumsum(loads[order]) - loads[order] / 2
+        groups = np.minimum((cumulated / loads[order].sum() * len(feeders)).astype(int), len(feeders) - 1)
+        assignment[order] = feeders[groups]
+    return assignment
+
+
+def _positive_loads(loads):
+    """The loads of the substations, a unit load being used if the loads are missing."""
+    loads = np.nan_to_num(np.asarray(loads, dtype=float))
+    loads = np.maximum(loads, 0)
+    if loads.sum() <= 0:
+        return np.ones(len(loads))
+    return loads
@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+import logging
+import os
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Formats of the renderings of an architecture
+RENDER_FORMATS = ('png', 'svg', 'geojson')
+
+# Resolution of the PNG renderings (dots per inch) and size of the figures (inches)
+DPI = 200
+FIGURE_SIZE = (10, 10)
+
+# Colormap of the feeders, its colors are reused cyclically
+COLORMAP = 'tab20'
+
+# Area of the markers of the MV/LV substations (points^2), reduced for the large architectures
+MARKER_SIZE = 20.
+MIN_MARKER_SIZE = 1.
+
+
+def plot_architecture(buses, path_feeders, ax):
+    """Draw an architecture of secured feeders on a matplotlib axes.
+
+    The paths are drawn with one `LineCollection` per feeder and the buses with one scatter per type, so the number of
+    artists does not depend on the number of buses. The MV/LV substations take the color of their feeder.
+
+    Args:
+        buses (pandas.DataFrame):
+            The data frame of buses, indexed by their id, with the columns `type`, `x`, `y` and `feeder`.
+
+        path_feeders (Dict[int, List[int]]):
+            The path of each feeder, given by the ids of its buses.
+
+        ax (matplotlib.axes.Axes):
+            The axes of the figure.
+    """
+    from matplotlib import colormaps
+    from matplotlib.collections import LineCollection
+
+    colormap = colormaps[COLORMAP]
+    feeders = sorted(path_feeders)
+    colors = {feeder: colormap(position % colormap.N) for position, feeder in enumerate(feeders)}
+
+    # Paths of the feeders
+    for feeder in feeders:
+        xy = _path_coordinates(buses, path_feeders[feeder])
+        if xy is None:
+            continue
+        ax.add_collection(LineCollection(np.stack([xy[:-1], xy[1:]], axis=1), colors=[colors[feeder]],
+                                         linewidths=0.8, zorder=1))
+
+    # Buses
+    size = float(np.clip(MARKER_SIZE * 1000 / max(len(buses), 1), MIN_MARKER_SIZE, MARKER_SIZE))
+    loads = buses[buses['type'] == 'mv_load']
+    load_colors = [colors.get(feeder, (0.6, 0.6, 0.6, 1.)) for feeder in loads['feeder']]
+    ax.scatter(loads['x'], loads['y'], s=size, c=load_colors, marker='o', linewidths=0, zorder=2)
+    sources = buses[buses['type'] == 'hv_source']
+    ax.scatter(sources['x'], sources['y'], s=4 * MARKER_SIZE, c='black', marker='s', zorder=3)
+
+    ax.autoscale_view()
+    ax.set_aspect('equal')
+    ax.axis('off')
+
+
+def save_architecture(buses, path_feeders, filename):
+    """Write a rendering of an architecture of secured feeders, without display.
+
+    The format is chosen by the extension of the file: an image ('png' or 'svg') drawn by `plot_architecture`, or a
+    GeoJSON collection of the buses (points) and of the paths of the feeders (lines). The coordinates are the ones of
+    the input files, without reprojection.
+
+    Args:
+        buses (pandas.DataFrame):
+            The data frame of buses, indexed by their id, with the columns `name`, `type`, `s`, `x`, `y` and `feeder`.
+
+        path_feeders (Dict[int, List[int]]):
+            The path of each feeder, given by the ids of its buses.
+
+        filename (str):
+            The name of the file.
+    """
+    extension = os.path.splitext(filename)[1].lower().lstrip('.')
+    if extension not in RENDER_FORMATS:
+        raise ValueError('Unknown format {!r} of rendering, expected one of {!r}.'.format(extension, RENDER_FORMATS))
+    if extension == 'geojson':
+        with open(filename, 'w') as file:
+            json.dump(_geojson(buses, path_feeders), file)
+    else:
+        # The figure is not attached to pyplot, so no graphical backend is needed
+        from matplotlib.figure import Figure
+
+        figure = Figure(figsize=FIGURE_SIZE)
+        plot_architecture(buses, path_feeders, figure.add_subplot())
+        figure.tight_layout()
+        figure.savefig(filename, dpi=DPI)
+    logger.info('Rendering of the architecture written in {!r}.'.format(filename))
+
+
+def _path_coordinates(buses, path):
+    """The coordinates of the buses of a path, `None` if the feeder has not been solved."""
+    if not isinstance(path, list) or len(path) < 2:
+        return None
+    return buses.loc[path, ['x', 'y']].to_numpy(dtype=float)
+
+
+def _geojson(buses, path_feeders):
+    """The GeoJSON feature collection of the buses and of the paths of the feeders."""
+    features = list()
+    for index, name, bus_type, s, x, y, feeder in zip(buses.index, buses['name'], buses['type'], buses['s'],
+                                                      buses['x'], buses['y'], buses['feeder']):
+        features.append({'type': 'Feature', 'geometry': {'type': 'Point', 'coordinates': [float(x), float(y)]},
+                         'properties': {'id': int(index), 'name': name, 'type': bus_type,
+                                        's': None if np.isnan(s) else float(s),
+                                        'feeder': None if np.isnan(feeder) else int(feeder)}})
+    for feeder, path in path_feeders.items():
+        xy = _path_coordinates(buses, path)
+        if xy is None:
+            continue
+        length = float(np.hypot(*np.diff(xy, axis=0).T).sum())
+        features.append({'type': 'Feature', 'geometry': {'type': 'LineString', 'coordinates': xy.tolist()},
+                         'properties': {'feeder': int(feeder), 'length': length, 'nb_substations': len(path) - 2}})
+    return {'type': 'FeatureCollection', 'features': features}
@@ -1,31 +1,34 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import copy
 import logging
 import random
 import time
+from collections import OrderedDict
 
 import numpy as np
 import pandas as pd
-from matplotlib import pyplot as plt
 
-from .utils import tsp_solver
+from .checkpoint import save_checkpoint
+from .config import ALPHA, N_0, N_1, N_2, N_3, REOPTIMIZE, TAU_0, TAU_WARM, AnnealingConfig  # noqa: F401
+from .distances import DistanceProvider, get_distance_provider
+from .placement import corridor_placement, kmeans_placement, sweep_placement
+from .rendering import plot_architecture, save_architecture
+from .spatial_index import GridIndex
+from .utils import EXACT_LIMIT, tsp_solver
 from ..electrical_network.electrical_network import ElectricalNetwork
 
 logger = logging.getLogger(__name__)
 
-# Parameters of the simulated annealing
-N_0 = 100
-TAU_0 = 0.5
-ALPHA = 0.9
-N_1 = 12
-N_2 = 100
-N_3 = 5
+# Maximum number of paths of small feeders kept in the cache of an architecture
+PATH_CACHE_SIZE = 20000
 
 
 class SecuredFeeder:
 
-    def __init__(self, hv_mv_substations, mv_lv_substations, feeders=None, x=None, buses=None, branches=None):
+    def __init__(self, hv_mv_substations, mv_lv_substations, feeders=None, x=None, buses=None, branches=None,
+                 distances='dense', distances_filename=None, solver='insertion', paths=None):
         """Description of a secured feeder architecture.
 
         Args:
@@ -39,7 +42,8 @@ class SecuredFeeder:
                 The data frame of MV feeders.
 
             x (Dict):
-                A dictionary associating each substations to a feeder.
+                A dictionary associating each substations to a feeder. The substations missing from the dictionary
+                are not assigned to a feeder.
 
             buses (pandas.DataFrame):
                 The data frame of electrical buses.
@@ -47,34 +51,43 @@ class SecuredFeeder:
             branches (pandas.DataFrame):
                 The data frame of electrical buses.
 
+            distances (Union[str, DistanceProvider]):
+                The provider of the distances between the buses or the name of its backend ('dense', 'lazy' or
+                'memmap').
+
+            distances_filename (Optional[str]):
+                The file of the memory-mapped matrix of distances, for the backend 'memmap'.
+
+            solver (str):
+                The strategy of resolution of the travelling salesman problem of the feeders ('insertion' or
+                'local-search').
+
+            paths (Optional[Dict]):
+                A dictionary associating feeders to their path in a previous architecture, given by the names of the
+                buses from the first source to the second (see `paths_from_branches`). The warm start of the
+                simulated annealing keeps these paths instead of solving the feeders again.
+
         """
 
         # HV/MV and MV/LV substations
         if buses is None:
-            buses_dict = {'id': [], 'name': [], 'type': [], 's': [], 'x': [], 'y': [], 'feeder': []}
-            idx_bus = 1
-            for index, row in hv_mv_substations.iterrows():
-                buses_dict['id'].append(idx_bus)
-                buses_dict['name'].append('hv' + str(index))
-                buses_dict['type'].append('hv_source')
-                buses_dict['s'].append(None)
-                buses_dict['x'].append(row['x'])
-                buses_dict['y'].append(row['y'])
-                buses_dict['feeder'].append(None)
-                idx_bus += 1
-            for index, row in mv_lv_substations.iterrows():
-                buses_dict['id'].append(idx_bus)
-                buses_dict['name'].append('mv' + str(index))
-                buses_dict['type'].append('mv_load')
-                buses_dict['s'].append(row['P (MW)'])
-                buses_dict['x'].append(row['x'])
-                buses_dict['y'].append(row['y'])
-                if x is None:
-                    buses_dict['feeder'].append(0)
-                else:
-                    buses_dict['feeder'].append(x[index])
-                idx_bus += 1
-            self.buses = pd.DataFrame(buses_dict)
+            nb_hv, nb_mv = len(hv_mv_substations), len(mv_lv_substations)
+            if x is None:
+                mv_feeders = np.zeros(nb_mv)
+            else:
+                mv_feeders = np.array([x.get(index, np.nan) for index in mv_lv_substations.index], dtype=float)
+            self.buses = pd.DataFrame({
+                'id': np.arange(1, nb_hv + nb_mv + 1),
+                'name': np.concatenate([('hv' + hv_mv_substations.index.astype(str)).to_numpy(dtype=object),
+                                        ('mv' + mv_lv_substations.index.astype(str)).to_numpy(dtype=object)]),
+                'type': np.repeat(np.array(['hv_source', 'mv_load'], dtype=object), [nb_hv, nb_mv]),
+                's': np.concatenate([np.full(nb_hv, np.nan), mv_lv_substations['P (MW)'].to_numpy(dtype=float)]),
+                'x': np.concatenate([hv_mv_substations['x'].to_numpy(dtype=float),
+                                     mv_lv_substations['x'].to_numpy(dtype=float)]),
+                'y': np.concatenate([hv_mv_substations['y'].to_numpy(dtype=float),
+                                     mv_lv_substations['y'].to_numpy(dtype=float)]),
+                'feeder': np.concatenate([np.full(nb_hv, np.nan), mv_feeders]),
+            })
         else:
             self.buses = buses
         self.buses = self.buses.set_index('id')
@@ -94,196 +107,840 @@ class SecuredFeeder:
         self.feeders['bus2'] = 0
         self.feeders['length'] = 0
         self.feeders['nb_substations'] = 0
-        self.path_feeders = dict()
-        for index, row in self.feeders.iterrows():
-            self.path_feeders[index] = 0
-            self.feeders.loc[index, 'bus1'] = self.buses[self.buses['name'] == ('hv' + str(row['source1']))].index[0]
-            self.feeders.loc[index, 'bus2'] = self.buses[self.buses['name'] == ('hv' + str(row['source2']))].index[0]
-
-        # Distance between the points
-        self.distances = dict()
-        index = self.buses.index
-        for i in range(0, len(self.buses) - 1):
-            for j in range(i + 1, len(self.buses)):
-                index_1 = index[i]
-                index_2 = index[j]
-                self.distances[index_1, index_2] = np.sqrt((self.buses['x'][index_1] - self.buses['x'][index_2]) ** 2
-                                                           + (self.buses['y'][index_1] - self.buses['y'][index_2]) ** 2)
+        self.path_feeders = {index: 0 for index in self.feeders.index}
+        bus_ids = pd.Series(self.buses.index, index=self.buses['name']).groupby(level=0).first()
+        for column, source in (('bus1', 'source1'), ('bus2', 'source2')):
+            names = 'hv' + self.feeders[source].astype(str)
+            missing = names[~names.isin(bus_ids.index)]
+            if len(missing):
+                raise ValueError('The HV/MV substations {!r} of the feeders are unknown.'.format(
+                    list(missing.unique())))
+            self.feeders[column] = bus_ids[names].to_numpy()
+
+        # Distance between the points, indexed by the position of the buses
+        if isinstance(distances, DistanceProvider):
+            self.distances = distances
+        else:
+            self.distances = get_distance_provider(self.buses['x'], self.buses['y'], backend=distances,
+                                                   filename=distances_filename)
+
+        # Resolution of the travelling salesman problem
+        self.solver = solver
+
+        # Statistics of the last optimization
+        self.statistics = dict()
+
+        # Time spent solving the travelling salesman problem of the feeders (s)
+        self.tsp_time = 0.
+
+        # Paths of the feeders with at most `EXACT_LIMIT` MV/LV substations, by feeder, solver and set of substations,
+        # the least recently used are dropped beyond `PATH_CACHE_SIZE`
+        self._path_cache = OrderedDict()
 
         # Electrical network
         self.electrical_network = ElectricalNetwork(buses=self.buses, branches=self.branches)
 
-    def random_placement(self):
-        for index, row in self.buses[self.buses['type'] == 'mv_load'].iterrows():
-            rdm = random.randint(0, len(self.feeders) - 1)
-            self.buses.loc[index, 'feeder'] = self.feeders.index[rdm]
+        # Compact state of the architecture: the buses and the feeders are referenced by their position in `buses`
+        # and `feeders`, so the optimization does not have to modify the data frames.
+        self._bus_ids = np.asarray(self.buses.index)
+        self._feeder_ids = np.asarray(self.feeders.index)
+        self._feeder_positions = {feeder: position for position, feeder in enumerate(self._feeder_ids)}
+        self._sources = np.stack([self.buses.index.get_indexer(self.feeders['bus1']),
+                                  self.buses.index.get_indexer(self.feeders['bus2'])], axis=1)
+        self._substations = np.flatnonzero(self.buses['type'].to_numpy() == 'mv_load')
+        self._source_feeders = dict()
+        for feeder, (source1, source2) in enumerate(self._sources):
+            for source in {int(source1), int(source2)}:
+                self._source_feeders.setdefault(source, []).append(feeder)
+        self._assignment = np.full(len(self.buses), -1, dtype=int)
+        self._members = [set() for _ in range(len(self.feeders))]
+        self._paths = [None] * len(self.feeders)
+        self._lengths = np.zeros(len(self.feeders))
+        self._bus_loads = np.nan_to_num(self.buses['s'].to_numpy(dtype=float))
+        self._profiles = [None] * len(self.feeders)
+        # Penalty of each feeder for the electrical constraints, with the constraints it has been computed for
+        self._penalties_cache = None
+        self._load_assignment()
+        if paths is not None:
+            self._load_paths(paths)
+
+    def random_placement(self, rng=None):
+        if rng is None:
+            rng = random.Random()
+        for position in self._substations:
+            rdm = rng.randint(0, len(self.feeders) - 1)
+            self._move_substation(position, rdm)
+        self.buses['feeder'] = self._feeder_column()
+
+    def initial_placement(self, strategy='random', rng=None):
+        """Assign the MV/LV substations to the feeders.
+
+        Args:
+            strategy (str):
+                The strategy of placement: uniformly at random ('random'), by angular sectors around the sources of
+                the feeders ('sweep'), by bands along the corridor between the sources ('corridor') or with a
+                capacity-balanced k-means ('kmeans'). See the module `placement`.
+
+            rng (Optional[random.Random]):
+                The random number generator of the random placement.
+        """
+        if strategy == 'random':
+            self.random_placement(rng=rng)
+            return
+        placements = {'sweep': sweep_placement, 'corridor': corridor_placement, 'kmeans': kmeans_placement}
+        if strategy not in placements:
+            raise ValueError('Unknown placement {!r}, expected one of {!r}.'.format(strategy,
+                                                                                 ('random',) + tuple(placements)))
+        x = self.buses['x'].to_numpy(dtype=float)
+        y = self.buses['y'].to_numpy(dtype=float)
+        sources = np.stack([x[self._sources[:, 0]], y[self._sources[:, 0]],
+                            x[self._sources[:, 1]], y[self._sources[:, 1]]], axis=1)
+        loads = self.buses['s'].to_numpy(dtype=float)[self._substations]
+        assignment = np.full(len(self.buses), -1, dtype=int)
+        assignment[self._substations] = placements[strategy](x[self._substations], y[self._substations], loads, sources)
+        self._load_assignment(assignment)
+        self.buses['feeder'] = self._feeder_column()
+
+    def greedy_placement(self):
+        """Assign each MV/LV substation without feeder to the feeder where its insertion increases the least the total
+        length, the paths of the feeders being updated by each insertion."""
+        self._solve_feeders([feeder for feeder, path in enumerate(self._paths) if path is None])
+        for position in self._substations[self._assignment[self._substations] < 0]:
+            best = (np.inf, None, None)
+            for feeder, path in enumerate(self._paths):
+                insertion = self.distances[path[:-1], position] + self.distances[position, path[1:]] \
+                    - self.distances[path[:-1], path[1:]]
+                order = int(np.argmin(insertion))
+                if insertion[order] < best[0]:
+                    best = (insertion[order], feeder, order)
+            cost, feeder, order = best
+            path = self._paths[feeder]
+            self._paths[feeder] = path[:(order + 1)] + [int(position)] + path[(order + 1):]
+            self._profiles[feeder] = None
+            self._penalties_cache = None
+            self._lengths[feeder] += cost
+            self._move_substation(position, feeder)
+        self.buses['feeder'] = self._feeder_column()
+
+    def copy(self):
+        """A deep copy of the architecture, the distances between the buses being shared with the copy."""
+        return copy.deepcopy(self, memo={id(self.distances): self.distances})
 
     def optimize_feeders(self, list_of_feeders=None):
+        # The assignment of the substations may have been modified in the data frame of buses
+        self._load_assignment()
         # List of the feeder to study
         if list_of_feeders is None:
             list_of_feeders = self.feeders.index
-        # Characteristics of the modified branches
-        self.branches = self.branches.loc[~self.branches['feeder'].isin(list_of_feeders), :]
+        total_length = self._solve_feeders([self._feeder_positions[index] for index in list_of_feeders])
+        self._store_state()
+        return total_length
+
+    def _load_assignment(self, assignment=None):
+        """Load the assignment of the MV/LV substations in the compact state.
+
+        Args:
+            assignment (Optional[numpy.ndarray]):
+                The feeder position of each bus (-1 if the bus is not assigned). If `None`, the assignment is read
+                from the column `feeder` of the data frame of buses.
+        """
+        if assignment is None:
+            assignment = self.buses['feeder'].map(self._feeder_positions).fillna(-1).to_numpy(dtype=int)
+        self._assignment = np.array(assignment, dtype=int)
+        self._assignment[self.buses['type'].to_numpy() != 'mv_load'] = -1
+        self._members = [set() for _ in range(len(self.feeders))]
+        for position in self._substations:
+            if self._assignment[position] >= 0:
+                self._members[self._assignment[position]].add(position)
+
+    def _load_paths(self, paths):
+        """Load the paths of the feeders of a previous architecture in the compact state. The buses unknown in this
+        architecture are dropped and the paths which do not join the sources of their feeder are ignored.
+
+        Args:
+            paths (Dict):
+                A dictionary associating feeders to their path, given by the names of the buses.
+        """
+        positions = pd.Series(np.arange(len(self.buses)), index=self.buses['name'].to_numpy()).groupby(level=0).first()
+        for index, names in paths.items():
+            feeder = self._feeder_positions.get(index)
+            if feeder is None:
+                continue
+            path = [int(positions[name]) for name in names if name in positions.index]
+            if len(path) < 2 or path[0] != self._sources[feeder, 0] or path[-1] != self._sources[feeder, 1]:
+                continue
+            self._paths[feeder] = path
+            self._lengths[feeder] = self.distances[path[:-1], path[1:]].sum()
+            self._profiles[feeder] = None
+        self._penalties_cache = None
+
+    def _move_substation(self, position, feeder):
+        """Move a MV/LV substation to another feeder in the compact state, the paths are not updated.
+
+        Args:
+            position (int):
+                The position of the MV/LV substation in the data frame of buses.
+
+            feeder (int):
+                The position of the new feeder in the data frame of feeders.
+        """
+        old_feeder = self._assignment[position]
+        if old_feeder >= 0:
+            self._members[old_feeder].discard(position)
+        self._members[feeder].add(position)
+        self._assignment[position] = feeder
+
+    def _solve_feeders(self, feeders=None, keep=False):
+        """Solve the travelling salesman problem of some feeders of the compact state.
+
+        Args:
+            feeders (Optional[List[int]]):
+                The positions of the feeders to solve. If `None`, all the feeders are solved.
+
+            keep (bool):
+                If `True`, the current path of a feeder which goes through exactly its MV/LV substations is kept,
+                unless the solution of the travelling salesman problem is shorter.
+
+        Returns:
+            float: The total length of the architecture.
+        """
+        if feeders is None:
+            feeders = range(len(self.feeders))
+        for feeder in feeders:
+            path, length = self._solve_feeder(feeder)
+            current = self._paths[feeder]
+            if keep and current is not None and len(current) == len(self._members[feeder]) + 2 \
+                    and set(current[1:-1]) == self._members[feeder]:
+                current_length = self.distances[current[:-1], current[1:]].sum()
+                if current_length <= length:
+                    path, length = current, current_length
+            self._paths[feeder], self._lengths[feeder] = path, length
+            self._profiles[feeder] = None
+        self._penalties_cache = None
+        return self._lengths.sum()
+
+    def _solve_feeder(self, feeder):
+        """The path of a feeder and its length, given by the travelling salesman problem. The paths of the small
+        feeders are cached, since the simulated annealing comes back often to the same sets of substations."""
+        key = None
+        if len(self._members[feeder]) <= EXACT_LIMIT:
+            key = (feeder, self.solver, frozenset(self._members[feeder]))
+            if key in self._path_cache:
+                self._path_cache.move_to_end(key)
+                path, length = self._path_cache[key]
+                return list(path), length
+        hv_points = [int(self._sources[feeder, 0]), int(self._sources[feeder, 1])]
+        points = list(hv_points)
+        points.extend(sorted(self._members[feeder]))
+        start = time.perf_counter()
+        path, length = tsp_solver(points=points, costmatrix=self.distances, init=hv_points, solver=self.solver)
+        self.tsp_time += time.perf_counter() - start
+        if key is not None:
+            self._path_cache[key] = (list(path), length)
+            if len(self._path_cache) > PATH_CACHE_SIZE:
+                self._path_cache.popitem(last=False)
+        return path, length
+
+    def _neighbour_feeders(self, position, neighbours):
+        """The feeders of the nearest buses of a MV/LV substation, its own feeder excluded.
+
+        Args:
+            position (int):
+                The position of the MV/LV substation in the data frame of buses.
+
+            neighbours (numpy.ndarray):
+                The position of the nearest buses of the substation.
+
+        Returns:
+            List[int]: The sorted positions of the feeders.
+        """
+        feeders = set(self._assignment[neighbours].tolist())
+        for neighbour in neighbours:
+            feeders.update(self._source_feeders.get(int(neighbour), ()))
+        feeders.discard(-1)
+        feeders.discard(self._assignment[position])
+        return sorted(feeders)
+
+    def _move_cost(self, position, feeder, constraints=None):
+        """Variation of the objective when a MV/LV substation is moved to another feeder.
+
+        The substation is spliced out of the path of its feeder and inserted where it increases the least the length
+        of the path of the new feeder, so the cost is evaluated in O(length of the paths). The load and the load moment
+        of both feeders are updated from their cached profiles, without walking the paths again.
+
+        Args:
+            position (int):
+                The position of the MV/LV substation in the data frame of buses.
+
+            feeder (int):
+                The position of the new feeder in the data frame of feeders.
+
+            constraints (Optional[ElectricalConstraints]):
+                The electrical constraints of the feeders. If `None`, the objective is the total length.
+
+        Returns:
+            Tuple[float, int]: The variation of the objective and the position of the insertion in the new path.
+        """
+        old_feeder = self._assignment[position]
+        old_path = self._paths[old_feeder]
+        i = old_path.index(position)
+        removal = self.distances[old_path[i - 1], position] + self.distances[position, old_path[i + 1]] \
+            - self.distances[old_path[i - 1], old_path[i + 1]]
+        path = self._paths[feeder]
+        insertion = self.distances[path[:-1], position] + self.distances[position, path[1:]] \
+            - self.distances[path[:-1], path[1:]]
+        order = int(np.argmin(insertion))
+        delta = insertion[order] - removal
+        if constraints is None:
+            return delta, order
+
+        # Old feeder: the buses after the substation get closer to the first HV/MV substation by `removal`
+        load = self._bus_loads[position]
+        old_distances, old_suffix, old_load, old_moment = self._profile(old_feeder)
+        old_lengths = np.array([self._lengths[old_feeder], self._lengths[old_feeder] - removal])
+        old_loads = np.array([old_load, old_load - load])
+        old_moments = np.array([old_moment, old_moment - load * old_distances[i] - removal * old_suffix[i + 1]])
+        # New feeder: the buses after the insertion get farther from the first HV/MV substation by `insertion`
+        distances, suffix, new_load, moment = self._profile(feeder)
+        lengths = np.array([self._lengths[feeder], self._lengths[feeder] + insertion[order]])
+        loads = np.array([new_load, new_load + load])
+        moments = np.array([moment, moment + load * (distances[order] + self.distances[path[order], position])
+                            + insertion[order] * suffix[order + 1]])
+        old_penalty = constraints.penalty(old_loads, old_moments, old_lengths)
+        penalty = constraints.penalty(loads, moments, lengths)
+        return delta + old_penalty[1] - old_penalty[0] + penalty[1] - penalty[0], order
+
+    def _profile(self, feeder):
+        """The profile of a feeder along its path, cached until the path is modified.
+
+        Args:
+            feeder (int):
+                The position of the feeder in the data frame of feeders.
+
+        Returns:
+            Tuple[numpy.ndarray, numpy.ndarray, float, float]:
+                The distance of each bus of the path to the first HV/MV substation, the load of the buses from each bus
+                to the end of the path, the total load and the load moment of the feeder.
+        """
+        if self._profiles[feeder] is None:
+            path = self._paths[feeder]
+            distances = np.concatenate([[0.], np.cumsum(self.distances[path[:-1], path[1:]])])
+            loads = self._bus_loads[path]
+            suffix = np.concatenate([np.cumsum(loads[::-1])[::-1], [0.]])
+            self._profiles[feeder] = (distances, suffix, suffix[0], float(np.dot(loads, distances)))
+        return self._profiles[feeder]
+
+    def _objective(self, constraints=None):
+        """The total length of the architecture, with the penalties of the electrical constraints if any."""
+        if constraints is None:
+            return self._lengths.sum()
+        return self._lengths.sum() + self._penalties(constraints).sum()
+
+    def _penalties(self, constraints, feeders=None):
+        """The penalty of each feeder for the electrical constraints, cached for the constraints.
+
+        Args:
+            constraints (ElectricalConstraints):
+                The electrical constraints of the feeders.
+
+            feeders (Optional[Iterable[int]]):
+                The positions of the feeders modified since the last call. If `None` or if the cache has been computed
+                for other constraints, the penalties of all the feeders are computed again.
+
+        Returns:
+            numpy.ndarray: The penalty of each feeder.
+        """
+        if self._penalties_cache is None or self._penalties_cache[0] is not constraints:
+            self._penalties_cache = (constraints, np.zeros(len(self.feeders)))
+            feeders = None
+        penalties = self._penalties_cache[1]
+        if feeders is None:
+            feeders = range(len(self.feeders))
+        feeders = [feeder for feeder in feeders if self._paths[feeder] is not None]
+        if feeders:
+            profiles = [self._profile(feeder) for feeder in feeders]
+            penalties[feeders] = constraints.penalty(np.array([profile[2] for profile in profiles]),
+                                                     np.array([profile[3] for profile in profiles]),
+                                                     self._lengths[feeders])
+        return penalties
+
+    def _apply_move(self, position, feeder, order, reoptimize=False, constraints=None):
+        """Move a MV/LV substation to another feeder and update the paths of the compact state.
+
+        Args:
+            position (int):
+                The position of the MV/LV substation in the data frame of buses.
+
+            feeder (int):
+                The position of the new feeder in the data frame of feeders.
+
+            order (int):
+                The position of the insertion in the new path, as given by `_move_cost`.
+
+            reoptimize (bool):
+                If `True`, the travelling salesman problem of both modified feeders is solved again and the new paths
+                are kept if they are shorter than the spliced ones.
+
+            constraints (Optional[ElectricalConstraints]):
+                The electrical constraints of the feeders. If `None`, the objective is the total length.
+
+        Returns:
+            float: The objective of the architecture (see `_objective`).
+        """
+        old_feeder = self._assignment[position]
+        old_path = self._paths[old_feeder]
+        i = old_path.index(position)
+        self._paths[old_feeder] = old_path[:i] + old_path[(i + 1):]
+        path = self._paths[feeder]
+        self._paths[feeder] = path[:(order + 1)] + [int(position)] + path[(order + 1):]
+        self._move_substation(position, feeder)
+        for modified_feeder in (old_feeder, feeder):
+            path = self._paths[modified_feeder]
+            self._lengths[modified_feeder] = self.distances[path[:-1], path[1:]].sum()
+            if reoptimize:
+                new_path, length = self._solve_feeder(modified_feeder)
+                if length < self._lengths[modified_feeder]:
+                    self._paths[modified_feeder], self._lengths[modified_feeder] = new_path, length
+            self._profiles[modified_feeder] = None
+        if constraints is None:
+            return self._lengths.sum()
+        # Only the penalties of both modified feeders are computed again
+        return self._lengths.sum() + self._penalties(constraints, (old_feeder, feeder)).sum()
+
+    def _snapshot(self):
+        """A copy of the compact state, to be restored with `_restore`: the assignment vector, the paths, the lengths
+        and the cached penalties of the feeders. The penalties are not written in the files."""
+        penalties = None
+        if self._penalties_cache is not None:
+            penalties = (self._penalties_cache[0], self._penalties_cache[1].copy())
+        return self._assignment.copy(), [list(path) if path is not None else None for path in self._paths], \
+            self._lengths.copy(), penalties
+
+    def _restore(self, snapshot):
+        assignment, paths, lengths = snapshot[:3]
+        self._load_assignment(assignment)
+        self._paths = [list(path) if path is not None else None for path in paths]
+        self._lengths = lengths.copy()
+        self._profiles = [None] * len(self.feeders)
+        # The snapshots read from a file have no penalties
+        self._penalties_cache = None
+        if len(snapshot) > 3 and snapshot[3] is not None:
+            self._penalties_cache = (snapshot[3][0], snapshot[3][1].copy())
+
+    def _feeder_column(self):
+        """The column `feeder` of the data frame of buses built from the compact state."""
+        assigned = self._assignment >= 0
+        return np.where(assigned, self._feeder_ids[np.where(assigned, self._assignment, 0)], np.nan)
+
+    def _store_state(self):
+        """Write the compact state in the data frames of buses, feeders and branches."""
+        self.buses['feeder'] = self._feeder_column()
+        self.feeders['length'] = self._lengths
+        self.feeders['nb_substations'] = [len(members) for members in self._members]
         branches_dict = {'id': [], 'name': [], 'bus1': [], 'bus2': [], 'type': [], 'type_name': [], 'length': [],
                          'state': [], 'feeder': []}
-        # For each feeder, resolution of the travelling salesman problem
-        for index in list_of_feeders:
-            hv_points = [self.feeders.loc[index, 'bus1'], self.feeders.loc[index, 'bus2']]
-            mv_points = list(self.buses[self.buses['feeder'] == index].index)
-            points = list(hv_points)
-            points.extend(mv_points)
-            self.path_feeders[index], self.feeders.loc[index, 'length'] = tsp_solver(points=points,
-                                                                                     costmatrix=self.distances,
-                                                                                     init=hv_points)
-            self.feeders.loc[index, 'nb_substations'] = len(mv_points)
-            for ind in range(len(self.path_feeders[index]) - 1):
-                bus1 = int(self.path_feeders[index][ind])
-                bus2 = int(self.path_feeders[index][ind + 1])
-                branches_dict['id'].append(ind)
+        for feeder, path in enumerate(self._paths):
+            if path is None:
+                continue
+            index = self._feeder_ids[feeder]
+            self.path_feeders[index] = list(self._bus_ids[path])
+            for ind in range(len(path) - 1):
+                bus1 = int(self._bus_ids[path[ind]])
+                bus2 = int(self._bus_ids[path[ind + 1]])
+                branches_dict['id'].append(len(branches_dict['id']))
                 branches_dict['name'].append('feeder_{}_line_{}'.format(index, ind))
                 branches_dict['bus1'].append(bus1)
                 branches_dict['bus2'].append(bus2)
                 branches_dict['type'].append('line')
                 branches_dict['type_name'].append(None)
-                branches_dict['length'].append(self.distances[min([bus1, bus2]), max([bus1, bus2])])
+                branches_dict['length'].append(self.distances[path[ind], path[ind + 1]])
                 branches_dict['state'].append(True)
                 branches_dict['feeder'].append(index)
-        self.branches = self.branches.append(pd.DataFrame(branches_dict))
-        # Reindex branches
-        self.branches.loc[:, 'id'] = range(len(self.branches))
-        # Calculation of total length
-        total_length = self.feeders['length'].sum()
-        return total_length
+        self.branches = pd.DataFrame(branches_dict).set_index('id')
+        self.electrical_network = ElectricalNetwork(buses=self.buses, branches=self.branches)
 
-    def display(self):
-        figure = plt.figure()
-        ax = plt.subplot()
-        ax.axis('equal')
-        ax.axis('off')
-        for index, row in self.buses.iterrows():
-            if row['type'] == 'hv_source':
-                ax.plot(row['x'], row['y'], 'sk')
-            else:
-                ax.plot(row['x'], row['y'], 'or')
-        for path in self.path_feeders.values():
-            for i in range(len(path) - 1):
-                ax.plot([self.buses['x'][path[i]], self.buses['x'][path[i + 1]]],
-                        [self.buses['y'][path[i]], self.buses['y'][path[i + 1]]],
-                        '-b')
-        figure.tight_layout()
+    def display(self, ax=None):
+        """Draw the architecture, see `plot_architecture`.
+
+        Args:
+            ax (Optional[matplotlib.axes.Axes]):
+                The axes of the figure. If `None`, a new figure is created with pyplot.
+
+        Returns:
+            matplotlib.axes.Axes: The axes of the figure.
+        """
+        if ax is None:
+            # matplotlib is only imported when a figure is requested
+            from matplotlib import pyplot as plt
+
+            figure = plt.figure()
+            ax = figure.add_subplot()
+        plot_architecture(self.buses, self.path_feeders, ax)
+        ax.figure.tight_layout()
+        return ax
+
+    def save_rendering(self, filename):
+        """Write a rendering of the architecture (PNG, SVG or GeoJSON), without display, see `save_architecture`.
+
+        Args:
+            filename (str):
+                The name of the file, its extension gives the format.
+        """
+        save_architecture(self.buses, self.path_feeders, filename)
+
+
+def default_feeders(hv_mv_substations):
+    """The MV feeders of an architecture without configuration: a feeder between each pair of HV/MV substations.
+
+    Args:
+        hv_mv_substations (pandas.DataFrame):
+            The data frame of HV/MV substations.
+
+    Returns:
+        pandas.DataFrame: The data frame of MV feeders.
+    """
+    feeders_dict = ({'id': [], 'name': [], 'source1': [], 'source2': []})
+    idx = 1
+    for i in range(0, len(hv_mv_substations) - 1):
+        for j in range(i + 1, len(hv_mv_substations)):
+            feeders_dict['id'].append(idx)
+            feeders_dict['name'].append('feeder_' + str(idx))
+            feeders_dict['source1'].append(hv_mv_substations.index[i])
+            feeders_dict['source2'].append(hv_mv_substations.index[j])
+            idx += 1
+    feeders = pd.DataFrame(feeders_dict)
+    return feeders.set_index('id')
+
+
+def assignment_from_buses(buses, mv_lv_substations):
+    """Read the assignment of the MV/LV substations to the feeders in the data frame of buses of a previous
+    architecture, e.g. to warm start the simulated annealing.
+
+    Args:
+        buses (pandas.DataFrame):
+            The data frame of electrical buses of the previous architecture.
+
+        mv_lv_substations (pandas.DataFrame):
+            The data frame of MV/LV substations.
+
+    Returns:
+        Dict: A dictionary associating the MV/LV substations of the previous architecture to a feeder.
+    """
+    feeders = buses.loc[(buses['type'] == 'mv_load') & buses['feeder'].notna()].set_index('name')['feeder']
+    x = dict()
+    for index in mv_lv_substations.index:
+        name = 'mv' + str(index)
+        if name in feeders.index:
+            x[index] = feeders[name]
+    return x
+
+
+def paths_from_branches(buses, branches):
+    """Read the paths of the feeders in the data frames of buses and branches of a previous architecture, e.g. to
+    warm start the simulated annealing. The branches of each feeder are written in the order of its path.
+
+    Args:
+        buses (pandas.DataFrame):
+            The data frame of electrical buses of the previous architecture, indexed by the id of the buses.
 
+        branches (pandas.DataFrame):
+            The data frame of branches of the previous architecture.
 
-def simulated_annealing(architecture):
+    Returns:
+        Dict: A dictionary associating the feeders to their path, given by the names of the buses. The feeders whose
+        branches do not form a path are missing from the dictionary.
+    """
+    names = buses['name']
+    paths = dict()
+    for index, lines in branches.loc[branches['feeder'].notna()].groupby('feeder', sort=False):
+        bus1, bus2 = lines['bus1'].to_numpy(), lines['bus2'].to_numpy()
+        if not np.array_equal(bus1[1:], bus2[:-1]) or not np.isin(bus1, names.index).all() \
+                or not np.isin(bus2, names.index).all():
+            logger.warning('The branches of the feeder {!r} do not form a path.'.format(index))
+            continue
+        paths[int(index)] = list(names[np.append(bus1[:1], bus2)])
+    return paths
+
+
+def simulated_annealing(architecture, config=None, observers=(), resume=None):
     """Optimize the architecture of secured feeder with an adapted simulated annealing.
 
+    The optimization stops when the best solution has not been improved for `n_3` temperature steps or when the
+    budget of iterations or time of the configuration is exhausted; the best solution found is then returned.
+
+    The observers are notified at each temperature step with the metrics: `step`, `temperature`, `iterations`
+    (since the beginning), `moves` and `accepted` (in the step), `accept_rate`, `improving` (accepted moves decreasing
+    the objective), `current` and `best` (objective), `moves_per_second`, `duration` (of the step, s), `tsp_time`
+    (time spent in `tsp_solver` during the step, s) and `other_time` (evaluation of the moves and bookkeeping, s).
+
+    If `config.checkpoint` is set, the state of the optimization is written in this file every
+    `config.checkpoint_interval` seconds and at the end. An optimization resumed from a checkpoint continues exactly
+    as if it had not been stopped: with the same configuration, the same solution is found.
+
     Args:
         architecture (SecuredFeeder):
             The description of the secured feeder architecture.
 
+        config (Optional[AnnealingConfig]):
+            The parameters of the simulated annealing. If `None`, the default parameters are used.
+
+        observers (Iterable[AnnealingObserver]):
+            The observers of the optimization, see the module `telemetry`.
+
+        resume (Optional[Dict]):
+            The state of an optimization to continue, read by `load_checkpoint`. The budgets of the configuration
+            include the iterations and the time of the optimization before the checkpoint.
+
     Return:
         architecture (SecuredFeeder):
             The description of the secured feeder architecture optimized by simulated annealing.
     """
 
-    # Characteristics of the architecture
-    n_substations = len(architecture.buses[architecture.buses['type'] == 'mv_load'])
-    index_substations = list(architecture.buses[architecture.buses['type'] == 'mv_load'].index)
-    list_of_feeders = list(architecture.feeders.index)
-
-    # Initialization
-    architecture.random_placement()
-    d_ini = architecture.optimize_feeders()
-    delta_0 = list()
-    while True:
-        d_new, architecture, idx_substation, idx_feeder, new_idx_feeder = _elementary_change(architecture,
-                                                                                             index_substations,
-                                                                                             list_of_feeders)
-        if d_new > d_ini:
-            delta_0.append(d_new - d_ini)
-        if len(delta_0) == N_0:
-            break
-    t_0 = -np.mean(delta_0) / np.log(TAU_0 / 100)
+    if config is None:
+        config = AnnealingConfig()
+    rng = random.Random(config.seed)
+    constraints = config.constraints
+
+    # Characteristics of the architecture, the substations and the feeders are referenced by their position
+    index_substations = list(architecture._substations)
+    list_of_feeders = list(range(len(architecture.feeders)))
+    if len(list_of_feeders) == 1:
+        # A single feeder: all the substations are assigned to it, there is nothing to optimize
+        logger.warning('A single feeder, the MV/LV substations are all assigned to it.')
+        architecture._load_assignment(np.zeros(len(architecture.buses), dtype=int))
+        architecture._solve_feeders()
+        architecture._store_state()
+        architecture.statistics = {'length': architecture._lengths.sum(),
+                                   'objective': architecture._objective(constraints), 'iterations': 0, 'steps': 0,
+                                   'duration': 0.}
+        return architecture
+    neighbours = None
+    if config.neighbours is not None:
+        # Moves restricted to the feeders of the nearest buses
+        spatial_index = GridIndex(architecture.buses['x'], architecture.buses['y'])
+        neighbours = spatial_index.nearest_neighbours(architecture._substations, config.neighbours)
+
+    if resume is not None:
+        # Initialization from a checkpoint: the current state of the interrupted optimization
+        if not np.array_equal(resume['bus_ids'], architecture._bus_ids):
+            raise ValueError('The checkpoint does not match the buses of the architecture.')
+        architecture._restore(resume['current'])
+        index_substations = list(resume['index_substations'])
+        t_0 = resume['counters']['t_0']
+        d_ini = resume['counters']['d_ini']
+    elif config.warm_start:
+        # Initialization from the current assignment: the new substations are placed greedily
+        architecture._load_assignment()
+        new_substations = list(architecture._substations[architecture._assignment[architecture._substations] < 0])
+        logger.info('Warm start: {!r} new substations placed greedily.'.format(len(new_substations)))
+        # The paths of the previous architecture are kept, unless solving their feeder again gives a shorter path
+        architecture._solve_feeders(keep=True)
+        architecture.greedy_placement()
+        d_ini = architecture._objective(constraints)
+        if config.pin:
+            index_substations = new_substations
+        t_0 = _initial_temperature(architecture, index_substations, list_of_feeders, rng, config,
+                                   neighbours)
+    elif config.placement != 'random':
+        # Initialization from a placement strategy
+        architecture.initial_placement(config.placement)
+        architecture._solve_feeders()
+        d_ini = architecture._objective(constraints)
+        logger.info('Placement {!r}: {:.0f} meters.'.format(config.placement, d_ini))
+        t_0 = _initial_temperature(architecture, index_substations, list_of_feeders, rng, config,
+                                   neighbours)
+    else:
+        # Initialization: random walk to estimate the mean increase of the total length
+        architecture.random_placement(rng=rng)
+        architecture._solve_feeders()
+        d_ini = architecture._objective(constraints)
+        delta_0 = list()
+        while True:
+            delta, idx_substation, new_idx_feeder, order = _elementary_change(architecture, index_substations,
+                                                                              list_of_feeders, rng, neighbours,
+                                                                              constraints)
+            if delta > 0:
+                delta_0.append(delta)
+            d_ini = architecture._apply_move(idx_substation, new_idx_feeder, order, constraints=constraints)
+            if len(delta_0) == config.n_0:
+                break
+        t_0 = -np.mean(delta_0) / np.log(config.tau_0 / 100)
+    n_substations = len(index_substations)
 
     # Optimization
     t = t_0
     ite = 0
     n_steps = 0  # number of temperature steps
     n_pos = 0  # number of positive modifications
+    n_acc = 0  # number of accepted modifications
     n_tot = 0  # number of total tentatives
     d_opt = [d_ini]
-    x_opt = architecture.buses['feeder']
+    x_opt = architecture._snapshot()
+    elapsed = 0.  # duration of the optimization before the checkpoint
+    finished = False
+    if resume is not None:
+        counters = resume['counters']
+        t, ite, n_steps, elapsed, finished = counters['t'], counters['ite'], counters['n_steps'], \
+            counters['elapsed'], counters['finished']
+        n_pos, n_acc, n_tot = counters['n_pos'], counters['n_acc'], counters['n_tot']
+        d_opt = list(resume['d_opt'])
+        x_opt = resume['best']
+        rng.setstate(resume['rng'])
+        logger.info('Optimization resumed after {!r} iterations.'.format(ite))
     logger.info('Begining of the optimization.')
     logger.info('Step {!r} : T = {:.0f}°'.format(n_steps, t_0))
-    start = time.perf_counter()
-    while True:
+    for observer in observers:
+        observer.on_start({'temperature': t_0, 'length': d_ini, 'substations': n_substations})
+    start = time.perf_counter() - elapsed
+    tsp_start = architecture.tsp_time
+    step_start, step_tsp = time.perf_counter(), tsp_start
+    last_checkpoint = time.perf_counter()
+    interrupted = False
+
+    def step_metrics():
+        # Metrics of the current temperature step, for the observers
+        duration = time.perf_counter() - step_start
+        tsp_time = architecture.tsp_time - step_tsp
+        return {'step': n_steps, 'temperature': t, 'iterations': ite, 'moves': n_tot, 'accepted': n_acc,
+                'accept_rate': n_acc / n_tot if n_tot else 0., 'improving': n_pos, 'current': d_ini,
+                'best': min(d_opt), 'moves_per_second': n_tot / duration if duration > 0 else 0.,
+                'duration': duration, 'tsp_time': tsp_time, 'other_time': duration - tsp_time}
+
+    def checkpoint():
+        # State of the optimization, written in the checkpoint
+        counters = {'t': t, 't_0': t_0, 'ite': ite, 'n_steps': n_steps, 'n_pos': n_pos, 'n_acc': n_acc,
+                    'n_tot': n_tot, 'd_ini': d_ini, 'elapsed': time.perf_counter() - start, 'finished': finished}
+        save_checkpoint(config.checkpoint, {'bus_ids': architecture._bus_ids, 'current': architecture._snapshot(),
+                                            'best': x_opt, 'index_substations': index_substations, 'd_opt': d_opt,
+                                            'rng': rng.getstate(), 'counters': counters})
+
+    while index_substations and not finished:
         try:
             # Elementary modification of the architecture
-            d_new, architecture, idx_substation, idx_feeder, new_idx_feeder = _elementary_change(architecture,
-                                                                                                 index_substations,
-                                                                                                 list_of_feeders)
-            logger.debug('New solution : {:.0f} m (Best solution {:.0f} m)'.format(d_new, d_opt[n_steps]))
+            delta, idx_substation, new_idx_feeder, order = _elementary_change(architecture, index_substations,
+                                                                              list_of_feeders, rng, neighbours,
+                                                                              constraints)
+            logger.debug('New solution : {:.0f} m (Best solution {:.0f} m)'.format(d_ini + delta, d_opt[n_steps]))
 
-            # Evaluation of the modification
-            if d_new > d_ini:
+            # Evaluation of the modification, the architecture is modified only if it is accepted
+            if delta > 0:
                 # The total length increases: Metropolis test
-                r = random.random()
-                if r > np.exp(-(d_new - d_ini) / t):
-                    # Modification not accepted
-                    architecture.buses.loc[idx_substation, 'feeder'] = idx_feeder
-                    architecture.optimize_feeders(list_of_feeders=[idx_feeder, new_idx_feeder])
-                else:
-                    # Modification accepted
-                    d_ini = d_new
+                accepted = rng.random() <= np.exp(-delta / t)
             else:
                 # The total length decreases: modification accepted
-                d_ini = d_new
+                accepted = True
                 n_pos += 1
-                # Best solution
+            if accepted:
+                d_ini = architecture._apply_move(idx_substation, new_idx_feeder, order,
+                                                 reoptimize=config.reoptimize, constraints=constraints)
+                n_acc += 1
+                for observer in observers:
+                    observer.on_accept(d_ini)
+                # Best solution, also after an increasing move: the paths solved again may be shorter
                 if d_ini < d_opt[n_steps]:
                     d_opt[n_steps] = d_ini
-                    x_opt = list(architecture.buses['feeder'])
+                    x_opt = architecture._snapshot()
                     logger.info('New optimum: {:.0f} meters.'.format(d_opt[n_steps]))
             n_tot += 1
+            ite += 1
 
             # Test for temperature step
-            if n_pos >= N_1 * n_substations or n_tot >= N_2 * n_substations:
+            if n_pos >= config.n_1 * n_substations or n_tot >= config.n_2 * n_substations:
+                metrics = step_metrics()
+                for observer in observers:
+                    observer.on_step(metrics)
                 d_opt.append(d_opt[n_steps])
-                t *= ALPHA
+                t *= config.alpha
                 n_steps += 1
                 logger.info('Step {!r} : T = {:.0f}°C ({!r} accepted / {!r})'.format(n_steps, t, n_pos, n_tot))
                 n_pos = 0
+                n_acc = 0
                 n_tot = 0
+                step_start, step_tsp = time.perf_counter(), architecture.tsp_time
 
             # Test: end of the simulation
-            if len(d_opt) > N_3:
-                if d_opt[n_steps] == d_opt[n_steps - N_3 + 1]:
+            if len(d_opt) > config.n_3:
+                if d_opt[n_steps] == d_opt[n_steps - config.n_3 + 1]:
+                    finished = True
                     break
             if t < 1e-3:
+                finished = True
                 break
 
-            ite += 1
+            # Test: budget of the simulation
+            if config.max_iterations is not None and ite >= config.max_iterations:
+                logger.warning('Optimization stopped after {!r} iterations.'.format(ite))
+                break
+            if config.max_time is not None and time.perf_counter() - start >= config.max_time:
+                logger.warning('Optimization stopped after {:.2f} minutes.'.format(config.max_time / 60))
+                break
+
+            # Periodic checkpoint
+            if config.checkpoint is not None and time.perf_counter() - last_checkpoint >= config.checkpoint_interval:
+                checkpoint()
+                last_checkpoint = time.perf_counter()
 
         except KeyboardInterrupt:
             logger.warning('Optimization interrupted by the user.')
+            interrupted = True
             break
 
     end = time.perf_counter()
+    if config.checkpoint is not None and not interrupted:
+        # The state of an interrupted iteration may be inconsistent, the last periodic checkpoint is kept
+        checkpoint()
+        logger.info('Checkpoint written in {!r}.'.format(config.checkpoint))
+    if n_tot > 0:
+        # Last incomplete temperature step
+        metrics = step_metrics()
+        for observer in observers:
+            observer.on_step(metrics)
 
     logger.info('End of the optimization ({:.2f} minutes).'.format((end - start) / 60))
-    architecture.buses['feeder'] = x_opt
-    architecture.optimize_feeders()
+    architecture._restore(x_opt)
+    architecture._store_state()
+    architecture.statistics = {'length': architecture._lengths.sum(),
+                               'objective': architecture._objective(constraints), 'iterations': ite, 'steps': n_steps,
+                               'duration': end - start, 'tsp_time': architecture.tsp_time - tsp_start,
+                               'store_time': time.perf_counter() - end}
+    for observer in observers:
+        observer.on_end(architecture.statistics)
+    if constraints is not None:
+        logger.info('Penalty of the electrical constraints: {:.0f} meters.'.format(
+            architecture.statistics['objective'] - architecture.statistics['length']))
 
     return architecture
 
 
-def _elementary_change(architecture, index_substations, list_of_feeders):
-    # Elementary modification of the architecture
-    idx_substation = random.choice(index_substations)
-    idx_feeder = architecture.buses.loc[idx_substation, 'feeder']
-    new_list_of_feeders = [x for x in list_of_feeders if x != idx_feeder]
-    new_idx_feeder = random.choice(new_list_of_feeders)
-    architecture.buses.loc[idx_substation, 'feeder'] = new_idx_feeder
-    d_new = architecture.optimize_feeders(list_of_feeders=[idx_feeder, new_idx_feeder])
-    logger.debug('Moving substation {} from feeder {} to {}'.format(idx_substation, idx_feeder, new_idx_feeder))
-
-    return d_new, architecture, idx_substation, idx_feeder, new_idx_feeder
+def _initial_temperature(architecture, index_substations, list_of_feeders, rng, config, neighbours=None):
+    """Initial temperature of a start from a given assignment, the increases of the total length being sampled without
+    modifying the architecture."""
+    delta_0 = list()
+    for _ in range(config.n_0 * 100):
+        if not index_substations or len(delta_0) == config.n_0:
+            break
+        delta = _elementary_change(architecture, index_substations, list_of_feeders, rng, neighbours,
+                                   config.constraints)[0]
+        if delta > 0:
+            delta_0.append(delta)
+    if not delta_0:
+        return 1e-3
+    return -np.mean(delta_0) / np.log(config.tau_warm / 100)
+
+
+def _elementary_change(architecture, index_substations, list_of_feeders, rng, neighbours=None, constraints=None):
+    # Elementary modification of the architecture, evaluated without modifying the architecture
+    idx_substation = rng.choice(index_substations)
+    idx_feeder = architecture._assignment[idx_substation]
+    new_list_of_feeders = None
+    if neighbours is not None:
+        new_list_of_feeders = architecture._neighbour_feeders(idx_substation, neighbours[int(idx_substation)])
+    if not new_list_of_feeders:
+        new_list_of_feeders = [x for x in list_of_feeders if x != idx_feeder]
+    new_idx_feeder = rng.choice(new_list_of_feeders)
+    delta, order = architecture._move_cost(idx_substation, new_idx_feeder, constraints)
+    logger.debug('Moving substation {} from feeder {} to {}'.format(architecture._bus_ids[idx_substation],
+                                                                   architecture._feeder_ids[idx_feeder],
+                                                                   architecture._feeder_ids[new_idx_feeder]))
+
+    return delta, idx_substation, new_idx_feeder, order
@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+# Mean number of nodes per cell of the grid
+NODES_PER_CELL = 4
+
+
+class GridIndex:
+
+    def __init__(self, x, y, cell_size=None):
+        """Spatial index of geographical nodes on a regular grid, for nearest neighbours queries.
+
+        Args:
+            x (numpy.ndarray):
+                The abscissa of the nodes.
+
+            y (numpy.ndarray):
+                The ordinate of the nodes.
+
+            cell_size (Optional[float]):
+                The size of the cells of the grid. If `None`, the size is chosen to have about `NODES_PER_CELL` nodes
+                per cell.
+        """
+        self.x = np.asarray(x, dtype=float)
+        self.y = np.asarray(y, dtype=float)
+        self.x_min, self.y_min = self.x.min(), self.y.min()
+        width = max(self.x.max() - self.x_min, self.y.max() - self.y_min)
+        if cell_size is None:
+            cell_size = width * np.sqrt(NODES_PER_CELL / len(self.x))
+        self.cell_size = cell_size if cell_size > 0 else 1.0
+        self.nb_cells = int((self.y.max() - self.y_min) // self.cell_size) + 1
+        self.max_ring = int(width // self.cell_size) + 1
+
+        # Nodes sorted by cell
+        keys = self._key(*self._cell(self.x, self.y))
+        self._order = np.argsort(keys, kind='stable')
+        self._keys = keys[self._order]
+
+    def _cell(self, x, y):
+        return ((x - self.x_min) // self.cell_size).astype(int), ((y - self.y_min) // self.cell_size).astype(int)
+
+    def _key(self, i, j):
+        return i * self.nb_cells + j
+
+    def _nodes(self, i, j):
+        """The nodes of a set of cells."""
+        valid = (i >= 0) & (j >= 0) & (j < self.nb_cells)
+        keys = self._key(i[valid], j[valid])
+        starts = np.searchsorted(self._keys, keys, side='left')
+        stops = np.searchsorted(self._keys, keys, side='right')
+        if not len(keys):
+            return np.empty(0, dtype=int)
+        return np.concatenate([self._order[start:stop] for start, stop in zip(starts, stops)])
+
+    def query(self, x, y, k):
+        """The k nearest nodes of a point, sorted by increasing distance.
+
+        Args:
+            x (float):
+                The abscissa of the point.
+
+            y (float):
+                The ordinate of the point.
+
+            k (int):
+                The number of neighbours.
+
+        Returns:
+            numpy.ndarray: The position of the nearest nodes.
+        """
+        k = min(k, len(self.x))
+        i, j = self._cell(np.asarray(x), np.asarray(y))
+        candidates = self._nodes(np.array([i]), np.array([j]))
+        for ring in range(1, self.max_ring + 2):
+            distances = np.hypot(self.x[candidates] - x, self.y[candidates] - y)
+            # All the nodes closer than `ring - 1` cells have been studied
+            if len(candidates) >= k and np.partition(distances, k - 1)[k - 1] <= (ring - 1) * self.cell_size:
+                break
+            # Cells of the next ring around the cell of the point
+            side = np.arange(-ring, ring + 1)
+            ring_i = np.concatenate([np.full(len(side), -ring), np.full(len(side), ring), side[1:-1], side[1:-1]])
+            ring_j = np.concatenate([side, side, np.full(len(side) - 2, -ring), np.full(len(side) - 2, ring)])
+            candidates = np.concatenate([candidates, self._nodes(i + ring_i, j + ring_j)])
+        distances = np.hypot(self.x[candidates] - x, self.y[candidates] - y)
+        return candidates[np.argsort(distances, kind='stable')[:k]]
+
+    def nearest_neighbours(self, positions, k):
+        """The k nearest nodes of some nodes of the index, the nodes themselves being excluded.
+
+        Args:
+            positions (numpy.ndarray):
+                The position of the nodes.
+
+            k (int):
+                The number of neighbours.
+
+        Returns:
+            Dict[int, numpy.ndarray]: The position of the nearest nodes of each node.
+        """
+        neighbours = dict()
+        for position in positions:
+            nodes = self.query(self.x[position], self.y[position], k + 1)
+            neighbours[int(position)] = nodes[nodes != position][:k]
+        return neighbours
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import csv
+import json
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# Formats of the traces of the simulated annealing
+TRACE_FORMATS = ('csv', 'json')
+
+
+class AnnealingObserver:
+    """Observer of the simulated annealing, notified at the beginning, at each accepted move, at each temperature step
+    and at the end of the optimization. The methods do nothing by default, subclasses override the ones they need."""
+
+    def on_start(self, info):
+        """Called at the beginning of the optimization.
+
+        Args:
+            info (Dict): The initial temperature `temperature`, the initial length `length` and the number of MV/LV
+                substations moved `substations`.
+        """
+
+    def on_accept(self, objective):
+        """Called after each accepted move, the architecture being modified.
+
+        Args:
+            objective (float): The objective of the new architecture.
+        """
+
+    def on_step(self, metrics):
+        """Called at the end of each temperature step, and for the last incomplete step.
+
+        Args:
+            metrics (Dict): The metrics of the step, see `simulated_annealing`.
+        """
+
+    def on_end(self, statistics):
+        """Called at the end of the optimization.
+
+        Args:
+            statistics (Dict): The statistics of the optimization, see `SecuredFeeder.statistics`.
+        """
+
+
+class TraceRecorder(AnnealingObserver):
+
+    def __init__(self):
+        """Observer recording the metrics of the temperature steps, to be saved as a trace."""
+        self.steps = list()
+        self.statistics = None
+
+    def on_step(self, metrics):
+        self.steps.append(dict(metrics))
+
+    def on_end(self, statistics):
+        self.statistics = dict(statistics)
+
+    def save(self, filename):
+        """Write the trace in a CSV file (a row per step) or in a JSON file (the steps and the final statistics),
+        chosen by the extension of the file.
+
+        Args:
+            filename (str):
+                The name of the file.
+        """
+        extension = os.path.splitext(filename)[1].lower().lstrip('.')
+        if extension not in TRACE_FORMATS:
+            raise ValueError('Unknown format {!r} of trace, expected one of {!r}.'.format(extension, TRACE_FORMATS))
+        if extension == 'json':
+            with open(filename, 'w') as file:
+                json.dump({'steps': self.steps, 'statistics': self.statistics}, file, indent=2, default=float)
+        else:
+            columns = list(dict.fromkeys(key for step in self.steps for key in step))
+            with open(filename, 'w', newline='') as file:
+                writer = csv.DictWriter(file, fieldnames=columns)
+                writer.writeheader()
+                writer.writerows(self.steps)
+        logger.info('Trace of {!r} temperature steps written in {!r}.'.format(len(self.steps), filename))
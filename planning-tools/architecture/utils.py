@@ -3,20 +3,41 @@
 
 import numpy as np
 
+# Strategies of resolution of the travelling salesman problem
+TSP_SOLVERS = ('insertion', 'local-search', 'exact')
 
-def tsp_solver(points, costmatrix, init):
+# Maximum number of nodes between the ends of the path solved exactly by the solver 'exact'
+EXACT_LIMIT = 12
+
+# Number of nearest neighbours studied by the local search
+NB_NEIGHBOURS = 10
+
+# Maximum length of the segments moved by the Or-opt moves
+OR_OPT_LENGTH = 3
+
+# Minimum decrease of the length for a move of the local search
+EPSILON = 1e-9
+
+
+def tsp_solver(points, costmatrix, init, solver='insertion'):
     """ Calculate the shortest path containing a set of geographical nodes,
     with a, initial solution.
 
     :param points:
-        set of geographical nodes that have to be connected.
+        set of geographical nodes that have to be connected, given by their position in the cost matrix.
 
     :param costmatrix:
-        matrix containing the cost of the path for each pair of nodes.
+        matrix containing the cost of the path for each pair of nodes, a NumPy array or a `DistanceProvider`.
 
     :param init:
         initial solution which necessitates at least two nodes or more.
 
+    :param solver:
+        strategy of resolution, among `TSP_SOLVERS`: the farthest insertion ('insertion'), followed by an
+        improvement of the path with 2-opt and Or-opt moves ('local-search'). The ends of the path are never moved.
+        With 'exact', a path between two ends with at most `EXACT_LIMIT` other nodes is solved exactly by the
+        Held-Karp algorithm, a longer one with 'local-search'.
+
     :return:
         the shortest path and its cost.
 
@@ -29,46 +50,205 @@ def tsp_solver(points, costmatrix, init):
         print("The travelling salesman problem needs at least two points for "
               "the initial solution. The returned path is not optimized!")
         return points, np.inf
-
-    # Set the points to connect and the initial solution
-    path = init
-    xprim = init
-    pts = points
-
-    # Algorithm of Christofides
-    while list(set(pts) - set(xprim)):
-        xent = list(set(pts) - set(xprim))
-        d_min = [0] * len(xent)
-        id_min = [0] * len(xent)
-        ia_min = [0] * len(xent)
-        d = [0] * len(xprim)
-
-        for i in range(0, len(xent)):
-            for j in range(0,len(xprim)):
-                d[j] = costmatrix[min([xent[i], xprim[j]]), max([xent[i], xprim[j]])]
-            d_min[i] = min(d)
-            position = d.index(d_min[i])
-            id_min[i] = xent[i]
-            ia_min[i] = xprim[position]
-
-        position = d_min.index(max(d_min))
-        n = [int(ia_min[position]), int(id_min[position])]
-        dmin = np.inf
-        for i in range(0, len(path)-1):
-            new_d = costmatrix[min([path[i], n[1]]), max([path[i], n[1]])] + \
-                    costmatrix[min([n[1], path[i+1]]), max([n[1], path[i+1]])] - \
-                    costmatrix[min([path[i], path[i+1]]), max([path[i], path[i+1]])]
-            if new_d < dmin:
-                dmin = new_d
-                order = i
-
-        path = path[:(order + 1)] + [n[1]] + path[(order + 1):]
-        xprim.append(n[1])
+    if solver not in TSP_SOLVERS:
+        raise ValueError('Unknown solver {!r}, expected one of {!r}.'.format(solver, TSP_SOLVERS))
+
+    # The problem is solved on the sub-matrix of the points, indexed by their local position
+    pts = list(dict.fromkeys(list(points) + list(init)))
+    local = np.asarray(costmatrix[np.ix_(pts, pts)], dtype=float)
+    positions = {point: position for position, point in enumerate(pts)}
+    path = [positions[point] for point in init]
+
+    if solver == 'exact' and len(path) == 2 and len(pts) - len(set(path)) <= EXACT_LIMIT:
+        # Small problem: exact resolution by dynamic programming
+        path = _held_karp(local, path[0], path[-1])
+    else:
+        # Farthest insertion: the distance of each node to the nearest node of the path is updated at each insertion
+        nearest = local[path].min(axis=0)
+        nearest[path] = -np.inf
+        for _ in range(len(pts) - len(set(path))):
+            n = int(np.argmax(nearest))
+            # The farthest node is inserted where it increases the least the length of the path
+            new_d = local[path[:-1], n] + local[n, path[1:]] - local[path[:-1], path[1:]]
+            order = int(np.argmin(new_d))
+            path.insert(order + 1, n)
+            nearest = np.minimum(nearest, local[n])
+            nearest[path] = -np.inf
+
+        if solver in ('local-search', 'exact'):
+            path = _local_search(path, local)
 
     # Cost of the path
-    cost = 0
-    for i in range(0, len(path) - 1):
-        cost += costmatrix[min([path[i], path[i + 1]]), max([path[i], path[i + 1]])]
+    cost = local[path[:-1], path[1:]].sum()
 
     # Create and return of the optimized path
-    return path, cost
+    return [int(pts[i]) for i in path], cost
+
+
+def _held_karp(local, start, end):
+    """ Calculate the shortest path from a node to another visiting all the other nodes of the cost matrix, with the
+    Held-Karp dynamic programming in O(2^n n^2). The subsets of nodes are processed by increasing size, each size in
+    a few vectorized operations.
+
+    :param local:
+        matrix containing the cost of the path for each pair of nodes.
+
+    :param start:
+        first node of the path.
+
+    :param end:
+        last node of the path.
+
+    :return:
+        the shortest path given by the position of the nodes in the cost matrix.
+
+    """
+    nodes = [node for node in range(len(local)) if node != start and node != end]
+    k = len(nodes)
+    if k == 0:
+        return [start, end]
+    d = local[np.ix_(nodes, nodes)]
+    bits = 1 << np.arange(k)
+    masks = np.arange(1 << k)
+    sizes = ((masks[:, None] & bits) != 0).sum(axis=1)
+
+    # Shortest path from the start visiting the nodes of a subset and ending at one of them, and its previous node
+    cost = np.full((1 << k, k), np.inf)
+    previous = np.full((1 << k, k), -1, dtype=int)
+    cost[bits, np.arange(k)] = local[start, nodes]
+    for size in range(2, k + 1):
+        layer = masks[sizes == size]
+        for j in range(k):
+            subsets = layer[(layer & bits[j]) != 0]
+            candidates = cost[subsets ^ bits[j]] + d[:, j]
+            best = candidates.argmin(axis=1)
+            cost[subsets, j] = candidates[np.arange(len(subsets)), best]
+            previous[subsets, j] = best
+
+    # Path rebuilt from its last node
+    subset = (1 << k) - 1
+    j = int(np.argmin(cost[subset] + local[nodes, end]))
+    path = [end]
+    while j >= 0:
+        path.append(nodes[j])
+        subset, j = subset ^ int(bits[j]), int(previous[subset, j])
+    path.append(start)
+    return path[::-1]
+
+
+def _local_search(path, local):
+    """ Improve a path with 2-opt and Or-opt moves restricted to the nearest neighbours of the nodes, the ends of
+    the path being fixed.
+
+    :param path:
+        path given by the position of the nodes in the cost matrix.
+
+    :param local:
+        matrix containing the cost of the path for each pair of nodes.
+
+    :return:
+        the improved path.
+
+    """
+    if len(path) < 4:
+        return path
+    nb_neighbours = min(NB_NEIGHBOURS, len(local) - 1)
+    neighbours = np.argpartition(local, nb_neighbours, axis=1)[:, :(nb_neighbours + 1)]
+    order = np.argsort(np.take_along_axis(local, neighbours, axis=1), axis=1)
+    neighbours = np.take_along_axis(neighbours, order, axis=1).tolist()
+    d = local.tolist()
+
+    path = list(path)
+    improved = True
+    while improved:
+        improved = _two_opt(path, d, neighbours)
+        improved = _or_opt(path, d, neighbours) or improved
+    return path
+
+
+def _two_opt(path, d, neighbours):
+    """ Apply the improving 2-opt moves (reversal of a segment of the path). Return `True` if the path is modified. """
+    modified = False
+    improved = True
+    while improved:
+        improved = False
+        position = {node: i for i, node in enumerate(path)}
+        for i in range(1, len(path)):
+            a, b = path[i - 1], path[i]
+            d_ab = d[a][b]
+            for c in neighbours[a]:
+                # The new edge (a, c) replaces the edge (a, b) and the segment from b to c is reversed
+                if d[a][c] >= d_ab:
+                    break
+                j = position.get(c)
+                if j is None or j <= i or j >= len(path) - 1:
+                    continue
+                e = path[j + 1]
+                if d[a][c] + d[b][e] - d_ab - d[c][e] < -EPSILON:
+                    path[i:(j + 1)] = path[i:(j + 1)][::-1]
+                    improved = True
+                    break
+            if improved:
+                break
+            for c in neighbours[b]:
+                # The new edge (c, b) replaces the edge (a, b) and the segment from c to a is reversed
+                if d[b][c] >= d_ab:
+                    break
+                j = position.get(c)
+                if j is None or j >= i - 1 or j < 1:
+                    continue
+                e = path[j - 1]
+                if d[c][b] + d[e][a] - d_ab - d[e][c] < -EPSILON:
+                    path[j:i] = path[j:i][::-1]
+                    improved = True
+                    break
+            if improved:
+                break
+        modified = modified or improved
+    return modified
+
+
+def _or_opt(path, d, neighbours):
+    """ Apply the improving Or-opt moves (displacement of a segment of at most `OR_OPT_LENGTH` nodes, possibly
+    reversed). Return `True` if the path is modified. """
+    modified = False
+    improved = True
+    while improved:
+        improved = False
+        position = {node: k for k, node in enumerate(path)}
+        for length in range(1, OR_OPT_LENGTH + 1):
+            for i in range(1, len(path) - length):
+                segment = path[i:(i + length)]
+                first, last = segment[0], segment[-1]
+                p, n = path[i - 1], path[i + length]
+                gain = d[p][first] + d[last][n] - d[p][n]
+                best = (EPSILON, None, False)
+                for c in neighbours[first] + neighbours[last]:
+                    k = position.get(c)
+                    if k is None or i <= k <= i + length - 1:
+                        continue
+                    # Insertion between the node c and its successor or its predecessor, out of the segment
+                    for u in (k, k - 1):
+                        if u < 0 or u + 1 >= len(path) or i - 1 <= u <= i + length - 1:
+                            continue
+                        x, y = path[u], path[u + 1]
+                        forward = d[x][first] + d[last][y] - d[x][y]
+                        backward = d[x][last] + d[first][y] - d[x][y]
+                        if gain - forward > best[0]:
+                            best = (gain - forward, u, False)
+                        if gain - backward > best[0]:
+                            best = (gain - backward, u, True)
+                if best[1] is not None:
+                    u = best[1]
+                    x = path[u]
+                    if best[2]:
+                        segment = segment[::-1]
+                    rest = path[:i] + path[(i + length):]
+                    k = rest.index(x)
+                    path[:] = rest[:(k + 1)] + segment + rest[(k + 1):]
+                    improved = True
+                    break
+            if improved:
+                break
+        modified = modified or improved
+    return modified
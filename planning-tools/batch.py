@@ -0,0 +1,206 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import glob
+import logging
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pandas as pd
+
+from .architecture.config import AnnealingConfig
+from .architecture.secured_feeder import SecuredFeeder, default_feeders, simulated_annealing
+from .electrical_network.electrical_network import ElectricalNetwork
+from .io.read_files import read_architecture_files, read_feeders_file
+from .log_utils import set_logging_config
+
+logger = logging.getLogger(__name__)
+
+# Input files of a planning case
+HV_MV_SUBSTATIONS_FILENAME = 'hv_mv_substations.csv'
+MV_LV_SUBSTATIONS_FILENAME = 'mv_lv_substations.csv'
+FEEDERS_FILENAME = 'feeders.csv'
+
+
+def find_cases(sources):
+    """Find the input folders of planning cases.
+
+    Args:
+        sources (Iterable[str]):
+            Manifests (text files with an input folder per line, the empty lines and the lines starting with '#' being
+            ignored, the relative paths being relative to the manifest), folders or glob patterns of folders.
+
+    Returns:
+        List[str]: The input folders, in order and without duplicates.
+    """
+    cases = list()
+    for source in sources:
+        if os.path.isfile(source):
+            with open(source) as manifest:
+                folders = [line.strip() for line in manifest]
+            folders = [os.path.join(os.path.dirname(source), folder) for folder in folders
+                       if folder and not folder.startswith('#')]
+        else:
+            folders = sorted(glob.glob(source)) if glob.has_magic(source) else [source]
+        for folder in folders:
+            folder = os.path.normpath(folder)
+            if not os.path.isdir(folder):
+                logger.warning('The case {!r} is not a folder, it is ignored.'.format(folder))
+            elif folder not in cases:
+                cases.append(folder)
+    return cases
+
+
+def run_batch(cases, output_folder, config=None, jobs=1, verbosity='info', file_format='csv', **kwargs):
+    """Build the architecture of several planning cases in a pool of processes.
+
+    Each case is a folder with the files `hv_mv_substations.csv`, `mv_lv_substations.csv` and optionally
+    `feeders.csv`. Its results are written in a folder of the same name in `output_folder`. A failed case is reported
+    in the summary without stopping the other ones. If a process of the pool dies (e.g. out of memory), the cases it
+    interrupted are run again, each one alone in a new process, so only the case killing its process fails.
+
+    Args:
+        cases (List[str]):
+            The input folders of the cases.
+
+        output_folder (str):
+            The folder of the results.
+
+        config (Optional[AnnealingConfig]):
+            The parameters of the simulated annealing, used for all the cases.
+
+        jobs (int):
+            The number of processes running the cases.
+
+        verbosity (str):
+            The verbosity level of the logs of the processes.
+
+        file_format (str):
+            The format of the files of buses and branches ('csv', 'parquet' or 'feather').
+
+        **kwargs:
+            The keyword arguments of `SecuredFeeder` (distances, solver).
+
+    Returns:
+        pandas.DataFrame: The summary of the cases: status, total length, objective, iterations and run time.
+    """
+    names = _case_names(cases)
+    output_folders = [os.path.join(output_folder, name) for name in names]
+    logger.info('Batch of {!r} cases on {!r} processes.'.format(len(cases), jobs))
+    if jobs > 1:
+        results = _run_pool(cases, output_folders, jobs, config, verbosity, file_format, **kwargs)
+        interrupted = [position for position, result in enumerate(results) if result is None]
+        if interrupted:
+            logger.warning('A process died, {!r} cases are run again alone.'.format(len(interrupted)))
+        for position in interrupted:
+            results[position] = _run_pool([cases[position]], [output_folders[position]], 1, config, verbosity,
+                                          file_format, **kwargs)[0]
+            if results[position] is None:
+                results[position] = _failed_case(cases[position], 'The process of the case died.')
+    else:
+        results = [run_case(case, case_output, config, file_format, **kwargs)
+                   for case, case_output in zip(cases, output_folders)]
+
+    summary = pd.DataFrame(results, index=pd.Index(names, name='case'))
+    summary['iterations'] = summary['iterations'].astype('Int64')
+    failures = summary.index[summary['status'] != 'success']
+    logger.info('End of the batch: {!r} cases succeeded, {!r} failed.'.format(len(summary) - len(failures),
+                                                                             len(failures)))
+    for name in failures:
+        logger.error('Case {!r} failed: {}'.format(name, summary.loc[name, 'error']))
+    return summary
+
+
+def run_case(case, output_folder, config=None, file_format='csv', **kwargs):
+    """Build the architecture of a planning case, the exceptions being caught.
+
+    Args:
+        case (str):
+            The input folder of the case.
+
+        output_folder (str):
+            The folder of the results of the case, with the log `extraction.log`.
+
+        config (Optional[AnnealingConfig]):
+            The parameters of the simulated annealing.
+
+        file_format (str):
+            The format of the files of buses and branches.
+
+        **kwargs:
+            The keyword arguments of `SecuredFeeder`.
+
+    Returns:
+        Dict: The summary of the case.
+    """
+    os.makedirs(output_folder, exist_ok=True)
+    handler = logging.FileHandler(filename=os.path.join(output_folder, 'extraction.log'), mode='w')
+    handler.setFormatter(logging.Formatter(fmt='{levelname}:{message}', style='{'))
+    logging.getLogger().addHandler(handler)
+    start = time.perf_counter()
+    summary = {'folder': case, 'status': 'success', 'length': None, 'objective': None, 'iterations': None,
+               'duration': None, 'run_time': None, 'error': None}
+    try:
+        logger.info('Beginning of the case {!r}.'.format(case))
+        hv_mv_substations, mv_lv_substations = read_architecture_files(
+            os.path.join(case, HV_MV_SUBSTATIONS_FILENAME), os.path.join(case, MV_LV_SUBSTATIONS_FILENAME))
+        feeders_filename = os.path.join(case, FEEDERS_FILENAME)
+        if os.path.isfile(feeders_filename):
+            feeders = read_feeders_file(feeders_filename)
+        else:
+            feeders = default_feeders(hv_mv_substations)
+        secured_feeder = SecuredFeeder(hv_mv_substations=hv_mv_substations, mv_lv_substations=mv_lv_substations,
+                                       feeders=feeders, **kwargs)
+        secured_feeder = simulated_annealing(secured_feeder, config if config is not None else AnnealingConfig())
+        electrical_network = ElectricalNetwork(buses=secured_feeder.buses, branches=secured_feeder.branches)
+        electrical_network.save(output_folder, file_format=file_format)
+        summary.update({key: secured_feeder.statistics[key] for key in ('length', 'objective', 'iterations',
+                                                                        'duration')})
+    except Exception as error:
+        logger.error('Case {!r} failed:\n{}'.format(case, traceback.format_exc()))
+        summary.update({'status': 'failure', 'error': '{}: {}'.format(type(error).__name__, error)})
+    finally:
+        summary['run_time'] = time.perf_counter() - start
+        logging.getLogger().removeHandler(handler)
+        handler.close()
+    return summary
+
+
+def _run_pool(cases, output_folders, jobs, config, verbosity, file_format, **kwargs):
+    """Run cases in a pool of processes and return their summaries, `None` for the cases interrupted by the death of a
+    process."""
+    results = list()
+    with ProcessPoolExecutor(max_workers=jobs, initializer=set_logging_config, initargs=(verbosity,)) as executor:
+        futures = [executor.submit(run_case, case, case_output, config, file_format, **kwargs)
+                   for case, case_output in zip(cases, output_folders)]
+        for case, future in zip(cases, futures):
+            try:
+                results.append(future.result())
+            except BrokenProcessPool:
+                results.append(None)
+            except Exception as error:
+                # The case could not be sent to its process or its summary could not be sent back
+                results.append(_failed_case(case, '{}: {}'.format(type(error).__name__, error)))
+    return results
+
+
+def _failed_case(case, error):
+    """The summary of a case which failed outside of `run_case`."""
+    return {'folder': case, 'status': 'failure', 'length': None, 'objective': None, 'iterations': None,
+            'duration': None, 'run_time': None, 'error': error}
+
+
+def _case_names(cases):
+    """The names of the output folders of the cases: the name of the input folder, made unique if needed."""
+    names = list()
+    for case in cases:
+        name = os.path.basename(os.path.normpath(case)) or 'case'
+        candidate, index = name, 1
+        while candidate in names:
+            index += 1
+            candidate = '{}_{}'.format(name, index)
+        names.append(candidate)
+    return names
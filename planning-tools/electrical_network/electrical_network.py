@@ -1,8 +1,18 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import logging
 import os
 
+import numpy as np
+import pandas as pd
+
+from .power_flow import NOMINAL_VOLTAGE, POWER_FACTOR, RESISTANCE, radial_power_flow
+from .sizing import SIZING_ITERATIONS, select_conductors
+from ..io.read_files import BRANCHES_DTYPES, BUSES_DTYPES, write_table
+
+logger = logging.getLogger(__name__)
+
 
 class ElectricalNetwork:
 
@@ -11,6 +21,190 @@ class ElectricalNetwork:
         self.buses = buses
         self.branches = branches
 
-    def save(self, save_folder):
-        self.buses.to_csv(os.path.join(save_folder, 'buses.csv'), index_label='id')
-        self.branches.to_csv(os.path.join(save_folder, 'branches.csv'), index_label='id')
+    def save(self, save_folder, file_format='csv'):
+        """Write the buses and the branches in the files `buses` and `branches` of a folder.
+
+        Args:
+            save_folder (str):
+                The folder of the files.
+
+            file_format (str):
+                The format of the files: 'csv', 'parquet' or 'feather'. The types of the columns are kept by the binary
+                formats.
+        """
+        extension = {'csv': '.csv', 'parquet': '.parquet', 'feather': '.feather'}[file_format]
+        write_table(self.buses, os.path.join(save_folder, 'buses' + extension), dtypes=BUSES_DTYPES)
+        write_table(self.branches, os.path.join(save_folder, 'branches' + extension), dtypes=BRANCHES_DTYPES)
+
+    def feeder_paths(self):
+        """The path of each feeder from its first HV/MV substation to the second one.
+
+        Returns:
+            Dict[int, Tuple[List[int], List[int]]]:
+                The buses and the branches of each feeder, in the order of the path. The branches are given by their
+                position in the data frame of branches.
+        """
+        paths = dict()
+        bus1 = self.branches['bus1'].to_numpy()
+        bus2 = self.branches['bus2'].to_numpy()
+        sources = set(self.buses.index[self.buses['type'] == 'hv_source'])
+        for feeder, positions in self.branches.groupby('feeder', sort=True).indices.items():
+            adjacency = dict()
+            for position in positions:
+                adjacency.setdefault(bus1[position], []).append(position)
+                adjacency.setdefault(bus2[position], []).append(position)
+            ends = [bus for bus, connected in adjacency.items() if len(connected) == 1 and bus in sources]
+            start = ends[0] if ends else next((bus for bus in adjacency if bus in sources), bus1[positions[0]])
+            path_buses, path_branches = [start], []
+            visited = set()
+            while True:
+                following = [position for position in adjacency[path_buses[-1]] if position not in visited]
+                if not following:
+                    break
+                position = following[0]
+                visited.add(position)
+                path_branches.append(position)
+                path_buses.append(bus2[position] if bus1[position] == path_buses[-1] else bus1[position])
+            paths[feeder] = (path_buses, path_branches)
+        return paths
+
+    def normal_states(self):
+        """The states of the branches in normal operation.
+
+        A feeder whose branches are all closed between its two HV/MV substations is opened on the branch which splits
+        its load in two halves as equal as possible, each half being supplied by one substation.
+
+        Returns:
+            numpy.ndarray: The state (closed or not) of each branch.
+        """
+        # Load supplied by the first substation if each branch is opened
+        def half(cumulated):
+            return np.argmin(np.abs(cumulated[:-1] - cumulated[-1] / 2))
+
+        return self._open_feeders(half)
+
+    def backfeed_states(self):
+        """The states of the branches in N-1 backfeed conditions.
+
+        Each feeder whose branches are all closed between its two HV/MV substations is supplied by a single substation,
+        the other one being lost.
+
+        Returns:
+            List[numpy.ndarray]: The state (closed or not) of each branch when the second and when the first substation
+                of the feeders are lost.
+        """
+        return [self._open_feeders(lambda cumulated: len(cumulated) - 2), self._open_feeders(lambda cumulated: 0)]
+
+    def _open_feeders(self, choose):
+        """Open a branch of each feeder closed between two HV/MV substations. The position of the branch in the path of
+        the feeder is given by `choose(cumulated)`, where `cumulated` is the cumulated load of the buses of the path."""
+        states = self.branches['state'].to_numpy(dtype=bool).copy()
+        loads = np.nan_to_num(self.buses['s'].to_numpy(dtype=float))
+        sources = set(self.buses.index[self.buses['type'] == 'hv_source'])
+        for path_buses, path_branches in self.feeder_paths().values():
+            if not path_branches or not states[path_branches].all():
+                continue
+            if path_buses[0] not in sources or path_buses[-1] not in sources:
+                continue
+            cumulated = np.cumsum(loads[self.buses.index.get_indexer(path_buses)])
+            states[path_branches[choose(cumulated)]] = False
+        return states
+
+    def size(self, catalog, voltage=NOMINAL_VOLTAGE, power_factor=POWER_FACTOR):
+        """Choose the conductor of each branch in a catalog.
+
+        The currents of the branches are calculated in normal operation and in N-1 backfeed conditions (see
+        `backfeed_states`). The cheapest conductor whose ampacity is not exceeded in any condition is chosen for each
+        branch, then the currents are calculated again with the impedances of the chosen conductors until the choice is
+        stable. The columns `type_name`, `r`, `x` (ohm/km) and `cost` are set in the data frame of branches.
+
+        Args:
+            catalog (pandas.DataFrame):
+                The catalog of conductors, indexed by name, with the columns `ampacity` (A), `r` (ohm/km), `x` (ohm/km)
+                and `cost` (per km).
+
+            voltage (float):
+                The nominal line-to-line voltage (kV).
+
+            power_factor (float):
+                The power factor of the loads.
+
+        Returns:
+            numpy.ndarray: Whether an admissible conductor has been found for each branch.
+        """
+        conditions = [self.normal_states()] + self.backfeed_states()
+        lengths = self.branches['length'].to_numpy(dtype=float)
+        resistance, reactance = None, None
+        choice = None
+        for iteration in range(SIZING_ITERATIONS):
+            currents = np.max([np.abs(radial_power_flow(self.buses, self.branches, states=states, voltage=voltage,
+                                                        power_factor=power_factor, resistance=resistance,
+                                                        reactance=reactance)[1]) for states in conditions], axis=0)
+            new_choice, admissible = select_conductors(currents, lengths, catalog)
+            if choice is not None and np.array_equal(new_choice, choice):
+                break
+            choice = new_choice
+            resistance = catalog['r'].to_numpy(dtype=float)[choice]
+            reactance = catalog['x'].to_numpy(dtype=float)[choice]
+
+        self.branches['type_name'] = catalog.index.to_numpy()[choice]
+        self.branches['r'] = resistance
+        self.branches['x'] = reactance
+        self.branches['cost'] = catalog['cost'].to_numpy(dtype=float)[choice] * lengths / 1000
+        if not admissible.all():
+            logger.warning('No conductor of the catalog is admissible for {!r} branches, the conductor with the '
+                           'highest ampacity is used.'.format(int((~admissible).sum())))
+        logger.info('Sizing of {!r} branches for a cost of {:.2f}.'.format(len(self.branches),
+                                                                          self.branches['cost'].sum()))
+        return admissible
+
+    def power_flow(self, states=None, voltage=NOMINAL_VOLTAGE, power_factor=POWER_FACTOR):
+        """Calculate the power flow of the network and store the results in the data frames of buses and branches.
+
+        The columns `v` (voltage, p.u.) and `dv` (voltage drop, %) are added to the buses, the columns `i`
+        (current, A) and `losses` (MW) to the branches.
+
+        Args:
+            states (Optional[numpy.ndarray]):
+                The state (closed or not) of each branch. If `None`, the states in normal operation are used (see
+                `normal_states`).
+
+            voltage (float):
+                The nominal line-to-line voltage (kV).
+
+            power_factor (float):
+                The power factor of the loads.
+
+        Returns:
+            pandas.DataFrame: The maximum current, the maximum voltage drop and the losses of each feeder.
+        """
+        if states is None:
+            states = self.normal_states()
+        v, current = radial_power_flow(self.buses, self.branches, states=states, voltage=voltage,
+                                       power_factor=power_factor)
+        nominal = voltage * 1e3 / np.sqrt(3)
+        self.buses['v'] = np.abs(v) / nominal
+        self.buses['dv'] = np.where(np.abs(v) > 0, (1 - np.abs(v) / nominal) * 100, np.nan)
+        if 'r' in self.branches:
+            resistance = self.branches['r'].to_numpy(dtype=float)
+        else:
+            resistance = np.full(len(self.branches), RESISTANCE)
+        self.branches['i'] = np.abs(current)
+        self.branches['losses'] = 3 * resistance * self.branches['length'].to_numpy(dtype=float) / 1000 \
+            * np.abs(current) ** 2 / 1e6
+
+        # Results by feeder
+        if 'feeder' in self.buses:
+            bus_feeders = self.buses['feeder'].astype('Int64')
+        else:
+            bus_feeders = pd.Series(pd.NA, index=self.buses.index, dtype='Int64')
+        branch_feeders = self.branches['feeder'].astype('Int64')
+        feeders = pd.DataFrame({
+            'i_max': self.branches['i'].groupby(branch_feeders).max(),
+            'losses': self.branches['losses'].groupby(branch_feeders).sum(),
+            'dv_max': self.buses['dv'].groupby(bus_feeders).max(),
+        })
+        feeders.index.name = 'feeder'
+        logger.info('Power flow: {:.3f} MW of losses, maximum voltage drop of {:.2f} % and maximum current of '
+                    '{:.0f} A.'.format(feeders['losses'].sum(), self.buses['dv'].max(), self.branches['i'].max()))
+        return feeders
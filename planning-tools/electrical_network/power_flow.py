@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Default electrical parameters
+NOMINAL_VOLTAGE = 20.  # nominal line-to-line voltage of the MV network (kV)
+POWER_FACTOR = 0.9  # power factor of the loads
+RESISTANCE = 0.125  # resistance of the lines without conductor (ohm/km)
+REACTANCE = 0.1  # reactance of the lines without conductor (ohm/km)
+
+# Parameters of the backward/forward sweep
+TOLERANCE = 1e-8  # maximum variation of the voltages between two iterations (p.u.)
+MAX_ITERATIONS = 50
+
+
+class PowerFlowError(Exception):
+    """Error raised when the power flow cannot be calculated."""
+
+
+def radial_power_flow(buses, branches, states=None, voltage=NOMINAL_VOLTAGE, power_factor=POWER_FACTOR,
+                      resistance=None, reactance=None):
+    """Calculate the power flow of a radial network with a backward/forward sweep.
+
+    All the feeders are solved at once on the sparse incidence matrix of the closed branches. Each connected part of
+    the network must be radial and supplied by a single HV/MV substation, whose voltage is the nominal voltage. The
+    parts without HV/MV substation are not supplied.
+
+    Args:
+        buses (pandas.DataFrame):
+            The data frame of electrical buses, with the columns `type` and `s` (MVA).
+
+        branches (pandas.DataFrame):
+            The data frame of branches, with the columns `bus1`, `bus2` and `length` (m).
+
+        states (Optional[numpy.ndarray]):
+            The state (closed or not) of each branch. If `None`, the column `state` of the branches is used.
+
+        voltage (float):
+            The nominal line-to-line voltage (kV).
+
+        power_factor (float):
+            The power factor of the loads.
+
+        resistance (Optional[numpy.ndarray]):
+            The resistance of each branch (ohm/km). If `None`, the column `r` of the branches is used if it exists,
+            otherwise `RESISTANCE`.
+
+        reactance (Optional[numpy.ndarray]):
+            The reactance of each branch (ohm/km). If `None`, the column `x` of the branches is used if it exists,
+            otherwise `REACTANCE`.
+
+    Returns:
+        Tuple[numpy.ndarray, numpy.ndarray]:
+            The complex phase-to-neutral voltage of each bus (V) and the complex current of each branch (A), from
+            `bus1` to `bus2`. The voltage of the buses not supplied and the current of the open branches are zero.
+    """
+    # scipy is only imported when a power flow is calculated
+    from scipy import sparse
+    from scipy.sparse import csgraph
+    from scipy.sparse.linalg import splu
+
+    n_buses = len(buses)
+    if states is None:
+        states = branches['state'].to_numpy(dtype=bool)
+    closed = np.flatnonzero(states)
+    bus1 = buses.index.get_indexer(branches['bus1'].to_numpy()[closed])
+    bus2 = buses.index.get_indexer(branches['bus2'].to_numpy()[closed])
+    if (bus1 < 0).any() or (bus2 < 0).any():
+        raise PowerFlowError('Some branches are connected to unknown buses.')
+
+    # Impedance of the closed branches
+    if resistance is None:
+        resistance = branches['r'].to_numpy(dtype=float) if 'r' in branches else np.full(len(branches), RESISTANCE)
+    if reactance is None:
+        reactance = branches['x'].to_numpy(dtype=float) if 'x' in branches else np.full(len(branches), REACTANCE)
+    length = branches['length'].to_numpy(dtype=float)[closed] / 1000
+    impedance = (np.asarray(resistance, dtype=float)[closed] + 1j * np.asarray(reactance, dtype=float)[closed]) * length
+
+    # Supplied parts of the network
+    adjacency = sparse.coo_matrix((np.ones(len(closed)), (bus1, bus2)), shape=(n_buses, n_buses))
+    n_components, components = csgraph.connected_components(adjacency, directed=False)
+    sources = (buses['type'] == 'hv_source').to_numpy()
+    sources_per_component = np.bincount(components[sources], minlength=n_components)
+    if (sources_per_component > 1).any():
+        raise PowerFlowError('Some HV/MV substations are connected by closed branches, the network is not radial.')
+    supplied = sources_per_component[components] == 1
+    loads = supplied & ~sources
+    supplied_branches = supplied[bus1]
+    if supplied_branches.sum() != loads.sum():
+        raise PowerFlowError('The network has meshes, it is not radial.')
+
+    # Reduced incidence matrix: closed branches of the supplied parts x supplied buses which are not sources. A
+    # current flowing from bus1 to bus2 leaves bus1 (+1) and enters bus2 (-1).
+    branch_index = np.flatnonzero(supplied_branches)
+    rows = np.concatenate([np.arange(len(branch_index)), np.arange(len(branch_index))])
+    columns = np.concatenate([bus1[branch_index], bus2[branch_index]])
+    values = np.concatenate([np.ones(len(branch_index)), -np.ones(len(branch_index))])
+    incidence = sparse.csc_matrix((values, (rows, columns)), shape=(len(branch_index), n_buses))
+    load_index = np.flatnonzero(loads)
+    reduced = incidence[:, load_index].tocsc()
+    factorization = splu(reduced)
+    z = impedance[branch_index]
+
+    # Phase-to-neutral voltages and loads (V and VA)
+    nominal = voltage * 1e3 / np.sqrt(3)
+    v = np.where(supplied, nominal + 0j, 0j)
+    apparent_power = np.nan_to_num(buses['s'].to_numpy(dtype=float))[load_index] * 1e6 / 3
+    power = apparent_power * (power_factor + 1j * np.sqrt(1 - power_factor ** 2))
+    v_sources = incidence[:, np.flatnonzero(supplied & sources)] @ v[supplied & sources]
+
+    # Backward/forward sweep
+    current = np.zeros(len(branch_index), dtype=complex)
+    for iteration in range(MAX_ITERATIONS):
+        # Backward: currents of the branches from the currents of the loads (Kirchhoff's current law)
+        load_current = np.conj(power / v[load_index])
+        current = _solve(factorization, -load_current, trans='T')
+        # Forward: voltages of the buses from the voltage drops of the branches
+        new_v = _solve(factorization, z * current - v_sources, trans='N')
+        variation = np.abs(new_v - v[load_index]).max(initial=0) / nominal
+        v[load_index] = new_v
+        if variation < TOLERANCE:
+            break
+    else:
+        logger.warning('The power flow has not converged after {!r} iterations.'.format(MAX_ITERATIONS))
+
+    branch_current = np.zeros(len(branches), dtype=complex)
+    branch_current[closed[branch_index]] = current
+    return v, branch_current
+
+
+def _solve(factorization, b, trans):
+    """Solve a linear system with a real factorization and a complex right-hand side."""
+    solution = factorization.solve(np.column_stack([b.real, b.imag]), trans=trans)
+    return solution[:, 0] + 1j * solution[:, 1]
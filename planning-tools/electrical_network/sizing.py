@@ -0,0 +1,38 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+# Maximum number of choices of the conductors, the currents being updated with the impedances of the chosen conductors
+SIZING_ITERATIONS = 5
+
+
+def select_conductors(currents, lengths, catalog):
+    """Choose the cheapest admissible conductor of each branch.
+
+    The candidates are evaluated at once on a matrix of branches x conductors. A conductor is admissible for a branch if
+    its ampacity is not lower than the current of the branch. If no conductor is admissible, the conductor with the
+    highest ampacity is chosen.
+
+    Args:
+        currents (numpy.ndarray):
+            The maximum current of each branch (A).
+
+        lengths (numpy.ndarray):
+            The length of each branch (m).
+
+        catalog (pandas.DataFrame):
+            The catalog of conductors, with the columns `ampacity` (A) and `cost` (per km).
+
+    Returns:
+        Tuple[numpy.ndarray, numpy.ndarray]:
+            The position in the catalog of the conductor of each branch and whether this conductor is admissible.
+    """
+    ampacity = catalog['ampacity'].to_numpy(dtype=float)
+    cost = catalog['cost'].to_numpy(dtype=float)
+    admissible = ampacity[np.newaxis, :] >= np.asarray(currents, dtype=float)[:, np.newaxis]
+    costs = np.where(admissible, np.asarray(lengths, dtype=float)[:, np.newaxis] / 1000 * cost[np.newaxis, :], np.inf)
+    choice = np.argmin(costs, axis=1)
+    found = admissible.any(axis=1)
+    choice[~found] = np.argmax(ampacity)
+    return choice, found
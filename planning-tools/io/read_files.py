@@ -2,28 +2,283 @@
 # -*- coding: utf-8 -*-
 
 import logging
+import os
+import re
 
 import pandas as pd
 
 logger = logging.getLogger(__name__)
 
+# Formats of the tables, chosen by the extension of the files
+FORMATS = {'.csv': 'csv', '.parquet': 'parquet', '.pq': 'parquet', '.feather': 'feather', '.arrow': 'feather'}
 
-def read_architecture_files(hv_mv_substations_filename, mv_lv_substations_filename):
-    # Read the CSV files
-    hv_mv_substations = pd.read_csv(hv_mv_substations_filename, index_col='id')
+# Columns of the MV/LV substations read, with their types
+MV_LV_SUBSTATIONS_COLUMNS = {'P (MW)': 'float64', 'x': 'float64', 'y': 'float64'}
+
+# Number of rows of the chunks of the CSV files of MV/LV substations
+CHUNKSIZE = 100000
+
+# Types of the columns of the electrical buses and branches
+BUSES_DTYPES = {'type': 'category', 's': 'float64', 'x': 'float64', 'y': 'float64', 'feeder': 'Int64'}
+BRANCHES_DTYPES = {'bus1': 'int64', 'bus2': 'int64', 'type': 'category', 'type_name': 'string', 'length': 'float64',
+                   'state': 'bool', 'feeder': 'Int64'}
+
+
+def read_architecture_files(hv_mv_substations_filename, mv_lv_substations_filename, bbox=None, source_margin=None,
+                            chunksize=CHUNKSIZE):
+    """Read the HV/MV and MV/LV substations of an architecture.
+
+    Only the columns `P (MW)`, `x` and `y` of the MV/LV substations are read, by chunks for the CSV files, and the
+    substations outside the region to plan are discarded while reading, so the whole file is never loaded.
+
+    Args:
+        hv_mv_substations_filename (str):
+            The file of HV/MV substations.
+
+        mv_lv_substations_filename (str):
+            The file of MV/LV substations.
+
+        bbox (Optional[Tuple[float, float, float, float]]):
+            The region to plan (x_min, y_min, x_max, y_max). If `None`, the region is not limited.
+
+        source_margin (Optional[float]):
+            If not `None`, the region to plan is limited to the bounding box of the HV/MV substations enlarged by
+            this margin.
+
+        chunksize (int):
+            The number of rows of the chunks of the CSV files.
+
+    Returns:
+        Tuple[pandas.DataFrame, pandas.DataFrame]: The HV/MV and the MV/LV substations.
+    """
+    # Read the files
+    hv_mv_substations = read_table(hv_mv_substations_filename)
     logger.info('Extraction of the HV/MV substations: {!r} substations.'.format(len(hv_mv_substations)))
-    mv_lv_substations = pd.read_csv(mv_lv_substations_filename, index_col='id')
+    if source_margin is not None:
+        region = (hv_mv_substations['x'].min() - source_margin, hv_mv_substations['y'].min() - source_margin,
+                  hv_mv_substations['x'].max() + source_margin, hv_mv_substations['y'].max() + source_margin)
+        bbox = region if bbox is None else (max(bbox[0], region[0]), max(bbox[1], region[1]),
+                                            min(bbox[2], region[2]), min(bbox[3], region[3]))
+    mv_lv_substations = read_mv_lv_substations(mv_lv_substations_filename, bbox=bbox, chunksize=chunksize)
     logger.info('Extraction of the MV/LV substations: '
                 '{!r} substations for {:.2f} MW.'.format(len(mv_lv_substations), mv_lv_substations['P (MW)'].sum()))
 
     return hv_mv_substations, mv_lv_substations
 
 
+def read_mv_lv_substations(mv_lv_substations_filename, bbox=None, chunksize=CHUNKSIZE):
+    """Read the columns `P (MW)`, `x` and `y` of the MV/LV substations in a region.
+
+    The CSV files are read by chunks, each chunk being validated and filtered before the next one is read. The Parquet
+    and Feather files are filtered by the scan of a dataset, so the substations outside the region are never
+    converted to a data frame.
+
+    Args:
+        mv_lv_substations_filename (str):
+            The file of MV/LV substations.
+
+        bbox (Optional[Tuple[float, float, float, float]]):
+            The region (x_min, y_min, x_max, y_max). If `None`, all the substations are read.
+
+        chunksize (int):
+            The number of rows of the chunks of the CSV files.
+
+    Returns:
+        pandas.DataFrame: The MV/LV substations indexed by `id`.
+    """
+    file_format = table_format(mv_lv_substations_filename)
+    columns = ['id'] + list(MV_LV_SUBSTATIONS_COLUMNS)
+    if file_format == 'csv':
+        selected = list()
+        nb_read, nb_invalid = 0, 0
+        for chunk in pd.read_csv(mv_lv_substations_filename, usecols=columns, dtype=MV_LV_SUBSTATIONS_COLUMNS,
+                                 chunksize=chunksize):
+            nb_read += len(chunk)
+            valid = chunk['x'].notna() & chunk['y'].notna()
+            nb_invalid += int((~valid).sum())
+            if bbox is not None:
+                valid &= chunk['x'].between(bbox[0], bbox[2]) & chunk['y'].between(bbox[1], bbox[3])
+            selected.append(chunk[valid])
+        mv_lv_substations = pd.concat(selected) if selected else pd.DataFrame(columns=columns)
+    else:
+        mv_lv_substations, nb_read, nb_invalid = _scan_mv_lv_substations(mv_lv_substations_filename, file_format,
+                                                                         columns, bbox=bbox)
+    mv_lv_substations = mv_lv_substations.set_index('id').astype(MV_LV_SUBSTATIONS_COLUMNS)
+
+    if nb_invalid:
+        logger.warning('{!r} MV/LV substations without coordinates are ignored.'.format(nb_invalid))
+    if not mv_lv_substations.index.is_unique:
+        duplicates = mv_lv_substations.index[mv_lv_substations.index.duplicated()].unique()
+        raise ValueError('The ids {!r} of MV/LV substations are duplicated.'.format(list(duplicates[:10])))
+    if bbox is not None:
+        logger.info('{!r} MV/LV substations of {!r} in the region ({:.0f}, {:.0f}, {:.0f}, {:.0f}).'.format(
+            len(mv_lv_substations), nb_read, *bbox))
+    return mv_lv_substations
+
+
+def _scan_mv_lv_substations(mv_lv_substations_filename, file_format, columns, bbox=None):
+    """Read the MV/LV substations with coordinates in a region from a Parquet or Feather file, the rows being filtered
+    by the scan of a pyarrow dataset.
+
+    Args:
+        mv_lv_substations_filename (str):
+            The file of MV/LV substations.
+
+        file_format (str):
+            The format of the file ('parquet' or 'feather').
+
+        columns (List[str]):
+            The columns read.
+
+        bbox (Optional[Tuple[float, float, float, float]]):
+            The region (x_min, y_min, x_max, y_max). If `None`, all the substations with coordinates are read.
+
+    Returns:
+        Tuple[pandas.DataFrame, int, int]:
+            The MV/LV substations, the number of rows of the file and the number of rows without coordinates.
+    """
+    # pyarrow is only imported when a binary file is read
+    import pyarrow.dataset as ds
+
+    dataset = ds.dataset(mv_lv_substations_filename, format=file_format)
+    x, y = ds.field('x'), ds.field('y')
+    valid = x.is_valid() & y.is_valid() & ~x.is_nan() & ~y.is_nan()
+    expression = valid
+    if bbox is not None:
+        expression &= (x >= bbox[0]) & (y >= bbox[1]) & (x <= bbox[2]) & (y <= bbox[3])
+    mv_lv_substations = dataset.to_table(columns=columns, filter=expression).to_pandas()
+    return mv_lv_substations, dataset.count_rows(), dataset.count_rows(filter=~valid)
+
+
+def read_feeders_file(feeders_filename):
+    # Read the file
+    feeders = read_table(feeders_filename)
+    logger.info('Extraction of the MV feeders: {!r} feeders.'.format(len(feeders)))
+
+    return feeders
+
+
 def read_sizing_files(buses_filename, branches_filename):
-    # Read the CSV files
-    buses = pd.read_csv(buses_filename, index_col='id')
+    # Read the files
+    buses = read_table(buses_filename, dtypes=BUSES_DTYPES)
     logger.info('Extraction of {!r} electrical buses for {:.2f} MVA.'.format(len(buses), buses['s'].sum()))
-    branches = pd.read_csv(branches_filename, index_col='id')
+    branches = read_table(branches_filename, dtypes=BRANCHES_DTYPES)
     logger.info('Extraction of {!r} branches for {:.2f} km.'.format(len(branches), branches['length'].sum()))
 
     return buses, branches
+
+
+def read_buses_file(buses_filename):
+    # Read the file
+    buses = read_table(buses_filename, dtypes=BUSES_DTYPES)
+    logger.info('Extraction of {!r} electrical buses of a previous architecture.'.format(len(buses)))
+
+    return buses
+
+
+def read_branches_file(branches_filename):
+    # Read the file
+    branches = read_table(branches_filename, dtypes=BRANCHES_DTYPES)
+    logger.info('Extraction of {!r} branches of a previous architecture.'.format(len(branches)))
+
+    return branches
+
+
+def read_catalog_file(catalog_filename):
+    # Read the CSV file
+    catalog = pd.read_csv(catalog_filename, index_col='name')
+    missing = {'ampacity', 'r', 'x', 'cost'}.difference(catalog.columns)
+    if missing:
+        raise ValueError('The columns {!r} are missing in the catalog of conductors.'.format(sorted(missing)))
+    logger.info('Extraction of a catalog of {!r} conductors.'.format(len(catalog)))
+
+    return catalog
+
+
+def read_table(filename, dtypes=None):
+    """Read a table indexed by the column `id` from a CSV, Parquet or Feather file, chosen by its extension.
+
+    Args:
+        filename (str):
+            The name of the file.
+
+        dtypes (Optional[Dict[str, str]]):
+            The types of the columns. The columns missing from the table are ignored.
+
+    Returns:
+        pandas.DataFrame: The table, with an integer index.
+    """
+    file_format = table_format(filename)
+    if file_format == 'csv':
+        table = pd.read_csv(filename, index_col='id')
+    elif file_format == 'parquet':
+        table = pd.read_parquet(filename)
+    else:
+        table = pd.read_feather(filename)
+    if 'id' in table.columns:
+        table = table.set_index('id')
+    return set_dtypes(table, dtypes)
+
+
+def write_table(table, filename, dtypes=None):
+    """Write a table indexed by `id` in a CSV, Parquet or Feather file, chosen by its extension.
+
+    Args:
+        table (pandas.DataFrame):
+            The table.
+
+        filename (str):
+            The name of the file.
+
+        dtypes (Optional[Dict[str, str]]):
+            The types of the columns. The columns missing from the table are ignored.
+    """
+    file_format = table_format(filename)
+    table = set_dtypes(table, dtypes)
+    if file_format == 'csv':
+        table.to_csv(filename, index_label='id')
+        return
+    # The binary formats store the index as a regular column
+    table = table.rename_axis('id').reset_index()
+    if file_format == 'parquet':
+        table.to_parquet(filename, index=False)
+    else:
+        table.to_feather(filename)
+
+
+def table_format(filename):
+    """The format of a table ('csv', 'parquet' or 'feather') given by the extension of its file."""
+    extension = os.path.splitext(filename)[1].lower()
+    if extension not in FORMATS:
+        raise ValueError('Unknown extension {!r} of the file {!r}, expected one of {!r}.'.format(extension, filename,
+                                                                                               sorted(FORMATS)))
+    return FORMATS[extension]
+
+
+def set_dtypes(table, dtypes=None):
+    """Set the types of the columns and of the index of a table.
+
+    The index is converted to integers if possible and the duplicates of the column `id` written by previous versions
+    of the tools (`id.1`, ...) are removed.
+
+    Args:
+        table (pandas.DataFrame):
+            The table.
+
+        dtypes (Optional[Dict[str, str]]):
+            The types of the columns. The columns missing from the table are ignored.
+
+    Returns:
+        pandas.DataFrame: The table with the types of its columns.
+    """
+    table = table.drop(columns=[column for column in table.columns if re.fullmatch(r'id\.\d+', str(column))])
+    if pd.api.types.is_float_dtype(table.index) and (table.index == table.index.round()).all():
+        table.index = table.index.astype('int64')
+    table.index.name = 'id'
+    if dtypes is not None:
+        dtypes = {column: dtype for column, dtype in dtypes.items() if column in table.columns}
+        if 'feeder' in dtypes and pd.api.types.is_float_dtype(table['feeder']):
+            # Floating feeders such as 1.0 are converted to integers
+            table['feeder'] = table['feeder'].round()
+        table = table.astype(dtypes)
+    return table
@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Providers of the distances between the buses."""
+
+import importlib
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Root of the repository, imported as the package `planning-tools`
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+distances = importlib.import_module('planning-tools.architecture.distances')
+
+
+@pytest.fixture
+def coordinates():
+    rng = np.random.default_rng(0)
+    return rng.uniform(0, 1000, 50), rng.uniform(0, 1000, 50)
+
+
+def test_provider_is_abstract(coordinates):
+    with pytest.raises(TypeError):
+        distances.DistanceProvider(*coordinates)
+
+
+def test_lazy_matches_dense(coordinates):
+    dense = distances.DenseDistances(*coordinates)
+    lazy = distances.LazyDistances(*coordinates)
+    path = [0, 7, 3, 12, 49]
+    rows, columns = [1, 4, 9], [2, 3]
+    assert lazy[3, 12] == pytest.approx(dense[3, 12])
+    np.testing.assert_allclose(lazy[path[:-1], path[1:]], dense[path[:-1], path[1:]])
+    np.testing.assert_allclose(lazy[path[:-1], 5], dense[path[:-1], 5])
+    np.testing.assert_allclose(lazy[5, path[1:]], dense[5, path[1:]])
+    np.testing.assert_allclose(lazy[np.ix_(rows, columns)], dense[np.ix_(rows, columns)])
+    np.testing.assert_allclose(lazy.row(8), dense.row(8))
+
+
+def test_lazy_cache_is_bounded_by_entries(coordinates):
+    lazy = distances.LazyDistances(*coordinates, cache_size=120)
+    # The lookups by index compute only the requested distances
+    lazy[[1, 2, 3], 4]
+    assert not lazy._rows
+    for position in range(5):
+        lazy.row(position)
+    assert list(lazy._rows) == [3, 4]
+    # A cache smaller than a row still keeps the last row
+    lazy.cache_size = 10
+    lazy.row(0)
+    assert list(lazy._rows) == [0]
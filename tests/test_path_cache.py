@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Cache of the paths of the small feeders of `SecuredFeeder`."""
+
+import importlib
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Root of the repository, imported as the package `planning-tools`
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+secured_feeder = importlib.import_module('planning-tools.architecture.secured_feeder')
+utils = importlib.import_module('planning-tools.architecture.utils')
+
+
+@pytest.fixture
+def architecture():
+    """An architecture of 3 feeders between 3 HV/MV substations, with 4 MV/LV substations on each feeder."""
+    rng = np.random.default_rng(0)
+    hv_mv_substations = pd.DataFrame({'id': [1, 2, 3], 'x': [0., 5000., 2500.], 'y': [0., 0., 4000.]}).set_index('id')
+    mv_lv_substations = pd.DataFrame({'id': np.arange(1, 13), 'P (MW)': rng.uniform(0.1, 0.8, 12),
+                                      'x': rng.uniform(0, 5000, 12), 'y': rng.uniform(0, 4000, 12)}).set_index('id')
+    feeders = secured_feeder.default_feeders(hv_mv_substations)
+    architecture = secured_feeder.SecuredFeeder(hv_mv_substations, mv_lv_substations, feeders=feeders,
+                                                solver='exact')
+    assignment = np.full(len(architecture.buses), -1)
+    assignment[architecture._substations] = np.arange(12) % 3
+    architecture._load_assignment(assignment)
+    return architecture
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    """The number of calls of the solver of the travelling salesman problem by the architectures."""
+    counter = {'tsp_solver': 0}
+
+    def counted(*args, **kwargs):
+        counter['tsp_solver'] += 1
+        return utils.tsp_solver(*args, **kwargs)
+    monkeypatch.setattr(secured_feeder, 'tsp_solver', counted)
+    return counter
+
+
+def test_cache_hit(architecture, calls):
+    path, length = architecture._solve_feeder(0)
+    assert calls['tsp_solver'] == 1
+    cached_path, cached_length = architecture._solve_feeder(0)
+    assert calls['tsp_solver'] == 1
+    assert (cached_path, cached_length) == (path, length)
+
+    # The cached path is a copy
+    cached_path.reverse()
+    assert architecture._solve_feeder(0)[0] == path
+
+
+def test_cache_follows_the_substations(architecture, calls):
+    architecture._solve_feeders()
+    assert calls['tsp_solver'] == 3
+
+    # A move changes the substations of both feeders: their paths are solved again
+    position = sorted(architecture._members[0])[0]
+    architecture._move_substation(position, 1)
+    architecture._solve_feeders()
+    assert calls['tsp_solver'] == 5
+    assert position in architecture._paths[1] and position not in architecture._paths[0]
+    points = [int(source) for source in architecture._sources[1]]
+    expected = utils.tsp_solver(points + sorted(architecture._members[1]), architecture.distances, points,
+                                solver='exact')[1]
+    assert architecture._lengths[1] == pytest.approx(expected)
+
+    # The move back finds the first paths in the cache
+    architecture._move_substation(position, 0)
+    architecture._solve_feeders()
+    assert calls['tsp_solver'] == 5
+
+
+def test_cache_depends_on_the_solver(architecture, calls):
+    architecture._solve_feeder(0)
+    architecture.solver = 'insertion'
+    architecture._solve_feeder(0)
+    assert calls['tsp_solver'] == 2
+
+
+def test_cache_drops_the_least_recently_used(architecture, calls, monkeypatch):
+    monkeypatch.setattr(secured_feeder, 'PATH_CACHE_SIZE', 2)
+    for feeder in (0, 1, 0, 2):
+        architecture._solve_feeder(feeder)
+    assert calls['tsp_solver'] == 3
+    assert len(architecture._path_cache) == 2
+    # Feeder 1 is the least recently used
+    architecture._solve_feeder(0)
+    architecture._solve_feeder(2)
+    assert calls['tsp_solver'] == 3
+    architecture._solve_feeder(1)
+    assert calls['tsp_solver'] == 4
+
+
+def test_large_feeders_are_not_cached(architecture, calls, monkeypatch):
+    monkeypatch.setattr(secured_feeder, 'EXACT_LIMIT', 3)
+    architecture._solve_feeder(0)
+    architecture._solve_feeder(0)
+    assert calls['tsp_solver'] == 2
+    assert not architecture._path_cache
@@ -0,0 +1,43 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Capacity-balanced assignment of the k-means placement."""
+
+import importlib
+import os
+import sys
+
+import numpy as np
+
+# Root of the repository, imported as the package `planning-tools`
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+placement = importlib.import_module('planning-tools.architecture.placement')
+
+
+def test_nearest_centers_without_capacity():
+    rng = np.random.default_rng(0)
+    distances = rng.uniform(0, 1000, (200, 5))
+    assignment = placement._capacitated_assignment(distances, np.ones(200), capacity=200)
+    np.testing.assert_array_equal(assignment, distances.argmin(axis=1))
+
+
+def test_capacity_of_the_feeders():
+    rng = np.random.default_rng(1)
+    distances = rng.uniform(0, 1000, (500, 4))
+    # Most of the substations are closer to the first center
+    distances[:, 0] /= 4
+    loads = rng.uniform(0.1, 1, 500)
+    capacity = loads.sum() / 4 * 1.1
+    assignment = placement._capacitated_assignment(distances, loads, capacity)
+    assert np.bincount(assignment, weights=loads, minlength=4).max() <= capacity
+    # The substations with the highest regret keep their nearest center
+    preferences = np.sort(distances, axis=1)
+    first = np.argmax(preferences[:, 1] - preferences[:, 0])
+    assert assignment[first] == distances[first].argmin()
+
+
+def test_overloaded_substations_on_the_nearest_center():
+    distances = np.array([[1., 2.], [1., 3.], [2., 1.]])
+    assignment = placement._capacitated_assignment(distances, np.array([1., 1., 5.]), capacity=1.5)
+    # The second substation has the highest regret, the third one fits in no feeder
+    np.testing.assert_array_equal(assignment, [1, 0, 1])
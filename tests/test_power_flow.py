@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Power flow of radial networks, compared with analytical solutions."""
+
+import importlib
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Root of the repository, imported as the package `planning-tools`
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+power_flow = importlib.import_module('planning-tools.electrical_network.power_flow')
+electrical_network = importlib.import_module('planning-tools.electrical_network.electrical_network')
+
+NOMINAL = power_flow.NOMINAL_VOLTAGE * 1e3 / np.sqrt(3)
+
+
+def network(loads, branches):
+    """A network supplied by the HV/MV substation 1, with a MV/LV substation of load `s` (MVA) for each load."""
+    buses = pd.DataFrame({'id': np.arange(1, len(loads) + 2), 'type': ['hv_source'] + ['mv_load'] * len(loads),
+                          's': [np.nan] + list(loads), 'feeder': [np.nan] + [1.] * len(loads)}).set_index('id')
+    bus1, bus2, length = zip(*branches)
+    branches = pd.DataFrame({'id': np.arange(len(branches)), 'bus1': bus1, 'bus2': bus2, 'length': length,
+                             'state': True, 'feeder': 1.}).set_index('id')
+    return buses, branches
+
+
+def load_current(s, v):
+    """The complex current of a load of `s` MVA at the phase-to-neutral voltage `v` (V)."""
+    power = s * 1e6 / 3 * (power_flow.POWER_FACTOR + 1j * np.sqrt(1 - power_flow.POWER_FACTOR ** 2))
+    return np.conj(power / v)
+
+
+def test_single_line_voltage_drop():
+    buses, branches = network([2.], [(1, 2, 3000.)])
+    v, current = power_flow.radial_power_flow(buses, branches)
+    impedance = (power_flow.RESISTANCE + 1j * power_flow.REACTANCE) * 3
+    assert v[0] == pytest.approx(NOMINAL)
+    # The current of the line is the current of the load, and the voltage drop is the drop in the line impedance
+    assert current[0] == pytest.approx(load_current(2., v[1]), rel=1e-6)
+    assert v[0] - v[1] == pytest.approx(impedance * current[0], rel=1e-6)
+    # Closed-form voltage at the load: |V2|^4 - (|V1|^2 - 2 (R P + X Q)) |V2|^2 + |Z|^2 |S|^2 = 0
+    p, q = 2e6 / 3 * power_flow.POWER_FACTOR, 2e6 / 3 * np.sqrt(1 - power_flow.POWER_FACTOR ** 2)
+    b = NOMINAL ** 2 - 2 * (impedance.real * p + impedance.imag * q)
+    expected = np.sqrt((b + np.sqrt(b ** 2 - 4 * np.abs(impedance) ** 2 * (p ** 2 + q ** 2))) / 2)
+    assert np.abs(v[1]) == pytest.approx(expected, rel=1e-9)
+
+
+def test_three_buses_current_law():
+    # The second branch is written from bus 3 to bus 2: its current is counted from 3 to 2
+    buses, branches = network([1., 0.5], [(1, 2, 2000.), (3, 2, 1500.)])
+    v, current = power_flow.radial_power_flow(buses, branches)
+    i2, i3 = load_current(1., v[1]), load_current(0.5, v[2])
+    assert -current[1] == pytest.approx(i3, rel=1e-6)
+    assert current[0] == pytest.approx(i2 + i3, rel=1e-6)
+    impedances = (power_flow.RESISTANCE + 1j * power_flow.REACTANCE) * np.array([2., 1.5])
+    assert v[1] - v[2] == pytest.approx(impedances[1] * -current[1], rel=1e-6)
+    assert np.abs(v[0]) > np.abs(v[1]) > np.abs(v[2])
+
+
+def test_feeders_indexed_by_integers():
+    buses, branches = network([1., 0.5], [(1, 2, 2000.), (2, 3, 1500.)])
+    feeders = electrical_network.ElectricalNetwork(buses, branches).power_flow()
+    assert feeders.index.dtype == 'Int64'
+    assert feeders.index.tolist() == [1]
+    assert feeders.loc[1, 'i_max'] == pytest.approx(branches['i'].iloc[0])
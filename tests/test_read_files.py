@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Types of the columns of the tables written and read in the supported formats."""
+
+import importlib
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Root of the repository, imported as the package `planning-tools`
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+read_files = importlib.import_module('planning-tools.io.read_files')
+
+
+@pytest.mark.parametrize('extension', ['.csv', '.parquet', '.feather'])
+@pytest.mark.parametrize('type_name', [[None, None], ['ALU_150', None]])
+def test_branches_round_trip(tmp_path, extension, type_name):
+    branches = pd.DataFrame({'id': [0, 1], 'name': ['feeder_1_line_0', 'feeder_1_line_1'], 'bus1': [1, 3],
+                             'bus2': [3, 2], 'type': ['line', 'line'], 'type_name': type_name,
+                             'length': [120.5, 80.], 'state': [True, True], 'feeder': [1, 1]}).set_index('id')
+    filename = str(tmp_path / ('branches' + extension))
+    read_files.write_table(branches, filename, dtypes=read_files.BRANCHES_DTYPES)
+    table = read_files.read_branches_file(filename)
+    for column, dtype in read_files.BRANCHES_DTYPES.items():
+        assert str(table[column].dtype) == dtype, column
+    assert table['type_name'].tolist() == [name if name is not None else pd.NA for name in type_name]
+    pd.testing.assert_frame_equal(table, read_files.set_dtypes(branches, read_files.BRANCHES_DTYPES),
+                                  check_categorical=False)
+
+
+@pytest.mark.parametrize('bbox', [None, (100., 100., 600., 500.)])
+def test_mv_lv_substations_in_every_format(tmp_path, bbox):
+    rng = np.random.default_rng(0)
+    substations = pd.DataFrame({'id': np.arange(1, 201), 'P (MW)': rng.uniform(0.1, 1, 200),
+                                'x': rng.uniform(0, 1000, 200), 'y': rng.uniform(0, 1000, 200), 'name': 'mv'})
+    substations.loc[[3, 50], 'x'] = np.nan
+    substations.loc[7, 'y'] = np.nan
+    expected = substations.dropna().set_index('id')[['P (MW)', 'x', 'y']]
+    if bbox is not None:
+        expected = expected[expected['x'].between(bbox[0], bbox[2]) & expected['y'].between(bbox[1], bbox[3])]
+    for extension in ('.csv', '.parquet', '.feather'):
+        filename = str(tmp_path / ('mv_lv_substations' + extension))
+        read_files.write_table(substations.set_index('id'), filename)
+        table = read_files.read_mv_lv_substations(filename, bbox=bbox, chunksize=64)
+        pd.testing.assert_frame_equal(table, expected)
@@ -0,0 +1,41 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Choice of the conductors of the branches in a catalog."""
+
+import importlib
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Root of the repository, imported as the package `planning-tools`
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sizing = importlib.import_module('planning-tools.electrical_network.sizing')
+
+
+def catalog():
+    """A catalog where the cheapest conductor is not the first one nor the one with the lowest ampacity."""
+    return pd.DataFrame({'name': ['ALU_240', 'ALU_95', 'ALU_150'], 'ampacity': [420., 230., 300.],
+                         'cost': [60., 30., 25.]}).set_index('name')
+
+
+def test_cheapest_admissible_conductor():
+    choice, admissible = sizing.select_conductors(np.array([100., 250., 300., 400.]),
+                                                  np.array([1000., 500., 2000., 800.]), catalog())
+    assert catalog().index[choice].tolist() == ['ALU_150', 'ALU_150', 'ALU_150', 'ALU_240']
+    assert admissible.all()
+
+
+def test_cheapest_among_the_admissible_conductors():
+    # ALU_150 is cheaper but its ampacity is too low
+    choice, admissible = sizing.select_conductors(np.array([301.]), np.array([1000.]), catalog())
+    assert catalog().index[choice].tolist() == ['ALU_240']
+    assert admissible.all()
+
+
+def test_no_admissible_conductor():
+    choice, admissible = sizing.select_conductors(np.array([200., 500.]), np.array([1000., 1000.]), catalog())
+    assert catalog().index[choice].tolist() == ['ALU_150', 'ALU_240']
+    assert admissible.tolist() == [True, False]
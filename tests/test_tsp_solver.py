@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Exact resolution of the travelling salesman problem of the small feeders, compared with a brute force."""
+
+import importlib
+import itertools
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Root of the repository, imported as the package `planning-tools`
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+utils = importlib.import_module('planning-tools.architecture.utils')
+
+
+def brute_force(costmatrix, start, end):
+    """The length of the shortest path from `start` to `end` through all the nodes, by enumeration."""
+    nodes = [node for node in range(len(costmatrix)) if node not in (start, end)]
+    best = np.inf
+    for permutation in itertools.permutations(nodes):
+        path = [start, *permutation, end]
+        best = min(best, costmatrix[path[:-1], path[1:]].sum())
+    return best
+
+
+def random_costmatrix(rng, n_nodes):
+    """The euclidean distances between random points."""
+    xy = rng.uniform(0, 1000, (n_nodes, 2))
+    return np.hypot(*(xy[:, None, :] - xy[None, :, :]).transpose(2, 0, 1))
+
+
+@pytest.mark.parametrize('n_nodes', range(2, 9))
+def test_exact_matches_brute_force(n_nodes):
+    rng = np.random.default_rng(n_nodes)
+    for _ in range(10):
+        costmatrix = random_costmatrix(rng, n_nodes)
+        start, end = (int(node) for node in rng.choice(n_nodes, 2, replace=False))
+        path, length = utils.tsp_solver(list(range(n_nodes)), costmatrix, [start, end], solver='exact')
+        assert path[0] == start and path[-1] == end
+        assert sorted(path) == list(range(n_nodes))
+        assert length == pytest.approx(costmatrix[path[:-1], path[1:]].sum())
+        assert length == pytest.approx(brute_force(costmatrix, start, end), rel=1e-9)
+
+
+def test_exact_is_never_longer_than_heuristics():
+    rng = np.random.default_rng(0)
+    costmatrix = random_costmatrix(rng, utils.EXACT_LIMIT + 2)
+    points = list(range(len(costmatrix)))
+    exact = utils.tsp_solver(points, costmatrix, [0, 1], solver='exact')[1]
+    for solver in ('insertion', 'local-search'):
+        assert exact <= utils.tsp_solver(points, costmatrix, [0, 1], solver=solver)[1] + 1e-9
+
+
+def test_exact_falls_back_beyond_limit():
+    rng = np.random.default_rng(1)
+    costmatrix = random_costmatrix(rng, utils.EXACT_LIMIT + 5)
+    points = list(range(len(costmatrix)))
+    exact = utils.tsp_solver(points, costmatrix, [0, 1], solver='exact')
+    local_search = utils.tsp_solver(points, costmatrix, [0, 1], solver='local-search')
+    assert exact[0] == local_search[0]
+    assert exact[1] == pytest.approx(local_search[1])
@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Paths of a previous architecture kept by the warm start of `SecuredFeeder`."""
+
+import importlib
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Root of the repository, imported as the package `planning-tools`
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+secured_feeder = importlib.import_module('planning-tools.architecture.secured_feeder')
+
+
+@pytest.fixture
+def substations():
+    """3 HV/MV substations and 12 MV/LV substations."""
+    rng = np.random.default_rng(0)
+    hv_mv_substations = pd.DataFrame({'id': [1, 2, 3], 'x': [0., 5000., 2500.], 'y': [0., 0., 4000.]}).set_index('id')
+    mv_lv_substations = pd.DataFrame({'id': np.arange(1, 13), 'P (MW)': rng.uniform(0.1, 0.8, 12),
+                                      'x': rng.uniform(0, 5000, 12), 'y': rng.uniform(0, 4000, 12)}).set_index('id')
+    return hv_mv_substations, mv_lv_substations
+
+
+@pytest.fixture
+def previous(substations):
+    """A previous architecture whose substations are assigned in turn to the 3 feeders."""
+    hv_mv_substations, mv_lv_substations = substations
+    architecture = secured_feeder.SecuredFeeder(hv_mv_substations, mv_lv_substations,
+                                                feeders=secured_feeder.default_feeders(hv_mv_substations))
+    assignment = np.full(len(architecture.buses), -1)
+    assignment[architecture._substations] = np.arange(12) % 3
+    architecture._load_assignment(assignment)
+    architecture._solve_feeders()
+    architecture._store_state()
+    return architecture
+
+
+def warm_architecture(substations, previous):
+    """An architecture built from the buses and the branches of the previous architecture."""
+    hv_mv_substations, mv_lv_substations = substations
+    return secured_feeder.SecuredFeeder(
+        hv_mv_substations, mv_lv_substations, feeders=secured_feeder.default_feeders(hv_mv_substations),
+        x=secured_feeder.assignment_from_buses(previous.buses, mv_lv_substations),
+        paths=secured_feeder.paths_from_branches(previous.buses, previous.branches))
+
+
+def test_paths_round_trip(substations, previous):
+    architecture = warm_architecture(substations, previous)
+    assert architecture._paths == previous._paths
+    np.testing.assert_allclose(architecture._lengths, previous._lengths)
+
+
+def test_previous_paths_are_kept(substations, previous, monkeypatch):
+    # A solver which does not improve the paths: the previous paths are kept
+    def sorted_path(points, costmatrix, init, solver):
+        path = [init[0]] + sorted(set(points).difference(init)) + [init[1]]
+        return path, costmatrix[path[:-1], path[1:]].sum()
+    monkeypatch.setattr(secured_feeder, 'tsp_solver', sorted_path)
+    architecture = warm_architecture(substations, previous)
+    architecture._solve_feeders(keep=True)
+    assert architecture._paths == previous._paths
+    assert architecture._lengths.sum() == pytest.approx(previous._lengths.sum())
+
+    # Without the previous paths, the feeders are solved again
+    architecture._solve_feeders()
+    assert architecture._lengths.sum() >= previous._lengths.sum()
+
+
+def test_paths_of_modified_feeders_are_solved(substations, previous):
+    architecture = warm_architecture(substations, previous)
+    position = sorted(architecture._members[0])[0]
+    architecture._move_substation(position, 1)
+    architecture._solve_feeders(keep=True)
+    assert position in architecture._paths[1] and position not in architecture._paths[0]
+    assert architecture._paths[2] == previous._paths[2]